@@ -3,10 +3,8 @@ from converter import convert_all, normalize_ext
 from pathlib import Path
 import zipfile
 import io
-import pandas as pd
-from PIL import Image
 import json
-import yaml
+import os
 
 def format_size(bytes):
     """Convert bytes to human-readable format."""
@@ -16,6 +14,157 @@ def format_size(bytes):
         bytes /= 1024
     return f"{bytes:.1f} TB"
 
+@st.cache_resource
+def get_result_cache():
+    """One conversion cache per server process, shared by all sessions.
+
+    Limits come from CONVERTER_CACHE_MEMORY_MB / CONVERTER_CACHE_DISK_MB
+    (0 disables a tier) and the location from CONVERTER_CACHE_DIR.
+    """
+    from result_cache import ResultCache, DEFAULT_MEMORY_LIMIT, DEFAULT_DISK_LIMIT
+    return ResultCache(
+        directory=os.environ.get("CONVERTER_CACHE_DIR"),
+        memory_limit=int(os.environ.get("CONVERTER_CACHE_MEMORY_MB", DEFAULT_MEMORY_LIMIT >> 20)) << 20,
+        disk_limit=int(os.environ.get("CONVERTER_CACHE_DISK_MB", DEFAULT_DISK_LIMIT >> 20)) << 20,
+    )
+
+@st.cache_resource
+def get_metrics():
+    """Per-pair conversion stats of this server process, shown in the Metrics tab.
+
+    CONVERTER_METRICS_JSONL / CONVERTER_METRICS_PROM also log every conversion
+    to files; earlier runs in the JSON-lines file are loaded at start.
+    """
+    import metrics
+    aggregator = metrics.Aggregator()
+    jsonl = os.environ.get(metrics.JSONL_ENV)
+    if jsonl and Path(jsonl).exists():
+        aggregator.load(metrics.read_jsonl(jsonl))
+    metrics.configure()
+    metrics.add_sink(aggregator)
+    return aggregator
+
+@st.cache_resource
+def get_job_queue():
+    """Worker pool shared by all sessions (CONVERTER_WORKERS, default one per CPU)."""
+    from jobs import JobQueue
+    get_metrics()  # sinks are in place before the first conversion
+    return JobQueue(workers=int(os.environ.get("CONVERTER_WORKERS", 0)), cache=get_result_cache())
+
+def show_metrics():
+    """p50/p95 latency and throughput per conversion pair since the server started."""
+    stats = get_metrics().summary()
+    if not stats:
+        st.info("No conversions yet. Stats appear here after the first one.")
+        return
+    st.dataframe([
+        {
+            "Pair": f"{s.from_ext[1:]} → {s.to_ext[1:]}",
+            "Conversions": s.count,
+            "Failed": s.failed,
+            "p50 (s)": round(s.p50_seconds, 3),
+            "p95 (s)": round(s.p95_seconds, 3),
+            "Throughput (MB/s)": round(s.mb_per_second, 2),
+            "CPU per file (s)": round(s.cpu_seconds, 3),
+            "Peak memory": format_size(s.peak_rss),
+        }
+        for s in stats
+    ], use_container_width=True, hide_index=True)
+    st.caption("Slowest p95 first. Cache hits are not counted; percentiles cover the last 10,000 conversions per pair.")
+
+def profile_picker(to_ext, key):
+    """Encoder profile selectbox for image targets; None (Pillow defaults) otherwise."""
+    from conversions.image_profiles import PROFILES, DEFAULT_PROFILE
+    if to_ext.lower() not in ("png", "jpg", "jpeg", "webp"):
+        return None
+    profile = st.selectbox(
+        "Image encoder profile", list(PROFILES), key=key,
+        help="fast: quickest encodes • balanced: optimized defaults • smallest: smallest files • lossless: no quality loss",
+    )
+    return None if profile == DEFAULT_PROFILE else profile
+
+def show_job(job):
+    """Progress, timings and downloads of a background conversion job."""
+    progress = job.progress
+    if job.done:
+        st.progress(1.0, text=f"✅ Conversion complete in {job.elapsed:.2f}s!")
+    else:
+        st.progress(progress, text=f"Converting... {len(job.finished)}/{len(job.tasks)} file(s) done")
+        if st.button("Cancel", key="cancel_job"):
+            job.cancel()
+
+    converted_files = [t for t in job.tasks if t.status == "done"]
+    errors = [t for t in job.tasks if t.status == "failed"]
+
+    if converted_files:
+        if job.done:
+            st.success(f"Successfully converted {len(converted_files)} file(s)")
+        
+        # Show conversion times
+        with st.expander("⏱️ Conversion Times", expanded=False):
+            for t in converted_files:
+                st.write(f"• **{t.dst_name}** - {t.seconds:.3f}s" + (" (cached)" if t.cached else ""))
+            st.write(f"**Total time:** {job.elapsed:.2f}s")
+            cache = get_result_cache()
+            cache_hits = sum(t.cached for t in converted_files)
+            st.write(
+                f"**Cache:** {cache_hits} hit(s), {len(job.finished) - cache_hits} miss(es) this run • "
+                f"{cache.hits} hit(s), {cache.misses} miss(es) since the server started"
+            )
+        
+        st.subheader("Download Options")
+        
+        # ZIP download once the whole batch is in. Downloads are served from
+        # the job's files only when clicked (a callable), not read on every rerun
+        if job.done and len(converted_files) > 1:
+            st.download_button(
+                label=f"📦 Download All as ZIP ({len(converted_files)} files)",
+                data=job_archive(job, converted_files).read_bytes,
+                file_name=f"converted_files.zip",
+                mime="application/zip"
+            )
+            st.write("**Or download individually:**")
+        
+        # Each file is downloadable as soon as it is finished
+        cols = st.columns(min(3, len(converted_files)))
+        for i, t in enumerate(converted_files):
+            with cols[i % 3]:
+                st.download_button(
+                    label=f"📄 {t.dst_name}",
+                    data=t.path.read_bytes,
+                    file_name=t.dst_name,
+                    key=f"download_{i}_{t.dst_name}",
+                    use_container_width=True
+                )
+    
+    if errors:
+        st.error("⚠️ Some files failed:")
+        for t in errors:
+            st.write(f"  • {t.name}: {t.error}")
+
+def job_archive(job, converted_files):
+    """Path of the ZIP of a finished job, built once (not on every rerun) next to its outputs.
+
+    Members are copied from the output files into the archive, which spills to
+    a temp file when large; JPEG/WebP/MP3/PDF are stored rather than deflated again.
+    """
+    path = job.directory / "converted_files.zip"
+    if not path.exists():
+        from zip_package import ZipPackage
+        with ZipPackage(directory=job.directory) as package:
+            for t in converted_files:
+                package.add_file(t.dst_name, t.path)
+            package.save(path)
+    return path
+
+@st.fragment(run_every=0.5)
+def watch_job():
+    """Re-render a running job twice a second, without rerunning the whole page."""
+    job = st.session_state.convert_job
+    show_job(job)
+    if job.done:
+        st.rerun()  # final render outside the polling fragment
+
 def preview_file(uploaded_file, ext):
     """Show preview based on file type."""
     try:
@@ -36,6 +185,7 @@ def preview_file(uploaded_file, ext):
         
         # CSV
         elif ext == "csv":
+            import pandas as pd  # heavy; only load it when a CSV is previewed
             df = pd.read_csv(uploaded_file)
             uploaded_file.seek(0)
             st.dataframe(df.head(10))
@@ -44,6 +194,7 @@ def preview_file(uploaded_file, ext):
         
         # Images
         elif ext in ["png", "jpg", "jpeg", "webp"]:
+            from PIL import Image
             img = Image.open(uploaded_file)
             uploaded_file.seek(0)
             st.image(img, caption=f"{img.size[0]}x{img.size[1]} pixels", use_container_width=True)
@@ -83,12 +234,26 @@ with col2:
         st.session_state.dark_mode = not st.session_state.dark_mode
         st.rerun()
 
+supported_exts = [
+    "md", "html",
+    "csv", "json", "npy", "xml",
+    "yaml", "yml",
+    "png", "jpg", "jpeg", "webp",
+    "txt", "docx", "pdf",
+    "toon",
+    "mp3", "wav"
+]
+
 # Tab selection
-tab1, tab2 = st.tabs(["📁 Convert Files", "📦 Extract ZIP"])
+tab1, tab2, tab3 = st.tabs(["📁 Convert Files", "📦 Extract ZIP", "📈 Metrics"])
+
+with tab3:
+    st.subheader("Conversion Metrics")
+    show_metrics()
 
 with tab2:
     st.subheader("ZIP File Extractor")
-    st.write("Upload a ZIP file to extract its contents")
+    st.write("Upload a ZIP file to extract its contents, or convert the files inside it into a new ZIP")
     
     zip_file = st.file_uploader("Upload ZIP file", type=["zip"], key="zip_uploader")
     
@@ -96,9 +261,8 @@ with tab2:
         st.write(f"📦 ZIP file: **{zip_file.name}** ({format_size(zip_file.size)})")
         
         try:
-            # Read ZIP file
-            zip_buffer = io.BytesIO(zip_file.read())
-            with zipfile.ZipFile(zip_buffer, 'r') as zip_ref:
+            # The upload is already in memory; read it in place instead of copying it
+            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
                 file_list = zip_ref.namelist()
                 
                 st.success(f"Found {len(file_list)} file(s) in ZIP")
@@ -109,7 +273,57 @@ with tab2:
                         file_info = zip_ref.getinfo(file_name)
                         st.write(f"• **{file_name}** - {format_size(file_info.file_size)}")
                 
-                if st.button("Extract All Files"):
+                mode = st.radio("Mode", ["Extract files", "Convert files inside"], horizontal=True)
+                
+                if mode == "Convert files inside":
+                    zip_from = st.selectbox("Convert from", supported_exts, key="zip_from")
+                    zip_to = st.selectbox("Convert to", [ext for ext in supported_exts if ext != zip_from], key="zip_to")
+                    zip_profile = profile_picker(zip_to, key="zip_profile")
+                    keep_other = st.checkbox("Copy other files into the new ZIP unchanged")
+                    matching = [n for n in file_list if n.lower().endswith(f".{zip_from}")]
+                    st.caption(f"{len(matching)} .{zip_from} file(s) will be converted")
+                    
+                    if st.button("Convert Archive") and matching:
+                        from converter import convert_archive
+                        from zip_package import ZipPackage
+                        
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                        done = []
+                        
+                        def on_member(result):
+                            done.append(result)
+                            status_text.text(f"Converted {result.src}")
+                            progress_bar.progress(len(done) / len(matching))
+                        
+                        # members go member by member through the shared worker pool
+                        # straight into the output ZIP (folders kept); nothing touches the disk
+                        queue = get_job_queue()  # also sets up the metrics sinks
+                        try:
+                            with ZipPackage() as package:
+                                summary = convert_archive(
+                                    zip_file, package, zip_from, zip_to,
+                                    jobs=queue.workers, keep_other=keep_other,
+                                    progress=on_member, pool=queue.executor(),
+                                    profile=zip_profile,
+                                )
+                                archive = package.finish()
+                        except KeyError:
+                            st.error(f"Conversion from .{zip_from} to .{zip_to} is not available")
+                        else:
+                            status_text.text(f"✅ Converted {len(summary.converted)} file(s) in {summary.elapsed:.2f}s")
+                            st.download_button(
+                                label=f"📦 Download {Path(zip_file.name).stem}_{zip_to}.zip",
+                                data=archive,
+                                file_name=f"{Path(zip_file.name).stem}_{zip_to}.zip",
+                                mime="application/zip"
+                            )
+                            if summary.failed:
+                                st.error("⚠️ Some files failed:")
+                                for r in summary.failed:
+                                    st.write(f"  • {r.src}: {r.error}")
+                
+                elif st.button("Extract All Files"):
                     extract_dir = Path("extracted_files")
                     extract_dir.mkdir(exist_ok=True)
                     
@@ -192,17 +406,9 @@ else:
 
 with tab1:
     # Let user choose the type of conversion (from -> to)
-    supported_exts = [
-        "md", "html",
-        "csv", "json", "npy", "xml",
-        "yaml", "yml",
-        "png", "jpg", "jpeg", "webp",
-        "txt", "docx", "pdf",
-        "toon",
-        "mp3", "wav"
-    ]
     from_ext = st.selectbox("Convert from", supported_exts)
     to_ext = st.selectbox("Convert to", [ext for ext in supported_exts if ext != from_ext])
+    profile = profile_picker(to_ext, key="convert_profile")
 
     # Custom drag & drop styling (only for convert tab)
     st.markdown("""
@@ -267,113 +473,25 @@ with tab1:
             with tab:
                 preview_file(uploaded_file, from_ext)
 
-    if st.button("Convert All"):
-        import time
-        start_time = time.time()
-        
-        upload_dir = Path("uploaded_files")
-        upload_dir.mkdir(exist_ok=True)
-        
-        converted_files = []
-        errors = []
-        conversion_times = []
-
-        # Progress bar
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        # Save all files first
-        src_paths = []
-        for uploaded_file in uploaded_files:
-            src_path = upload_dir / uploaded_file.name
-            with open(src_path, "wb") as f:
-                f.write(uploaded_file.read())
-            src_paths.append(src_path)
-
-        # Convert each file individually
-        for i, src_path in enumerate(src_paths):
-            try:
-                file_start = time.time()
-                status_text.text(f"Converting {src_path.name}...")
-                
-                # Get conversion function directly
-                from conversions import CONVERSIONS
-                from_suffix = normalize_ext(from_ext)
-                to_suffix = normalize_ext(to_ext)
-                func = CONVERSIONS[(from_suffix, to_suffix)]
-                
-                # Convert this specific file
-                dst_path = src_path.with_suffix(to_suffix)
-                func(src_path, dst_path)
-                
-                if dst_path.exists():
-                    converted_files.append(dst_path)
-                    file_time = time.time() - file_start
-                    conversion_times.append((dst_path.name, file_time))
-                
-                progress_bar.progress((i + 1) / len(src_paths))
-
-            except KeyError:
-                errors.append(f"{src_path.name}: Conversion not available")
-            except Exception as e:
-                errors.append(f"{src_path.name}: {str(e)}")
+    if st.button("Convert All") and uploaded_files:
+        previous = st.session_state.pop("convert_job", None)
+        if previous is not None:
+            previous.discard()  # frees the last job's output files
+        try:
+            # queued on the shared worker pool; the job lives in session state,
+            # so widget changes (reruns) no longer throw the work away
+            st.session_state.convert_job = get_job_queue().submit(
+                [(f.name, f.getvalue()) for f in uploaded_files],
+                normalize_ext(from_ext),
+                normalize_ext(to_ext),
+                profile=profile,
+            )
+        except KeyError:
+            st.error(f"Conversion from .{from_ext} to .{to_ext} is not available")
 
-        # Show results
-        total_time = time.time() - start_time
-        status_text.text(f"✅ Conversion complete in {total_time:.2f}s!")
-        
-        if converted_files:
-            st.success(f"Successfully converted {len(converted_files)} file(s)")
-            
-            # Show conversion times
-            if conversion_times:
-                with st.expander("⏱️ Conversion Times", expanded=False):
-                    for file_name, file_time in conversion_times:
-                        st.write(f"• **{file_name}** - {file_time:.3f}s")
-                    st.write(f"**Total time:** {total_time:.2f}s")
-            
-            st.subheader("Download Options")
-            
-            # Multiple files: show both options
-            if len(converted_files) > 1:
-                # ZIP download
-                zip_buffer = io.BytesIO()
-                with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-                    for file_path in converted_files:
-                        zip_file.write(file_path, file_path.name)
-                
-                st.download_button(
-                    label=f"📦 Download All as ZIP ({len(converted_files)} files)",
-                    data=zip_buffer.getvalue(),
-                    file_name=f"converted_files.zip",
-                    mime="application/zip"
-                )
-                
-                # Individual downloads
-                st.write("**Or download individually:**")
-                cols = st.columns(min(3, len(converted_files)))
-                
-                for i, file_path in enumerate(converted_files):
-                    with cols[i % 3]:
-                        with open(file_path, "rb") as f:
-                            st.download_button(
-                                label=f"📄 {file_path.name}",
-                                data=f,
-                                file_name=file_path.name,
-                                key=f"download_{file_path.name}",
-                                use_container_width=True
-                            )
-            
-            # Single file: just direct download
-            else:
-                with open(converted_files[0], "rb") as f:
-                    st.download_button(
-                        label=f"📥 Download {converted_files[0].name}",
-                        data=f,
-                        file_name=converted_files[0].name
-                    )
-        
-        if errors:
-            st.error("⚠️ Some files failed:")
-            for error in errors:
-                st.write(f"  • {error}")
+    job = st.session_state.get("convert_job")
+    if job is not None:
+        if job.done:
+            show_job(job)
+        else:
+            watch_job()
@@ -0,0 +1,266 @@
+"""Time every CONVERSIONS pair on synthetic inputs and compare with a baseline.
+
+Usage:
+    python benchmarks/all_pairs.py                              # sizes S and M, every pair
+    python benchmarks/all_pairs.py --sizes S M L --runs 3 --output results.json
+    python benchmarks/all_pairs.py --baseline baseline.json --threshold 0.25
+    python benchmarks/all_pairs.py --pairs csv:json "*:pdf" --list
+
+Inputs are generated offline with fixed seeds: tabular CSV/JSON/TOON/YAML/XML
+(id, name, value, flag records), numeric NPY/XML/YAML for the pairs that need
+numbers, text/Markdown/HTML lines, PDF and DOCX made from that text, PNG/JPEG/
+WebP images and, when ffmpeg is available, WAV/MP3 audio. A size is a number
+of records (lines, pixel rows, or milliseconds of audio); S, M and L are
+1000, 10000 and 100000.
+
+Each pair and size runs in a fresh interpreter, which reports the median wall
+time of --runs conversions, its peak RSS and (with --tracemalloc, in one
+extra run) the peak of Python allocations. Throughput is input MB/s and
+records/s.
+
+--output writes the results as JSON; keep one as the baseline. With
+--baseline, a pair whose time or peak RSS grew by more than --threshold
+(and by more than --min-delta seconds, to ignore noise on tiny inputs) is
+flagged, and the exit status is 1.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from conversions import CONVERSIONS  # noqa: E402
+from conversions import json_codec, yaml_codec  # noqa: E402
+from conversions.audio_pipe import ffmpeg_path  # noqa: E402
+
+SIZES = {"S": 1000, "M": 10000, "L": 100000}
+
+# pairs whose input has to be numeric; everything else gets the tabular/text input of its format
+NUMERIC_INPUT = {(".xml", ".npy"): ".xml", (".yaml", ".npy"): ".yaml", (".yml", ".npy"): ".yml"}
+
+CHILD = """
+import json, resource, sys, time, tracemalloc
+from pathlib import Path
+from conversions import CONVERSIONS
+func = CONVERSIONS[(sys.argv[1], sys.argv[2])]
+src, dst, runs, trace = Path(sys.argv[3]), Path(sys.argv[4]), int(sys.argv[5]), sys.argv[6] == "1"
+times = []
+for _ in range(runs):
+    start = time.perf_counter()
+    func(src, dst)
+    times.append(time.perf_counter() - start)
+traced = None
+if trace:
+    tracemalloc.start()
+    func(src, dst)
+    traced = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+# VmHWM is this program's own peak; ru_maxrss keeps the parent's across exec on Linux
+rss = None
+try:
+    with open("/proc/self/status") as f:
+        rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    pass
+if rss is None:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss if sys.platform == "darwin" else rss * 1024   # bytes on macOS, KiB elsewhere
+print(json.dumps({"seconds": times, "rss": rss, "traced": traced}))
+"""
+
+
+# --- inputs -----------------------------------------------------------------
+
+def _records(n: int):
+    rng = np.random.default_rng(0)
+    values = rng.random(n).round(6).tolist()
+    return [{"id": str(i), "name": f"sensor-{i % 997}", "value": str(v), "flag": "yes" if i % 3 else "no"}
+            for i, v in enumerate(values)]
+
+
+def _numbers(n: int) -> np.ndarray:
+    return np.random.default_rng(0).random((n, 8)).round(6)
+
+
+def _lines(n: int):
+    words = "the quick brown fox jumps over the lazy dog while numbers like 3.14 and 42 go by".split()
+    return [" ".join(words[(i + k) % len(words)] for k in range(8 + i % 9)) for i in range(n)]
+
+
+def _image(n: int, path: Path) -> int:
+    from PIL import Image
+    side = max(64, int(n ** 0.5 * 8))
+    yy, xx = np.mgrid[0:side, 0:side]
+    rgb = np.stack([xx * 255 // side, yy * 255 // side, (xx ^ yy) & 255], axis=-1)
+    rgb = np.clip(rgb + np.random.default_rng(0).integers(-12, 12, rgb.shape), 0, 255).astype(np.uint8)
+    Image.fromarray(rgb).save(path)
+    return side
+
+
+def make_input(ext: str, n: int, directory: Path, numeric: bool = False):
+    """Write a synthetic ext input with n records into directory; returns (path, records)."""
+    path = directory / f"{'numeric' if numeric else 'data'}-{n}{ext}"
+    if path.exists():
+        return path, n
+    if numeric and ext == ".xml":
+        arr = _numbers(n)
+        np.save(directory / "tmp.npy", arr)
+        CONVERSIONS[(".npy", ".xml")](directory / "tmp.npy", path)
+    elif numeric:
+        with open(path, "w", encoding="utf-8") as f:
+            yaml_codec.dump(_numbers(n).tolist(), f, backend="libyaml" if "libyaml" in yaml_codec.BACKENDS else None)
+    elif ext == ".csv":
+        rows = _records(n)
+        path.write_text("id,name,value,flag\n" + "".join(",".join(r.values()) + "\n" for r in rows),
+                        encoding="utf-8")
+    elif ext in (".json", ".toon"):
+        with open(path, "w", encoding="utf-8") as f:
+            json_codec.dump(_records(n), f, indent=2 if ext == ".json" else None)
+    elif ext in (".yaml", ".yml"):
+        with open(path, "w", encoding="utf-8") as f:
+            yaml_codec.dump(_records(n), f, backend="libyaml" if "libyaml" in yaml_codec.BACKENDS else None)
+    elif ext == ".xml":
+        rows = "".join(f"<row><id>{r['id']}</id><name>{r['name']}</name><value>{r['value']}</value>"
+                       f"<flag>{r['flag']}</flag></row>" for r in _records(n))
+        path.write_text(f'<?xml version="1.0" encoding="utf-8"?>\n<root>{rows}</root>', encoding="utf-8")
+    elif ext == ".npy":
+        np.save(path, _numbers(n))
+    elif ext == ".txt":
+        path.write_text("\n".join(_lines(n)) + "\n", encoding="utf-8")
+    elif ext == ".md":
+        path.write_text("".join(f"## Section {i}\n\n{line}, *emphasis* and `code`.\n\n" if i % 10 == 0
+                                else f"- {line}\n" for i, line in enumerate(_lines(n))), encoding="utf-8")
+    elif ext == ".html":
+        body = "".join(f"<p>{line} <b>{i}</b></p>\n" for i, line in enumerate(_lines(n)))
+        path.write_text(f"<html><body>\n{body}</body></html>\n", encoding="utf-8")
+    elif ext in (".pdf", ".docx"):
+        text, _ = make_input(".txt", n, directory)
+        CONVERSIONS[(".txt", ext)](text, path)
+    elif ext in (".png", ".jpg", ".jpeg", ".webp"):
+        return path, _image(n, path)
+    elif ext in (".wav", ".mp3"):
+        import wave
+        wav = directory / f"data-{n}.wav"
+        if not wav.exists():
+            frames = n * 44                   # n milliseconds at 44.1 kHz
+            tone = (np.sin(np.arange(frames) * 2 * np.pi * 440 / 44100) * 12000).astype("<i2")
+            with wave.open(str(wav), "wb") as w:
+                w.setnchannels(2)
+                w.setsampwidth(2)
+                w.setframerate(44100)
+                w.writeframes(np.repeat(tone, 2).tobytes())
+        if ext == ".mp3":
+            CONVERSIONS[(".wav", ".mp3")](wav, path)
+    else:
+        raise ValueError(f"No input generator for {ext}")
+    return path, n
+
+
+# --- running and reporting ----------------------------------------------------
+
+def run_pair(pair, src: Path, dst: Path, runs: int, trace: bool) -> dict:
+    cmd = [sys.executable, "-c", CHILD, pair[0], pair[1], str(src), str(dst), str(runs), "1" if trace else "0"]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit status {proc.returncode}"}
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {"seconds": statistics.median(report["seconds"]), "rss": report["rss"], "traced": report["traced"]}
+
+
+def compare(result: dict, base: dict, threshold: float, min_delta: float) -> list:
+    """Names of the measurements that regressed against base."""
+    flags = []
+    if "seconds" in result and "seconds" in base:
+        grew = result["seconds"] - base["seconds"]
+        if grew > min_delta and grew > threshold * base["seconds"]:
+            flags.append(f"time +{grew / base['seconds']:.0%}")
+    if result.get("rss") and base.get("rss") and result["rss"] > (1 + threshold) * base["rss"]:
+        flags.append(f"rss +{result['rss'] / base['rss'] - 1:.0%}")
+    if "error" in result and "error" not in base:
+        flags.append("now fails")
+    return flags
+
+
+def selected(pair, patterns) -> bool:
+    name = f"{pair[0][1:]}:{pair[1][1:]}"
+    return not patterns or any(fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["S", "M"], help="S, M, L or a record count")
+    parser.add_argument("--pairs", nargs="*", default=[], help="from:to patterns, e.g. csv:json '*:pdf'")
+    parser.add_argument("--runs", type=int, default=1, help="conversions per measurement (median is kept)")
+    parser.add_argument("--tracemalloc", action="store_true", help="also record peak Python allocations")
+    parser.add_argument("--output", type=Path, help="write the results as JSON (e.g. to keep as a baseline)")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth before flagging (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.02, help="ignore time changes below this many seconds")
+    parser.add_argument("--list", action="store_true", help="only list the selected pairs")
+    args = parser.parse_args()
+
+    pairs = [p for p in sorted(CONVERSIONS) if selected(p, args.pairs)]
+    if args.list:
+        print("\n".join(f"{a[1:]}:{b[1:]}" for a, b in pairs))
+        return
+    have_ffmpeg = ffmpeg_path() is not None
+    sizes = [(s, SIZES[s] if s in SIZES else int(s)) for s in args.sizes]
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"] if args.baseline else {}
+
+    results = {}
+    regressions = 0
+    print(f"{'pair':<14} {'size':>6} {'seconds':>9} {'MB/s':>8} {'records/s':>11} {'RSS MB':>8} "
+          f"{'traced MB':>9}  vs baseline")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for label, n in sizes:
+            for pair in pairs:
+                key = f"{pair[0][1:]}:{pair[1][1:]}@{label}"
+                if {".wav", ".mp3"} & set(pair) and not have_ffmpeg:
+                    print(f"{key.split('@')[0]:<14} {label:>6}  skipped (no ffmpeg)")
+                    continue
+                try:
+                    numeric = pair in NUMERIC_INPUT
+                    src, records = make_input(pair[0], n, tmp, numeric)
+                except Exception as e:
+                    result = {"error": f"input: {type(e).__name__}: {e}"}
+                else:
+                    result = run_pair(pair, src, tmp / f"out{pair[1]}", args.runs, args.tracemalloc)
+                    result.update(bytes=src.stat().st_size, records=records)
+                results[key] = result
+
+                flags = compare(result, baseline[key], args.threshold, args.min_delta) if key in baseline else []
+                regressions += bool(flags)
+                note = "REGRESSION: " + ", ".join(flags) if flags else ("ok" if key in baseline else "")
+                if "error" in result:
+                    print(f"{key.split('@')[0]:<14} {label:>6}  error: {result['error']}  {note}")
+                    continue
+                seconds = max(result["seconds"], 1e-9)
+                traced = f"{result['traced'] / 1e6:9.1f}" if result["traced"] is not None else f"{'-':>9}"
+                print(f"{key.split('@')[0]:<14} {label:>6} {result['seconds']:9.3f} "
+                      f"{result['bytes'] / 1e6 / seconds:8.1f} {records / seconds:11.0f} "
+                      f"{result['rss'] / 1e6:8.1f} {traced}  {note}")
+
+    if args.output:
+        meta = {"python": platform.python_version(), "platform": platform.platform(),
+                "cpus": os.cpu_count(), "date": time.strftime("%Y-%m-%d %H:%M:%S"), "runs": args.runs}
+        args.output.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+    if baseline:
+        print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
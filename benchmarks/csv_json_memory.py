@@ -0,0 +1,82 @@
+"""Peak memory of csv_to_json across input sizes.
+
+Usage:
+    python benchmarks/csv_json_memory.py                 # 10 MB, 100 MB, 1 GB
+    python benchmarks/csv_json_memory.py --sizes 10M 10G
+
+Each size is converted in a fresh subprocess that reports its own peak RSS,
+so the numbers don't leak into each other. With the streaming writer the RSS
+column should stay flat as the input grows.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+CHILD = """
+import resource, sys
+from pathlib import Path
+from conversions.csv_json import csv_to_json
+csv_to_json(Path(sys.argv[1]), Path(sys.argv[2]))
+# VmHWM is this program's own peak; ru_maxrss keeps the parent's across exec on Linux
+rss = None
+try:
+    with open("/proc/self/status") as f:
+        rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    pass
+if rss is None:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss if sys.platform == "darwin" else rss * 1024   # bytes on macOS, KiB elsewhere
+print(rss)
+"""
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def make_csv(path: Path, size: int) -> int:
+    """Write a synthetic CSV of about `size` bytes; returns the row count."""
+    row = "{i},sensor-{m},{i}.{m:03d},some free text for row {i}\n"
+    rows = 0
+    written = 0
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        written += f.write("id,name,value,comment\n")
+        while written < size:
+            written += f.write(row.format(i=rows, m=rows % 1000))
+            rows += 1
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["10M", "100M", "1G"])
+    args = parser.parse_args()
+
+    print(f"{'input':>10} {'rows':>12} {'seconds':>8} {'peak RSS':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "in.csv"
+        dst = Path(tmp) / "out.json"
+        for size_text in args.sizes:
+            rows = make_csv(src, parse_size(size_text))
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, "-c", CHILD, str(src), str(dst)],
+                                 cwd=ROOT, check=True, capture_output=True, text=True)
+            seconds = time.perf_counter() - start
+            rss_mb = int(out.stdout.split()[-1]) / (1 << 20)
+            print(f"{size_text:>10} {rows:>12} {seconds:>8.2f} {rss_mb:>8.1f}MB")
+            dst.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""One source image → PNG + JPEG + WebP (+ thumbnails): per-pair converters vs fan_out().
+
+Usage:
+    python benchmarks/image_fanout.py [--size 3000x2000] [--runs 3] [--thumbs 256 128]
+
+"per-pair" decodes and mode-converts the source once per output, like running
+the registry converters one after another; "fan_out" decodes once and encodes
+on threads.
+"""
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from conversions.image_pipeline import FORMATS, ImageTarget, decode, fan_out, target_mode  # noqa: E402
+
+EXTS = [".png", ".jpg", ".webp"]
+
+
+def per_pair(src: Path, targets) -> None:
+    for t in targets:
+        im = decode(src)                                        # every output decodes again
+        im = im.convert(target_mode(im, FORMATS[t.ext]))
+        if t.size:
+            im.thumbnail(t.size)
+        im.save(io.BytesIO(), FORMATS[t.ext])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="3000x2000")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--thumbs", type=int, nargs="*", default=[256, 128])
+    args = parser.parse_args()
+    w, h = map(int, args.size.split("x"))
+
+    # smooth gradient plus noise: compresses like a photo, not like a flat fill
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:h, 0:w]
+    rgb = np.stack([xx * 255 // w, yy * 255 // h, (xx + yy) * 255 // (w + h)], axis=-1)
+    rgb = np.clip(rgb + rng.integers(-20, 20, rgb.shape), 0, 255).astype(np.uint8)
+
+    targets = [ImageTarget(e) for e in EXTS] + [ImageTarget(e, (s, s)) for s in args.thumbs for e in EXTS]
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "src.png"
+        Image.fromarray(rgb).save(src)
+
+        for name, run in [("per-pair", lambda: per_pair(src, targets)), ("fan_out", lambda: fan_out(src, targets))]:
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+            print(f"{name:<9} {len(targets)} outputs  median {statistics.median(times):6.2f}s  min {min(times):6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Encode time and output size of every encoder profile on a synthetic corpus.
+
+Usage:
+    python benchmarks/image_profiles.py [--size 1600x1200] [--runs 3] [--profiles fast smallest]
+
+The corpus has three images that compress very differently: a photo-like
+gradient with noise, a flat graphic with transparency, and pure noise. Each
+profile encodes each image to JPEG, WebP and PNG; the report gives the median
+encode time in ms per megapixel and the output size in bytes.
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+from conversions.image_profiles import PROFILES, save_params  # noqa: E402
+
+FORMATS = ["JPEG", "WEBP", "PNG"]
+
+
+def corpus(w: int, h: int):
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:h, 0:w]
+    rgb = np.stack([xx * 255 // w, yy * 255 // h, (xx + yy) * 255 // (w + h)], axis=-1)
+    photo = np.clip(rgb + rng.integers(-20, 20, rgb.shape), 0, 255).astype(np.uint8)
+    yield "photo", Image.fromarray(photo)
+
+    graphic = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(graphic)
+    for i in range(12):
+        x, y = (i * 131) % w, (i * 97) % h
+        draw.rectangle([x, y, x + w // 4, y + h // 5], fill=(40 * i % 256, 90, 200, 255))
+        draw.ellipse([y % w, x % h, y % w + w // 6, x % h + h // 6], fill=(230, 30 * i % 256, 60, 160))
+    yield "graphic", graphic
+
+    yield "noise", Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8))
+
+
+def encode(im: Image.Image, fmt: str, params: dict) -> bytes:
+    buf = io.BytesIO()
+    im.save(buf, fmt, **params)
+    return buf.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1600x1200")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+    w, h = map(int, args.size.split("x"))
+    megapixels = w * h / 1e6
+
+    print(f"{'image':<8} {'format':<6} {'profile':<9} {'ms/MP':>8} {'bytes':>10}")
+    for name, im in corpus(w, h):
+        for fmt in FORMATS:
+            # same mode conversion as the converters: JPEG has no alpha
+            src = im.convert("RGB") if fmt == "JPEG" else im
+            for profile in args.profiles:
+                params = save_params(fmt, profile)
+                times, size = [], 0
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    size = len(encode(src, fmt, params))
+                    times.append(time.perf_counter() - start)
+                ms_per_mp = statistics.median(times) * 1000 / megapixels
+                print(f"{name:<8} {fmt:<6} {profile:<9} {ms_per_mp:8.1f} {size:>10,}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
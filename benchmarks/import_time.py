@@ -0,0 +1,61 @@
+"""Cold-start cost of the converter registry.
+
+Usage:
+    python benchmarks/import_time.py [--runs 7]
+
+Every measurement is a fresh interpreter, so nothing is cached between runs:
+- "import converter": what every CLI call pays before doing any work
+- "json -> yaml": import plus one small light-weight conversion
+- "all converters": every converter module loaded, i.e. the old eager registry
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CASES = {
+    "import converter": "import converter",
+    "json -> yaml": (
+        "import sys, converter\n"
+        "from pathlib import Path\n"
+        "from conversions import CONVERSIONS\n"
+        "CONVERSIONS[('.json', '.yaml')](Path(sys.argv[1]), Path(sys.argv[2]))"
+    ),
+    "all converters": (
+        "import converter\n"
+        "from conversions import CONVERSIONS\n"
+        "for key in CONVERSIONS: CONVERSIONS[key]"
+    ),
+}
+
+
+def run_once(code: str, args) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-W", "ignore", "-c", code, *args], cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "in.json"
+        src.write_text('{"name": "demo", "values": [1, 2, 3]}', encoding="utf-8")
+        files = [str(src), str(Path(tmp) / "out.yaml")]
+
+        baseline = run_once("pass", [])
+        print(f"{'case':<18} {'median':>9} {'min':>9}   (bare interpreter ≈ {baseline * 1000:.0f} ms)")
+        for name, code in CASES.items():
+            times = [run_once(code, files) for _ in range(args.runs)]
+            print(f"{name:<18} {statistics.median(times) * 1000:>7.0f}ms {min(times) * 1000:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
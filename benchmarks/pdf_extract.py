@@ -0,0 +1,51 @@
+"""Serial vs page-parallel PDF text extraction, with a per-page timing report.
+
+Usage:
+    python benchmarks/pdf_extract.py [some.pdf] [--pages 1-200] [--jobs 1 2 4 0]
+
+Without a PDF a synthetic one is rendered first (--lines of text, about 46
+lines per page). Each --jobs value runs pdf_to_txt once (0 = one per CPU);
+the report lists the slowest pages of the last run.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from conversions.pdf_extract import timing_summary  # noqa: E402
+from conversions.pdf_txt import pdf_to_txt  # noqa: E402
+from conversions.txt_pdf import txt_to_pdf  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="PDF to extract (default: a generated one)")
+    parser.add_argument("--pages", help="page range, e.g. 1-200")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 0])
+    parser.add_argument("--lines", type=int, default=50_000, help="size of the generated PDF")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = Path(args.pdf) if args.pdf else tmp / "bench.pdf"
+        if not args.pdf:
+            text = tmp / "bench.txt"
+            text.write_text("\n".join(f"{i:>7} the quick brown fox jumps over the lazy dog" for i in range(args.lines)),
+                            encoding="utf-8")
+            txt_to_pdf(text, src)
+
+        timings = []
+        for jobs in args.jobs:
+            timings = []
+            start = time.perf_counter()
+            pdf_to_txt(src, tmp / "out.txt", pages=args.pages, jobs=jobs, on_page=timings.append)
+            print(f"jobs={jobs:<3} {len(timings):>6} pages  {time.perf_counter() - start:8.2f}s wall")
+        print()
+        print(timing_summary(timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Load and dump time of the YAML backends (pure Python vs libyaml).
+
+Usage:
+    python benchmarks/yaml_codec.py [some.yaml] [--mb 200] [--runs 1]
+
+Without a file a config-like document of about --mb megabytes is generated
+first (nested mappings of services with settings, lists and some non-ASCII
+text). Each backend loads it and dumps it back; the report gives the times
+and whether the dumped text is identical to the pure-Python emitter's.
+"""
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from conversions import yaml_codec  # noqa: E402
+
+
+def config(mb: float) -> dict:
+    services = {}
+    i = 0
+    size = 0
+    while size < mb * 1e6:
+        entry = {
+            "image": f"registry.example.com/team/service-{i}:1.{i % 50}.{i % 7}",
+            "replicas": i % 5 + 1,
+            "enabled": i % 3 != 0,
+            "cpu": round(0.25 * (i % 8 + 1), 2),
+            "env": {f"VAR_{k}": f"value {i}-{k}" for k in range(8)},
+            "ports": [8000 + i % 1000, 9000 + i % 1000],
+            "description": f"Dienst Nr. {i} für die Verarbeitung — zone {i % 12}",
+        }
+        services[f"service-{i}"] = entry
+        size += 420           # roughly the YAML size of one entry
+        i += 1
+    return {"version": 3, "services": services}
+
+
+def timed(run, runs: int):
+    times, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("yaml", nargs="?", help="YAML file to load (default: a generated one)")
+    parser.add_argument("--mb", type=float, default=200, help="size of the generated document")
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(args.yaml) if args.yaml else Path(tmp) / "bench.yaml"
+        if not args.yaml:
+            with open(src, "w", encoding="utf-8") as f:
+                yaml_codec.dump(config(args.mb), f, backend="libyaml" if "libyaml" in yaml_codec.BACKENDS else None)
+        print(f"{src.stat().st_size / 1e6:.1f} MB, backends: {', '.join(yaml_codec.BACKENDS)}")
+
+        reference = None
+        for backend in ["python"] + [b for b in yaml_codec.BACKENDS if b != "python"]:
+            def load():
+                with open(src, encoding="utf-8") as f:
+                    return yaml_codec.load(f, backend=backend)
+            load_s, data = timed(load, args.runs)
+
+            def dump():
+                out = io.StringIO()
+                yaml_codec.dump(data, out, backend=backend)
+                return out.getvalue()
+            dump_s, text = timed(dump, args.runs)
+            if reference is None:
+                reference = text
+            same = "same text" if text == reference else "different text"
+            print(f"{backend:<8} load {load_s:8.2f}s  dump {dump_s:8.2f}s  ({same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,102 +1,134 @@
-from .md_html import md_to_html
-from .html_md import html_to_md
-from .csv_json import csv_to_json
-from .json_csv import json_to_csv
-from .csv_npy import csv_to_npy
-from .npy_csv import npy_to_csv
-from .image_webp import any_to_webp, webp_to_any
-from .docx_txt import docx_to_txt, txt_to_docx
-from .txt_pdf import txt_to_pdf
-from .pdf_txt import pdf_to_txt
-from .image_png_jpeg import png_to_jpeg, jpeg_to_png
-from .json_yaml import json_to_yaml, yaml_to_json
-from .yaml_npy import yaml_to_npy, npy_to_yaml
-from .yaml_csv import yaml_to_csv, csv_to_yaml
-from .json_toon import json_to_toon, toon_to_json
-from .html_pdf import html_to_pdf, pdf_to_html
-from .xml_json import xml_to_json, json_to_xml
-from .xml_csv import xml_to_csv, csv_to_xml
-from .xml_yaml import xml_to_yaml, yaml_to_xml
-from .xml_npy import xml_to_npy, npy_to_xml
-from .audio_wav_mp3 import wav_to_mp3, mp3_to_wav
-
-CONVERSIONS = {
-    (".md", ".html"): md_to_html,
-    (".html", ".md"): html_to_md,
-
-    (".csv", ".json"): csv_to_json,
-    (".json", ".csv"): json_to_csv,
-
-    (".csv", ".npy"): csv_to_npy,
-    (".npy", ".csv"): npy_to_csv,
-
-    (".png", ".webp"): any_to_webp,
-    (".jpg", ".webp"): any_to_webp,
-    (".jpeg", ".webp"): any_to_webp,
-    (".webp", ".png"): webp_to_any,
-    (".webp", ".jpg"): webp_to_any,
-    (".webp", ".jpeg"): webp_to_any,
-
-    (".docx", ".txt"): docx_to_txt,
-    (".txt", ".docx"): txt_to_docx,
-
-    (".txt", ".pdf"): txt_to_pdf,
-
-    (".pdf", ".txt"): pdf_to_txt,
+from collections.abc import Mapping
+from importlib import import_module
+from typing import Callable, Dict, Iterator, Tuple
+
+# (from_ext, to_ext) → "module:function" inside this package. Modules are only
+# imported when a pair is first looked up, so a JSON → YAML job never loads
+# reportlab, PIL or numpy. Every function takes (src, dst), each a path or a
+# binary file object (see streams).
+_REGISTRY = {
+    (".md", ".html"): "md_html:md_to_html",
+    (".html", ".md"): "html_md:html_to_md",
+
+    (".csv", ".json"): "csv_json:csv_to_json",
+    (".json", ".csv"): "json_csv:json_to_csv",
+
+    (".csv", ".npy"): "csv_npy:csv_to_npy",
+    (".npy", ".csv"): "npy_csv:npy_to_csv",
+
+    (".png", ".webp"): "image_webp:any_to_webp",
+    (".jpg", ".webp"): "image_webp:any_to_webp",
+    (".jpeg", ".webp"): "image_webp:any_to_webp",
+    (".webp", ".png"): "image_webp:webp_to_png",
+    (".webp", ".jpg"): "image_webp:webp_to_jpeg",
+    (".webp", ".jpeg"): "image_webp:webp_to_jpeg",
+
+    (".docx", ".txt"): "docx_txt:docx_to_txt",
+    (".txt", ".docx"): "docx_txt:txt_to_docx",
+
+    (".txt", ".pdf"): "txt_pdf:txt_to_pdf",
+
+    (".pdf", ".txt"): "pdf_txt:pdf_to_txt",
 
     # PNG ↔ JPG/JPEG
-    (".png", ".jpg"): png_to_jpeg,
-    (".png", ".jpeg"): png_to_jpeg,
-    (".jpg", ".png"): jpeg_to_png,
-    (".jpeg", ".png"): jpeg_to_png,
+    (".png", ".jpg"): "image_png_jpeg:png_to_jpeg",
+    (".png", ".jpeg"): "image_png_jpeg:png_to_jpeg",
+    (".jpg", ".png"): "image_png_jpeg:jpeg_to_png",
+    (".jpeg", ".png"): "image_png_jpeg:jpeg_to_png",
 
     # JSON → YAML/YML
-    (".json", ".yaml"): json_to_yaml,
-    (".json", ".yml"): json_to_yaml,
+    (".json", ".yaml"): "json_yaml:json_to_yaml",
+    (".json", ".yml"): "json_yaml:json_to_yaml",
 
     # YAML/YML → JSON
-    (".yaml", ".json"): yaml_to_json,
-    (".yml", ".json"): yaml_to_json,
+    (".yaml", ".json"): "json_yaml:yaml_to_json",
+    (".yml", ".json"): "json_yaml:yaml_to_json",
 
     # HTML ↔ PDF (text-only rendering)
-    (".html", ".pdf"): html_to_pdf,
-    (".pdf", ".html"): pdf_to_html,
+    (".html", ".pdf"): "html_pdf:html_to_pdf",
+    (".pdf", ".html"): "html_pdf:pdf_to_html",
 
     # XML ↔ JSON
-    (".xml", ".json"): xml_to_json,
-    (".json", ".xml"): json_to_xml,
+    (".xml", ".json"): "xml_json:xml_to_json",
+    (".json", ".xml"): "xml_json:json_to_xml",
 
     # XML ↔ CSV
-    (".xml", ".csv"): xml_to_csv,
-    (".csv", ".xml"): csv_to_xml,
+    (".xml", ".csv"): "xml_csv:xml_to_csv",
+    (".csv", ".xml"): "xml_csv:csv_to_xml",
 
     # XML ↔ YAML/YML
-    (".xml", ".yaml"): xml_to_yaml,
-    (".xml", ".yml"): xml_to_yaml,
-    (".yaml", ".xml"): yaml_to_xml,
-    (".yml", ".xml"): yaml_to_xml,
+    (".xml", ".yaml"): "xml_yaml:xml_to_yaml",
+    (".xml", ".yml"): "xml_yaml:xml_to_yaml",
+    (".yaml", ".xml"): "xml_yaml:yaml_to_xml",
+    (".yml", ".xml"): "xml_yaml:yaml_to_xml",
 
     # XML ↔ NPY
-    (".xml", ".npy"): xml_to_npy,
-    (".npy", ".xml"): npy_to_xml,
+    (".xml", ".npy"): "xml_npy:xml_to_npy",
+    (".npy", ".xml"): "xml_npy:npy_to_xml",
 
     # YAML/YML ↔ NPY
-    (".yaml", ".npy"): yaml_to_npy,
-    (".yml", ".npy"): yaml_to_npy,
-    (".npy", ".yaml"): npy_to_yaml,
-    (".npy", ".yml"): npy_to_yaml,
+    (".yaml", ".npy"): "yaml_npy:yaml_to_npy",
+    (".yml", ".npy"): "yaml_npy:yaml_to_npy",
+    (".npy", ".yaml"): "yaml_npy:npy_to_yaml",
+    (".npy", ".yml"): "yaml_npy:npy_to_yaml",
 
     # YAML/YML ↔ CSV
-    (".yaml", ".csv"): yaml_to_csv,
-    (".yml", ".csv"): yaml_to_csv,
-    (".csv", ".yaml"): csv_to_yaml,
-    (".csv", ".yml"): csv_to_yaml,
+    (".yaml", ".csv"): "yaml_csv:yaml_to_csv",
+    (".yml", ".csv"): "yaml_csv:yaml_to_csv",
+    (".csv", ".yaml"): "yaml_csv:csv_to_yaml",
+    (".csv", ".yml"): "yaml_csv:csv_to_yaml",
 
     # JSON ↔ TOON (minified JSON)
-    (".json", ".toon"): json_to_toon,
-    (".toon", ".json"): toon_to_json,
+    (".json", ".toon"): "json_toon:json_to_toon",
+    (".toon", ".json"): "json_toon:toon_to_json",
 
     # WAV ↔ MP3
-    (".wav", ".mp3"): wav_to_mp3,
-    (".mp3", ".wav"): mp3_to_wav,
+    (".wav", ".mp3"): "audio_wav_mp3:wav_to_mp3",
+    (".mp3", ".wav"): "audio_wav_mp3:mp3_to_wav",
 }
+
+
+class _LazyConversions(Mapping):
+    """Read-only mapping of (from_ext, to_ext) → conversion function.
+
+    Behaves like the old CONVERSIONS dict, but each converter module is
+    imported on first lookup and cached. Membership tests, len() and
+    iterating keys never import anything.
+    """
+
+    def __init__(self, specs: Dict[Tuple[str, str], str]):
+        self._specs = specs
+        self._funcs: Dict[Tuple[str, str], Callable] = {}
+
+    def __getitem__(self, key: Tuple[str, str]) -> Callable:
+        func = self._funcs.get(key)
+        if func is None:
+            module, name = self._specs[key].split(":")        # KeyError for unsupported pairs
+            func = getattr(import_module(f".{module}", __name__), name)
+            self._funcs[key] = func
+        return func
+
+    def __contains__(self, key) -> bool:
+        return key in self._specs
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} pairs)"
+
+
+CONVERSIONS = _LazyConversions(_REGISTRY)
+
+_EXPORTS = {spec.split(":")[1]: spec.split(":")[0] for spec in _REGISTRY.values()}
+_EXPORTS["webp_to_any"] = "image_webp"      # picks PNG/JPEG from dst's suffix
+
+
+def __getattr__(name: str):
+    # keeps `from conversions import csv_to_json` working without eager imports
+    if name in _EXPORTS:
+        return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,175 @@
+"""Stream audio through one ffmpeg process instead of decoding it into memory.
+
+pydub's AudioSegment holds the whole decoded signal as bytes (a 2-hour
+stereo recording is over 1 GB) and copies it again on export. AudioPipe runs
+ffmpeg with the input on stdin (or its path) and the output on stdout, and
+moves both in CHUNK_SIZE pieces, so memory use does not grow with the length
+of the recording.
+
+ffmpeg cannot go back and fill in the sizes of a WAV header it writes to a
+pipe; they are patched afterwards when the output is seekable and readable
+(files, BytesIO). Every conversion needs ffmpeg; without it run() raises
+RuntimeError before touching dst.
+"""
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+from .streams import Target, is_path
+
+CHUNK_SIZE = 1 << 20
+FORMATS = ("wav", "mp3")
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_path() -> Optional[str]:
+    """Full path of the ffmpeg binary (FFMPEG_BINARY or ffmpeg on PATH), or None."""
+    return shutil.which(os.environ.get("FFMPEG_BINARY", "ffmpeg"))
+
+
+def _pump(src: BinaryIO, dst: BinaryIO) -> None:
+    # feeds ffmpeg's stdin; ffmpeg exiting early (bad input) just ends the feed
+    try:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            dst.write(chunk)
+    except (BrokenPipeError, ValueError):
+        pass
+    finally:
+        try:
+            dst.close()
+        except BrokenPipeError:
+            pass
+
+
+def _fix_wav_sizes(fp: BinaryIO, start: int) -> None:
+    """Fill in the RIFF and data chunk sizes of the WAV written to fp from start on."""
+    end = fp.seek(0, os.SEEK_END)
+    fp.seek(start)
+    riff, _, wave_id = struct.unpack("<4sI4s", fp.read(12))
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        fp.seek(end)
+        return
+    fp.seek(start + 4)
+    fp.write(struct.pack("<I", min(end - start - 8, 0xFFFFFFFF)))
+    pos = start + 12
+    while pos + 8 <= end:
+        fp.seek(pos)
+        chunk_id, size = struct.unpack("<4sI", fp.read(8))
+        if chunk_id == b"data":
+            fp.seek(pos + 4)
+            fp.write(struct.pack("<I", min(end - pos - 8, 0xFFFFFFFF)))
+            break
+        pos += 8 + size + (size & 1)
+    fp.seek(end)
+
+
+@dataclass(frozen=True)
+class AudioPipe:
+    """A reusable ffmpeg conversion to fmt ("wav" or "mp3").
+
+    - bitrate: MP3 bitrate such as "192k" (ignored for WAV)
+    - sample_rate: output rate in Hz; default keeps the input's
+    - channels: output channel count; default keeps the input's
+
+    The ffmpeg command line is built once per pipe, so run_many() only
+    starts the processes.
+    """
+    fmt: str
+    bitrate: Optional[str] = "192k"
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+    def __post_init__(self):
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unsupported audio format: {self.fmt}")
+
+    @cached_property
+    def output_args(self) -> List[str]:
+        args = ["-vn", "-map_metadata", "-1"]
+        if self.channels:
+            args += ["-ac", str(self.channels)]
+        if self.sample_rate:
+            args += ["-ar", str(self.sample_rate)]
+        if self.fmt == "mp3":
+            args += ["-codec:a", "libmp3lame"]
+            if self.bitrate:
+                args += ["-b:a", self.bitrate]
+        else:
+            args += ["-codec:a", "pcm_s16le"]
+        return args + ["-f", self.fmt, "pipe:1"]
+
+    def run(self, src: Target, dst: Target, src_format: Optional[str] = None) -> None:
+        """Convert src into dst; each is a path or a binary file object.
+
+        src_format ("wav"/"mp3") tells ffmpeg what a stream src holds instead
+        of letting it guess; a path's format comes from the file. A path dst
+        is removed again if the conversion fails; a file object dst may hold
+        partial output.
+        """
+        if ffmpeg_path() is None:
+            raise RuntimeError("ffmpeg required: install it on PATH or set FFMPEG_BINARY")
+        with ExitStack() as stack:
+            out = stack.enter_context(open(dst, "w+b")) if is_path(dst) else dst
+            try:
+                start = out.tell() if out.seekable() and out.readable() else None
+                self._ffmpeg(src, out, src_format)
+                if self.fmt == "wav" and start is not None:
+                    _fix_wav_sizes(out, start)
+            except BaseException:
+                if is_path(dst):
+                    out.close()
+                    Path(dst).unlink(missing_ok=True)
+                raise
+
+    def _ffmpeg(self, src: Target, out: BinaryIO, src_format: Optional[str]) -> None:
+        # a path goes to ffmpeg as is (it can seek); a stream is fed through stdin
+        if is_path(src):
+            cmd = [ffmpeg_path(), "-hide_banner", "-loglevel", "error", "-nostdin", "-i", str(src)]
+        else:
+            fmt = ["-f", src_format] if src_format in FORMATS else []
+            cmd = [ffmpeg_path(), "-hide_banner", "-loglevel", "error", *fmt, "-i", "pipe:0"]
+        with tempfile.TemporaryFile() as errors:
+            proc = subprocess.Popen(cmd + self.output_args, stdin=None if is_path(src) else subprocess.PIPE,
+                                    stdout=subprocess.PIPE, stderr=errors)
+            feeder = None
+            if proc.stdin is not None:
+                feeder = threading.Thread(target=_pump, args=(src, proc.stdin), daemon=True)
+                feeder.start()
+            try:
+                for chunk in iter(lambda: proc.stdout.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+            finally:
+                proc.stdout.close()       # unblocks ffmpeg if writing out failed
+                proc.wait()
+                if feeder is not None:
+                    feeder.join()
+            if proc.returncode != 0:
+                errors.seek(0)
+                message = errors.read().decode("utf-8", "replace").strip().splitlines()
+                raise RuntimeError(f"ffmpeg failed: {message[-1] if message else proc.returncode}")
+
+    def run_many(self, pairs: Iterable[Tuple[Target, Target]], workers: int = 0) -> List[Optional[Exception]]:
+        """run() every (src, dst) pair, `workers` ffmpeg processes at a time (0 = one per CPU).
+
+        Returns one entry per pair, in order: None, or the exception it raised.
+        """
+        pairs = list(pairs)
+
+        def one(pair) -> Optional[Exception]:
+            try:
+                self.run(*pair)
+            except Exception as e:
+                return e
+            return None
+        # the threads only shuttle bytes; ffmpeg does the work in its own processes
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            return list(pool.map(one, pairs))
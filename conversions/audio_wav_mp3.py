@@ -1,14 +1,14 @@
-from pathlib import Path
-from pydub import AudioSegment
+from typing import Optional
 
+from .audio_pipe import AudioPipe
+from .streams import Target
 
-def wav_to_mp3(src: Path, dst: Path) -> None:
-    """WAV → MP3 (192 kbps). Requires ffmpeg on PATH."""
-    audio = AudioSegment.from_wav(str(src))
-    audio.export(str(dst), format="mp3", bitrate="192k")
 
+def wav_to_mp3(src: Target, dst: Target, bitrate: str = "192k", sample_rate: Optional[int] = None) -> None:
+    """WAV → MP3 (192 kbps), streamed through ffmpeg. Requires ffmpeg on PATH."""
+    AudioPipe("mp3", bitrate=bitrate, sample_rate=sample_rate).run(src, dst, src_format="wav")
 
-def mp3_to_wav(src: Path, dst: Path) -> None:
-    """MP3 → WAV (PCM). Requires ffmpeg on PATH."""
-    audio = AudioSegment.from_mp3(str(src))
-    audio.export(str(dst), format="wav")
+
+def mp3_to_wav(src: Target, dst: Target, sample_rate: Optional[int] = None) -> None:
+    """MP3 → WAV (16-bit PCM), streamed through ffmpeg. Requires ffmpeg on PATH."""
+    AudioPipe("wav", sample_rate=sample_rate).run(src, dst, src_format="mp3")
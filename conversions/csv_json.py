@@ -1,14 +1,61 @@
-from pathlib import Path
+from typing import Iterable, List
 import csv
-import json
 
+from . import json_codec
+from .json_codec import quote
+from .streams import Handoff, Target, keep, open_text, rewinder
 
-def csv_to_json(src: Path, dst: Path):
-    rows = []
 
-    with src.open(newline="", encoding="utf-8") as f:
+def _row_to_json(row: dict) -> str:
+    """One row as it appears inside json.dumps(rows, indent=2)."""
+    if json_codec.orjson is None and row and None not in row and None not in row.values():
+        # plain str → str row (the usual case): join pre-quoted pieces, much faster than json's indent=2
+        items = ",\n    ".join(f"{quote(k)}: {quote(v)}" for k, v in row.items())
+        return "{\n    " + items + "\n  }"
+    # orjson, or ragged rows carrying None keys/values or lists
+    return json_codec.dumps(row, indent=2).replace("\n", "\n  ")
+
+
+def rows_to_records(rows: Iterable[List[str]]) -> List[dict]:
+    """CSV rows (header first) → dicts, exactly as csv.DictReader builds them."""
+    rows = iter(rows)
+    header = next(rows, None)
+    records = []
+    if header is None:
+        return records
+    for row in rows:
+        if not row:
+            continue
+        record = dict(zip(header, row))
+        if len(row) > len(header):
+            record[None] = row[len(header):]
+        else:
+            for key in header[len(row):]:
+                record[key] = None
+        records.append(record)
+    return records
+
+
+def csv_to_json(src: Target, dst: Target):
+    """CSV → JSON array of row objects.
+
+    Rows are written one at a time, so memory stays at about one row no matter
+    how big the file is. Output is byte-for-byte what json.dumps(rows, indent=2)
+    would produce.
+    """
+    if isinstance(dst, Handoff):
+        # the next hop of a route takes the rows as they are
+        rewind = rewinder(src)
+        with open_text(src, newline="") as f:
+            if keep(dst, list(csv.DictReader(f)), json_codec.is_plain):
+                return
+        rewind()
+    with open_text(src, newline="") as f, open_text(dst, "w", buffering=1 << 20) as out:
         reader = csv.DictReader(f)
+        out.write("[")
+        empty = True
         for row in reader:
-            rows.append(row)
-
-    dst.write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+            out.write("\n  " if empty else ",\n  ")
+            out.write(_row_to_json(row))
+            empty = False
+        out.write("]" if empty else "\n]")
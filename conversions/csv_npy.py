@@ -1,27 +1,216 @@
-from pathlib import Path
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 import csv
 import numpy as np
 
+from .npy_emit import save_npy
+from .streams import Target, is_path, open_text, rewinder
 
-def csv_to_npy(src: Path, dst: Path):
-    rows = []
 
-    with src.open(newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if not row:
-                continue
+def _is_number(x: str) -> bool:
+    try:
+        float(x)
+        return True
+    except ValueError:
+        return x.strip() == ""  # an empty cell is a missing number, not text
 
-            numeric_values = []
-            for x in row:
+
+def _is_data(row: List[str]) -> bool:
+    # blank and whitespace-only lines are skipped, like np.loadtxt does
+    return bool(row) and (len(row) > 1 or bool(row[0].strip()))
+
+
+def _data_rows(f) -> Iterator[List[str]]:
+    return (row for row in csv.reader(f) if _is_data(row))
+
+
+def _numbered_rows(f, line0: int = 0) -> Iterator[Tuple[int, int, List[str]]]:
+    """(first line, last line, row) of every data row; lines are counted from line0 + 1."""
+    reader = csv.reader(f)
+    last = 0
+    for row in reader:
+        if _is_data(row):
+            yield line0 + last + 1, line0 + reader.line_num, row
+        last = reader.line_num
+
+
+def _looks_like_header(first: List[str], second: Optional[List[str]]) -> bool:
+    """header="auto": first is a header unless it has a number in a column that is numeric in second.
+
+    "id,name,value" above "1,x,2.5" is a header; "1,x,2" above "3,y,4" is data
+    (its text column is dropped later, not the row). Without a second row,
+    first is a header only if none of its cells is a number.
+    """
+    def number(x: str) -> bool:
+        return bool(x.strip()) and _is_number(x)
+
+    if second is None:
+        return not any(map(number, first))
+    return not any(number(x) and j < len(second) and _is_number(second[j]) for j, x in enumerate(first))
+
+
+def _pick_columns(usecols, names: Optional[List[str]], first: Optional[List[str]], width: int) -> List[int]:
+    if usecols is not None:
+        cols = []
+        for c in usecols:
+            if isinstance(c, str):
+                if names is None or c not in names:
+                    raise ValueError(f"Unknown column {c!r}")
+                cols.append(names.index(c))
+            else:
+                if not -width <= c < width:
+                    raise ValueError(f"Column index {c} out of range for {width} columns")
+                cols.append(c % width)
+        return cols
+    if first is None:
+        return list(range(width))
+    # default: keep the columns that are numeric in the first data row (text columns are dropped)
+    return [i for i, x in enumerate(first) if _is_number(x)]
+
+
+def _convert_block(chunk: List[List[str]], width: int, cols: List[int], dtype: np.dtype,
+                   lines: Sequence[int]) -> np.ndarray:
+    """Turn a block of CSV rows (starting on the given line numbers) into an array, whole columns at once."""
+    for i, row in enumerate(chunk):
+        if len(row) != width:
+            raise ValueError(f"Line {lines[i]} has {len(row)} fields, expected {width}")
+    block = np.array(chunk, dtype=str)[:, cols]
+    if dtype.kind in "fc":
+        block = np.where(np.char.str_len(np.char.strip(block)) == 0, "nan", block)
+    try:
+        return block.astype(dtype, order="C")
+    except ValueError:
+        # slow path only to point at the offending cell
+        for i, row in enumerate(block):
+            for j, x in enumerate(row):
                 try:
-                    numeric_values.append(float(x))
+                    np.array(x).astype(dtype)
                 except ValueError:
-                    # skip non numeric values (like headers or text columns)
-                    continue
+                    raise ValueError(f"Line {lines[i]}, column {cols[j]}: {str(x)!r} is not a valid {dtype}") from None
+        raise
+
+
+def _line_blocks(f, size: int) -> Iterator[List[str]]:
+    """Blocks of raw lines that never cut a quoted field spanning several lines."""
+    while True:
+        block = list(islice(f, size))
+        if not block:
+            return
+        quotes = sum(line.count('"') for line in block)
+        while quotes % 2:
+            line = f.readline()
+            if not line:
+                break
+            block.append(line)
+            quotes += line.count('"')
+        yield block
+
+
+def _count_rows(f, size: int) -> int:
+    total = 0
+    for lines in _line_blocks(f, size):
+        if any('"' in line for line in lines):
+            total += sum(1 for _ in _data_rows(lines))
+        else:
+            total += sum(1 for line in lines if line.strip())
+    return total
+
+
+def _parse_block(lines: List[str], width: int, cols: List[int], dtype: np.dtype, line0: int) -> np.ndarray:
+    # line0: file lines before this block, so errors point at the right line
+    if not any(line.strip() for line in lines):
+        return np.empty((0, len(cols)), dtype=dtype)
+    # fast path: NumPy's C tokenizer parses the whole block at once
+    usecols = None if cols == list(range(width)) else cols
+    # with usecols loadtxt ignores fields past the last used column, so check
+    # the field count of every row first (quoted commas: leave it to csv)
+    if usecols is None or not any('"' in line or (line.strip() and line.count(",") != width - 1)
+                                  for line in lines):
+        try:
+            block = np.loadtxt(lines, delimiter=",", quotechar='"', comments=None,
+                               usecols=usecols, dtype=dtype, ndmin=2)
+            if block.shape[1] == len(cols):
+                return block
+        except ValueError:
+            pass
+    # empty cells, ragged rows or bad values: redo the block with csv for NaNs and exact errors
+    numbered = list(_numbered_rows(lines, line0))
+    return _convert_block([row for _, _, row in numbered], width, cols, dtype, [n for n, _, _ in numbered])
+
+
+def csv_to_npy(src: Target, dst: Target, header: Union[bool, str] = "auto",
+               usecols: Optional[Sequence[Union[int, str]]] = None,
+               dtype=float, chunk_rows: int = 65536, memmap: bool = False):
+    """CSV → NPY, parsed in blocks of lines that NumPy converts in one go.
+
+    - header: True/False, or "auto" (first row is a header unless it has a number
+      in a column that is numeric in the next row)
+    - usecols: column indexes or header names; by default every column that is
+      numeric in the first data row (text columns are dropped)
+    - dtype: output dtype; empty cells become NaN for float dtypes
+    - memmap=True counts rows first and writes blocks straight into an
+      np.lib.format.open_memmap output, so memory stays at one block (dst must be a path)
+    Rows with a different number of fields than the header raise ValueError.
+    """
+    dtype = np.dtype(dtype)
+
+    if memmap:
+        if not is_path(dst):
+            raise ValueError("memmap=True needs a path to write to")
+        rewind = rewinder(src)
+        with open_text(src, newline="") as g:
+            counted = _count_rows(g, chunk_rows)
+        rewind()
+
+    with open_text(src, newline="") as f:
+        # the first two data rows decide on the header and the columns
+        head = list(islice(_numbered_rows(f), 2))
+        line = head[-1][1] if head else 0                       # file lines consumed so far
+        names = None
+        if head and (header is True or (header == "auto" and _looks_like_header(
+                head[0][2], head[1][2] if len(head) > 1 else None))):
+            names = head.pop(0)[2]
+        first = head[0][2] if head else None
+
+        if first is None and not names:
+            save_npy(dst, np.empty(0, dtype=dtype), allow_pickle=True)
+            return
+
+        width = len(names) if names else len(first)
+        cols = _pick_columns(usecols, names, first, width)
+
+        if memmap:
+            total = counted - (1 if names else 0)
+            out = np.lib.format.open_memmap(dst, mode="w+", dtype=dtype, shape=(total, len(cols)))
+        else:
+            out = np.empty((min(chunk_rows, 1024), len(cols)), dtype=dtype)
+
+        n = 0
+
+        def append(block: np.ndarray) -> None:
+            nonlocal out, n
+            if n + len(block) > len(out):
+                if memmap:
+                    raise ValueError(f"{src} changed while it was being converted")
+                # grow by doubling so appends stay amortised O(1)
+                grown = np.empty((max(2 * len(out), n + len(block)), len(cols)), dtype=dtype)
+                grown[:n] = out[:n]
+                out = grown
+            out[n:n + len(block)] = block
+            n += len(block)
 
-            if numeric_values:
-                rows.append(numeric_values)
+        # the head rows were already read; the csv reader consumed exactly
+        # their lines, so reading f again continues right after them
+        if head:
+            append(_convert_block([row for _, _, row in head], width, cols, dtype, [n for n, _, _ in head]))
+        for lines in _line_blocks(f, chunk_rows):
+            append(_parse_block(lines, width, cols, dtype, line))
+            line += len(lines)
+        if memmap and n != len(out):
+            raise ValueError(f"{src} changed while it was being converted")
 
-    arr = np.array(rows, dtype=float)
-    np.save(dst, arr)
+    if memmap:
+        out.flush()
+        del out
+    else:
+        save_npy(dst, out[:n], allow_pickle=True)
@@ -1,19 +1,31 @@
-from pathlib import Path
+from typing import List
 from docx import Document
 
+from .streams import Target, is_path, read_text, write_text
 
-def docx_to_txt(src: Path, dst: Path):
-    """Extract text from DOCX and write to a TXT file."""
-    doc = Document(str(src))
-    lines = [p.text for p in doc.paragraphs]
-    text = "\n".join(lines).strip()
-    dst.write_text(text, encoding="utf-8")
 
+def paragraphs_to_text(paragraphs: List[str]) -> str:
+    return "\n".join(paragraphs).strip()
 
-def txt_to_docx(src: Path, dst: Path):
-    """Create a DOCX from a TXT file, each line a paragraph."""
-    text = Path(src).read_text(encoding="utf-8")
+
+def read_paragraphs(src: Target) -> List[str]:
+    return [p.text for p in Document(str(src) if is_path(src) else src).paragraphs]
+
+
+def write_paragraphs(paragraphs: List[str], dst: Target) -> None:
     doc = Document()
-    for line in text.splitlines():
+    for line in paragraphs:
         doc.add_paragraph(line)
-    doc.save(str(dst))
+    doc.save(str(dst) if is_path(dst) else dst)
+
+
+def docx_to_txt(src: Target, dst: Target):
+    """Extract text from DOCX and write to a TXT file."""
+    text = paragraphs_to_text(read_paragraphs(src))
+    write_text(dst, text)
+
+
+def txt_to_docx(src: Target, dst: Target):
+    """Create a DOCX from a TXT file, each line a paragraph."""
+    text = read_text(src)
+    write_paragraphs(text.splitlines(), dst)
@@ -1,11 +1,15 @@
-from pathlib import Path
 import re
 
+from .streams import Target, read_text, write_text
 
-def html_to_md(src: Path, dst: Path):
-    # Read HTML
-    html = src.read_text(encoding="utf-8")
+
+def strip_tags(html: str) -> str:
     # Remove all tags like <p>, <div>, <h1>, etc.
-    text = re.sub(r"<[^>]+>", "", html)
+    return re.sub(r"<[^>]+>", "", html)
+
+
+def html_to_md(src: Target, dst: Target):
+    # Read HTML
+    html = read_text(src)
     # Save as plain markdown text (really just text)
-    dst.write_text(text, encoding="utf-8")
+    write_text(dst, strip_tags(html))
@@ -1,72 +1,43 @@
-from pathlib import Path
+from typing import Callable, Optional
 from html import escape as html_escape
 from bs4 import BeautifulSoup
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import LETTER
-from reportlab.lib.units import inch
-from PyPDF2 import PdfReader
 
+from .pdf_extract import PageTiming, iter_pages, write_joined
+from .pdf_layout import write_lines_to_pdf
+from .streams import Target, open_text, read_text
 
-def _write_lines_to_pdf(lines, dst: Path) -> None:
-    c = canvas.Canvas(str(dst), pagesize=LETTER)
-    width, height = LETTER
 
-    left_margin = 1 * inch
-    top_margin = height - 1 * inch
-    line_height = 14  # points
-    max_chars = 90
-
-    x = left_margin
-    y = top_margin
-
-    for line in lines:
-        # simple wrap by character count
-        text = line or ""
-        while len(text) > max_chars:
-            part = text[:max_chars]
-            c.drawString(x, y, part)
-            y -= line_height
-            text = text[max_chars:]
-            if y < 1 * inch:
-                c.showPage()
-                y = top_margin
-        c.drawString(x, y, text)
-        y -= line_height
-        if y < 1 * inch:
-            c.showPage()
-            y = top_margin
-
-    c.save()
-
-
-def html_to_pdf(src: Path, dst: Path) -> None:
+def html_to_pdf(src: Target, dst: Target) -> None:
     """Basic HTML → PDF: extract visible text and render into a simple PDF.
 
     Note: This does not do full HTML/CSS rendering. It strips tags and lays out text.
     For pixel-perfect rendering, consider wkhtmltopdf or WeasyPrint.
     """
-    html_str = Path(src).read_text(encoding="utf-8", errors="ignore")
-    soup = BeautifulSoup(html_str, "html.parser")
-    text = soup.get_text("\n")
-    lines = text.splitlines()
-    _write_lines_to_pdf(lines, dst)
+    html_str = read_text(src, errors="ignore")
+    write_lines_to_pdf(html_to_text(html_str).splitlines(), dst)
 
 
-def pdf_to_html(src: Path, dst: Path) -> None:
+def html_to_text(html_str: str) -> str:
+    """Visible text of an HTML document, one block per line."""
+    return BeautifulSoup(html_str, "html.parser").get_text("\n")
+
+
+def pdf_to_html(src: Target, dst: Target, pages: Optional[str] = None, jobs: int = 0,
+                on_page: Optional[Callable[[PageTiming], None]] = None) -> None:
     """PDF → HTML: extract selectable text and wrap in a minimal HTML template.
 
-    Scanned PDFs (images) won't produce text without OCR.
+    Scanned PDFs (images) won't produce text without OCR. Pages are extracted
+    and written like pdf_to_txt (pages, jobs and on_page work the same way).
     """
-    reader = PdfReader(str(src))
-    chunks = []
-    for page in reader.pages:
-        page_text = page.extract_text() or ""
-        chunks.append(page_text.rstrip())
-    content = "\n\n".join(chunks).strip()
+    head, tail = _HTML_DOC.split("%s")
+    texts = iter_pages(src, pages, jobs, on_page=on_page)
+    with open_text(dst, "w") as f:
+        f.write(head + "<pre>")
+        write_joined(texts, lambda chunk: f.write(html_escape(chunk)))
+        f.write("</pre>" + tail)
 
-    # escape text and wrap in <pre> to preserve spacing
-    body = f"<pre>{html_escape(content)}</pre>" if content else "<pre></pre>"
-    html_doc = """<!doctype html>
+
+_HTML_DOC = """<!doctype html>
 <html>
 <head>
   <meta charset=\"utf-8\">
@@ -77,5 +48,5 @@ def pdf_to_html(src: Path, dst: Path) -> None:
 %s
 </body>
 </html>
-""" % body
-    Path(dst).write_text(html_doc, encoding="utf-8")
+"""
+
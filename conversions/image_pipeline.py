@@ -0,0 +1,111 @@
+"""Decode an image once, encode it to many formats and sizes.
+
+The per-pair converters (image_png_jpeg, image_webp) decode the source for
+every output. fan_out() decodes it once, converts it once per distinct mode
+(RGB, RGBA), resizes once per distinct (mode, size), and runs the encoders on
+a thread pool; Pillow releases the GIL while encoding, so they run in
+parallel.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+from .image_profiles import save_params
+
+FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP"}
+
+
+@dataclass(frozen=True)
+class ImageTarget:
+    """One output of fan_out().
+
+    - ext: ".png", ".jpg"/".jpeg" or ".webp"
+    - size: (width, height) box to fit in, aspect kept and never upscaled
+    - dst: write here; without it the encoded bytes are returned
+    - profile: encoder profile (see image_profiles); default the active one
+    """
+    ext: str
+    size: Optional[Tuple[int, int]] = None
+    dst: Optional[Path] = None
+    profile: Optional[str] = None
+
+    @property
+    def format(self) -> str:
+        try:
+            return FORMATS[self.ext.lower()]
+        except KeyError:
+            raise ValueError(f"Unsupported target format: {self.ext}") from None
+
+
+def target_mode(im: Image.Image, fmt: str) -> str:
+    """Mode the per-pair converters would give im for fmt.
+
+    JPEG is always RGB; WebP keeps alpha if there is any; PNG keeps alpha and
+    is RGBA when decoded from WebP (like webp_to_any).
+    """
+    has_alpha = "A" in im.getbands()
+    if fmt == "JPEG":
+        return "RGB"
+    if fmt == "PNG" and im.format == "WEBP":
+        return "RGBA"
+    return "RGBA" if has_alpha else "RGB"
+
+
+def decode(src) -> Image.Image:
+    """Open and fully decode src (path, bytes or binary file object)."""
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        src = io.BytesIO(src)
+    im = Image.open(src)
+    im.load()
+    return im
+
+
+def _encode(im: Image.Image, target: ImageTarget, params: dict) -> Union[bytes, Path]:
+    if target.dst is not None:
+        im.save(target.dst, target.format, **params)
+        return target.dst
+    buf = io.BytesIO()
+    im.save(buf, target.format, **params)
+    return buf.getvalue()
+
+
+def fan_out(src, targets: Sequence[ImageTarget], workers: int = 0) -> List[Union[bytes, Path]]:
+    """Encode src to every target; returns bytes (or the dst path) per target, in order.
+
+    workers: encoder threads (0 = one per target, up to one per CPU).
+    """
+    im = decode(src) if not isinstance(src, Image.Image) else src
+    formats = [t.format for t in targets]                       # ValueError before any work
+    # resolved here: the encoder threads don't see this thread's active profile
+    params = [save_params(fmt, t.profile) for t, fmt in zip(targets, formats)]
+
+    modes: Dict[str, Image.Image] = {}
+    sized: Dict[Tuple[str, Optional[Tuple[int, int]]], Image.Image] = {}
+    jobs = []
+    for target, fmt in zip(targets, formats):
+        mode = target_mode(im, fmt)
+        if mode not in modes:
+            modes[mode] = im if im.mode == mode else im.convert(mode)
+        key = (mode, target.size)
+        if key not in sized:
+            out = modes[mode]
+            if target.size is not None:
+                out = out.copy()
+                out.thumbnail(target.size)
+            sized[key] = out
+            jobs.append((out, target, params[len(jobs)]))
+        else:
+            # Image.save keeps per-call state on the image, so concurrent encodes each get their own
+            jobs.append((sized[key].copy(), target, params[len(jobs)]))
+
+    if workers <= 0:
+        workers = min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1 or len(jobs) <= 1:
+        return [_encode(*job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode") as pool:
+        return list(pool.map(lambda job: _encode(*job), jobs))
@@ -1,19 +1,30 @@
-from pathlib import Path
+from typing import Optional
 from PIL import Image
 
+from .image_profiles import save_params
+from .streams import Target
 
-def png_to_jpeg(src: Path, dst: Path) -> None:
-    """Convert PNG to JPEG (.jpg/.jpeg). Removes alpha channel."""
+
+def for_jpeg(im: Image.Image) -> Image.Image:
+    return im.convert("RGB")  # JPEG doesn't support alpha
+
+
+def for_png(im: Image.Image) -> Image.Image:
+    # Ensures a consistent mode; PNG can handle RGB
+    return im if im.mode == "RGB" else im.convert("RGB")
+
+
+def png_to_jpeg(src: Target, dst: Target, profile: Optional[str] = None) -> None:
+    """Convert PNG to JPEG (.jpg/.jpeg). Removes alpha channel.
+
+    profile: encoder profile name (see image_profiles), default the active one.
+    """
     with Image.open(src) as im:
-        im = im.convert("RGB")  # JPEG doesn't support alpha
         # Saves as JPEG regardless of .jpg/.jpeg
-        im.save(dst, "JPEG")
+        for_jpeg(im).save(dst, "JPEG", **save_params("JPEG", profile))
 
 
-def jpeg_to_png(src: Path, dst: Path) -> None:
+def jpeg_to_png(src: Target, dst: Target, profile: Optional[str] = None) -> None:
     """Convert JPEG (.jpg/.jpeg) to PNG."""
     with Image.open(src) as im:
-        # Ensures a consistent mode; PNG can handle RGB
-        if im.mode != "RGB":
-            im = im.convert("RGB")
-        im.save(dst, "PNG")
+        for_png(im).save(dst, "PNG", **save_params("PNG", profile))
@@ -0,0 +1,85 @@
+"""Named encoder settings for JPEG, WebP and PNG output.
+
+A profile maps each Pillow format to the keyword arguments passed to
+Image.save(). "default" is Pillow's own defaults, i.e. the behaviour before
+profiles existed. The active profile is a context variable, so it reaches
+every image encode in a conversion (direct converters, planned routes,
+convert_bytes, fan_out) without changing their (src, dst) signatures:
+
+    with use_profile("smallest"):
+        CONVERSIONS[(".png", ".webp")](src, dst)
+
+Compare profiles with benchmarks/image_profiles.py.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+DEFAULT_PROFILE = "default"
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".webp"})    # outputs a profile changes
+
+PROFILES: Dict[str, Dict[str, dict]] = {
+    DEFAULT_PROFILE: {},
+    # quickest encodes, bigger files
+    "fast": {
+        "JPEG": {"quality": 80},
+        "WEBP": {"quality": 80, "method": 0},
+        "PNG": {"compress_level": 1},
+    },
+    # close to the defaults, with an optimized JPEG Huffman table
+    "balanced": {
+        "JPEG": {"quality": 85, "optimize": True},
+        "WEBP": {"quality": 80, "method": 4},
+        "PNG": {"compress_level": 6},
+    },
+    # slowest encodes, smallest files
+    "smallest": {
+        "JPEG": {"quality": 70, "optimize": True, "progressive": True, "subsampling": 2},
+        "WEBP": {"quality": 70, "method": 6},
+        "PNG": {"optimize": True},
+    },
+    # no loss where the format allows it (WebP, PNG); near-lossless JPEG
+    "lossless": {
+        "JPEG": {"quality": 95, "subsampling": 0},
+        "WEBP": {"lossless": True, "quality": 80, "method": 4},
+        "PNG": {},
+    },
+}
+
+_current: ContextVar[str] = ContextVar("image_profile", default=DEFAULT_PROFILE)
+
+
+def check_profile(name: Optional[str]) -> str:
+    """name, or DEFAULT_PROFILE for None; ValueError for unknown names."""
+    if name is None:
+        return DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown encoder profile {name!r} (choose from {', '.join(PROFILES)})")
+    return name
+
+
+def profile_tag(to_ext: str, profile: Optional[str]) -> str:
+    """"@profile" for image outputs, to tell their manifest entries apart; "" otherwise."""
+    return f"@{profile}" if profile and to_ext in IMAGE_EXTENSIONS else ""
+
+
+def current_profile() -> str:
+    return _current.get()
+
+
+@contextmanager
+def use_profile(name: Optional[str]) -> Iterator[str]:
+    """Make name the active profile inside the block (None keeps the current one)."""
+    if name is None:
+        yield current_profile()
+        return
+    token = _current.set(check_profile(name))
+    try:
+        yield name
+    finally:
+        _current.reset(token)
+
+
+def save_params(fmt: str, profile: Optional[str] = None) -> dict:
+    """Image.save() keyword arguments for fmt ("JPEG", "WEBP", "PNG") under profile."""
+    return dict(PROFILES[check_profile(profile or current_profile())].get(fmt, {}))
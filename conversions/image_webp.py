@@ -1,22 +1,34 @@
 from pathlib import Path
+from typing import Optional
 from PIL import Image
 
+from .image_profiles import save_params
+from .streams import Target
 
-def any_to_webp(src: Path, dst: Path) -> None:
+
+def for_webp(im: Image.Image) -> Image.Image:
+    # If image has an alpha channel, keep it; otherwise use RGB
+    return im.convert("RGBA" if "A" in im.getbands() else "RGB")
+
+
+def from_webp(im: Image.Image, fmt: str) -> Image.Image:
+    # PNG can carry transparency, JPEG cannot
+    return im.convert("RGBA" if fmt == "PNG" else "RGB")
+
+
+def any_to_webp(src: Target, dst: Target, profile: Optional[str] = None) -> None:
     """Convert PNG/JPG/JPEG to WEBP (simple and readable).
 
     Steps:
     - Open the source image
     - Convert to RGB/RGBA (to avoid mode issues)
-    - Save as WEBP
+    - Save as WEBP (settings from the encoder profile, see image_profiles)
     """
     with Image.open(src) as im:
-        # If image has an alpha channel, keep it; otherwise use RGB
-        im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
-        im.save(dst, "WEBP")
+        for_webp(im).save(dst, "WEBP", **save_params("WEBP", profile))
 
 
-def webp_to_any(src: Path, dst: Path) -> None:
+def webp_to_any(src: Path, dst: Path, profile: Optional[str] = None) -> None:
     """Convert WEBP to PNG or JPEG based on dst extension.
 
     Supported outputs: .png, .jpg, .jpeg
@@ -26,7 +38,19 @@ def webp_to_any(src: Path, dst: Path) -> None:
     if not fmt:
         raise ValueError(f"Unsupported target format: {dst.suffix}")
 
+    _save_from_webp(src, dst, fmt, profile)
+
+
+def webp_to_png(src: Target, dst: Target, profile: Optional[str] = None) -> None:
+    """Convert WEBP to PNG, keeping transparency."""
+    _save_from_webp(src, dst, "PNG", profile)
+
+
+def webp_to_jpeg(src: Target, dst: Target, profile: Optional[str] = None) -> None:
+    """Convert WEBP to JPEG (.jpg/.jpeg). Removes alpha channel."""
+    _save_from_webp(src, dst, "JPEG", profile)
+
+
+def _save_from_webp(src: Target, dst: Target, fmt: str, profile: Optional[str]) -> None:
     with Image.open(src) as im:
-        # PNG can carry transparency, JPEG cannot
-        im = im.convert("RGBA" if fmt == "PNG" else "RGB")
-        im.save(dst, fmt)
+        from_webp(im, fmt).save(dst, fmt, **save_params(fmt, profile))
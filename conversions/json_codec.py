@@ -0,0 +1,149 @@
+"""JSON reading and writing shared by every JSON converter.
+
+orjson, when it is installed, parses and serializes several times faster
+than the json module; json is the fallback. Both write exactly the same text
+for the two layouts the converters use, compact (indent=None, separators
+",", ":") and pretty (indent=2), because orjson is only handed data it
+formats identically: floats written in exponent form (below 1e-4, from 1e16
+up), NaN and infinities, integers beyond 64 bits and non-string keys all go
+through json instead. Non-ASCII text is written as is (ensure_ascii=False).
+
+Reading, orjson silently turns integers beyond 64 bits into floats, so a
+document with a run of 19 or more digits (the shortest integers that can
+overflow) is parsed by json, which keeps them exact.
+
+dump() writes in pieces of about CHUNK_SIZE characters, encoding a
+top-level array or object an item at a time, so a multi-GB output is never
+built as one string.
+"""
+import json
+import re
+from typing import Any, Iterator, Optional, TextIO, Union
+
+try:  # optional Rust encoder/decoder
+    import orjson
+except ImportError:  # stdlib json below
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+CHUNK_SIZE = 1 << 20
+
+_ORJSON_OPTIONS = {None: 0, 2: orjson.OPT_INDENT_2} if orjson is not None else {}
+
+quote = json.JSONEncoder(ensure_ascii=False).encode     # a str as a JSON string literal
+
+
+def _encoder(indent: Optional[int]) -> json.JSONEncoder:
+    separators = (",", ":") if indent is None else (",", ": ")
+    return json.JSONEncoder(ensure_ascii=False, indent=indent, separators=separators)
+
+
+_PLAIN = {str, int, bool, type(None)}
+_LONG_DIGITS = re.compile(r"\d{19}")
+_LONG_DIGITS_B = re.compile(rb"\d{19}")
+
+
+def _fast(data: Any, indent: Optional[int]) -> bool:
+    """True if orjson writes data exactly like json would (see the module docstring)."""
+    if indent not in _ORJSON_OPTIONS:
+        return False
+    stack = [[data]]
+    while stack:
+        items = stack.pop()
+        items = items.values() if isinstance(items, dict) else items
+        if set(map(type, items)) <= _PLAIN:
+            continue                        # the usual case, checked without a Python loop
+        for x in items:
+            kind = type(x)
+            if kind is float:
+                if not (x == 0.0 or 1e-4 <= abs(x) < 1e16):
+                    return False            # NaN fails both comparisons
+            elif kind in _PLAIN:
+                continue
+            elif isinstance(x, (dict, list, tuple)):
+                stack.append(x)
+    return True
+
+
+_SCALARS = {str, int, float, bool, type(None)}
+
+
+def is_plain(data: Any) -> bool:
+    """True if data reads back unchanged from the JSON (or YAML) it is written as."""
+    stack = [data]
+    while stack:
+        x = stack.pop()
+        kind = type(x)
+        if kind is dict:
+            if not all(type(k) is str for k in x):
+                return False
+            stack.extend(x.values())
+        elif kind is list:
+            stack.extend(x)
+        elif kind not in _SCALARS:
+            return False            # tuples, dates, numpy scalars, ...
+    return True
+
+
+def loads(text: Union[str, bytes]) -> Any:
+    """Parse a JSON document (str or UTF-8 bytes), like json.loads."""
+    long_digits = _LONG_DIGITS if isinstance(text, str) else _LONG_DIGITS_B
+    if orjson is not None and not long_digits.search(text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass        # NaN/Infinity literals, lone surrogates: json decides
+    return json.loads(text)
+
+
+def load(fp) -> Any:
+    """Parse the JSON document in a text or binary file object."""
+    return loads(fp.read())
+
+
+def _orjson_dumps(data: Any, indent: Optional[int]) -> str:
+    # data already passed _fast(); orjson still refuses some of it (big ints, non-str keys, other types)
+    try:
+        return orjson.dumps(data, option=_ORJSON_OPTIONS[indent]).decode("utf-8")
+    except TypeError:   # orjson.JSONEncodeError
+        return _encoder(indent).encode(data)
+
+
+def dumps(data: Any, indent: Optional[int] = None) -> str:
+    """data as JSON text: compact, or pretty with indent (same text as json.dumps)."""
+    if orjson is not None and _fast(data, indent):
+        return _orjson_dumps(data, indent)
+    return _encoder(indent).encode(data)
+
+
+def iterencode(data: Any, indent: Optional[int] = None) -> Iterator[str]:
+    """The text of dumps(data, indent) in pieces, a top-level item at a time."""
+    is_dict = isinstance(data, dict)
+    if orjson is None or not isinstance(data, (dict, list)) or not data \
+            or (is_dict and not all(isinstance(k, str) for k in data)) or not _fast(data, indent):
+        yield from _encoder(indent).iterencode(data)
+        return
+    # each item is encoded on its own and indented one level, like json's nested layout
+    newline = "" if indent is None else "\n" + " " * indent
+    colon = ":" if indent is None else ": "
+    yield "{" if is_dict else "["
+    sep = newline
+    for item in (data.items() if is_dict else data):
+        piece = _orjson_dumps(item[1] if is_dict else item, indent)
+        if indent is not None:
+            piece = piece.replace("\n", newline)
+        yield sep + (quote(item[0]) + colon + piece if is_dict else piece)
+        sep = "," + newline
+    yield ("" if indent is None else "\n") + ("}" if is_dict else "]")
+
+
+def dump(data: Any, fp: TextIO, indent: Optional[int] = None) -> None:
+    """Write dumps(data, indent) to a text file object in CHUNK_SIZE pieces."""
+    buf, size = [], 0
+    for piece in iterencode(data, indent):
+        buf.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            fp.write("".join(buf))
+            buf, size = [], 0
+    fp.write("".join(buf))
@@ -1,22 +1,66 @@
-from pathlib import Path
-import json
+from typing import Optional, Sequence
+from itertools import islice
 import csv
 
+from . import json_codec
+from .json_stream import iter_json_array, starts_with_array
+from .streams import Target, kept, open_binary, open_text, rewinder, write_text
 
-def json_to_csv(src: Path, dst: Path):
-    text = src.read_text(encoding="utf-8")
-    data = json.loads(text)
 
-    if not data:
+def json_to_csv(src: Target, dst: Target, fieldnames: Optional[Sequence[str]] = None,
+                sample: Optional[int] = None):
+    """JSON (list of objects) → CSV.
+
+    A top-level array is streamed item by item, so big exports never sit in memory:
+    - by default one pass collects the sorted union of keys, a second writes rows
+    - fieldnames=[...] uses a given header and skips the first pass
+    - sample=N builds the header from the first N records only
+    With a given or sampled header, keys outside it are dropped.
+    """
+    rewind = rewinder(src)      # a stream is read once per pass
+    if kept(src) or not starts_with_array(src):
+        # parsed by the previous hop, or not an array: small enough to load
+        # whole (a single object becomes one row)
+        if kept(src):
+            data = src.value
+        else:
+            rewind()
+            with open_binary(src) as f:
+                data = json_codec.loads(f.read())
+        records = [data] if isinstance(data, dict) and data else data
+        if not records:
+            write_text(dst, "")
+            return
+    else:
+        records = None
+
+    def items():
+        # one pass over the records; closing it early releases the source
+        if records is not None:
+            yield from records
+            return
+        rewind()
+        yield from iter_json_array(src)
+
+    first = items()
+    empty = next(first, None) is None
+    first.close()
+    if empty:
         # if empty list, write empty file
-        dst.write_text("", encoding="utf-8")
+        write_text(dst, "")
         return
 
-    # assume data is a list of dicts
-    fieldnames = sorted({key for item in data for key in item.keys()})
+    extrasaction = "ignore"
+    if fieldnames is None:
+        head = items()
+        fieldnames = sorted({key for item in (head if sample is None else islice(head, sample))
+                             for key in item.keys()})
+        head.close()
+        if sample is None:
+            extrasaction = "raise"
 
-    with dst.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+    with open_text(dst, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction=extrasaction)
         writer.writeheader()
-        for item in data:
+        for item in items():
             writer.writerow(item)
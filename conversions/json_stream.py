@@ -0,0 +1,97 @@
+from typing import Any, Iterator
+import json
+
+from .streams import Target, open_binary, open_text
+
+try:  # optional C-accelerated incremental parser
+    import ijson
+except ImportError:  # stdlib fallback below
+    ijson = None
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def starts_with_array(src: Target) -> bool:
+    """True if the first non-whitespace character of the file is '['."""
+    with open_text(src) as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip(_WHITESPACE)
+            if stripped:
+                return stripped[0] == "["
+
+
+def iter_json_array(src: Target, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array one at a time.
+
+    Only one item (plus a read chunk) is held in memory, so multi-GB exports
+    can be walked. Uses ijson when it is installed, otherwise a small
+    stdlib-only reader built on JSONDecoder.raw_decode.
+    """
+    if ijson is not None:
+        with open_binary(src) as f:
+            yield from ijson.items(f, "item", use_float=True)
+        return
+
+    decoder = json.JSONDecoder()
+    with open_text(src) as f:
+        buf = ""
+        pos = 0
+        eof = False
+        want = chunk_size
+
+        def fill() -> bool:
+            # drop what was consumed and append the next chunk; False at end of file
+            nonlocal buf, pos, eof
+            chunk = f.read(want)
+            buf = buf[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            return bool(chunk)
+
+        def skip_ws() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    raise ValueError("Unexpected end of JSON array")
+
+        if skip_ws() != "[":
+            raise ValueError("JSON top level is not an array")
+        pos += 1
+
+        if skip_ws() == "]":
+            return
+
+        while True:
+            skip_ws()
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # a number cut off by the chunk boundary can still parse ("1." reads as 1):
+                # only a delimiter after it, or the end of the file, shows it is complete
+                complete = (isinstance(item, (dict, list, str)) or eof
+                            or (end < len(buf) and buf[end] in _DELIMITERS))
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                fill()
+                want *= 2  # an item bigger than a chunk: grow reads so retries stay linear
+                continue
+            want = chunk_size
+            pos = end
+            yield item
+
+            sep = skip_ws()
+            pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {sep!r}")
@@ -1,19 +1,20 @@
-from pathlib import Path
-import json
+from . import json_codec
+from .streams import Target, keep, open_text, take
 
 
-def json_to_toon(src: Path, dst: Path) -> None:
+def json_to_toon(src: Target, dst: Target) -> None:
     """JSON → TOON: minified, single-line JSON to reduce tokens/lines."""
-    with open(src, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
-    with open(dst, "w", encoding="utf-8") as f:
-        f.write(text)
+    data = take(src, json_codec.load)
+    if keep(dst, data, json_codec.is_plain):
+        return
+    with open_text(dst, "w") as f:
+        json_codec.dump(data, f)
 
 
-def toon_to_json(src: Path, dst: Path) -> None:
+def toon_to_json(src: Target, dst: Target) -> None:
     """TOON → JSON: pretty-printed JSON for readability."""
-    with open(src, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    with open(dst, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    data = take(src, json_codec.load)
+    if keep(dst, data, json_codec.is_plain):
+        return
+    with open_text(dst, "w") as f:
+        json_codec.dump(data, f, indent=2)
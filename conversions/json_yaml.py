@@ -1,20 +1,21 @@
-from pathlib import Path
-import json
-import yaml
+from . import json_codec, yaml_codec
+from .streams import Target, keep, open_text, take
 
 
-def json_to_yaml(src: Path, dst: Path) -> None:
+def json_to_yaml(src: Target, dst: Target) -> None:
     """Convert a JSON file to YAML (.yaml/.yml)."""
-    with open(src, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = take(src, json_codec.load)
+    if keep(dst, data, json_codec.is_plain):
+        return
     # Writes YAML with readable formatting and preserved key order
-    with open(dst, "w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
+    with open_text(dst, "w") as f:
+        yaml_codec.dump(data, f)
 
 
-def yaml_to_json(src: Path, dst: Path) -> None:
+def yaml_to_json(src: Target, dst: Target) -> None:
     """Convert a YAML/YML file to JSON (.json)."""
-    with open(src, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-    with open(dst, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    data = take(src, yaml_codec.load)
+    if keep(dst, data, json_codec.is_plain):
+        return
+    with open_text(dst, "w") as f:
+        json_codec.dump(data, f, indent=2)
@@ -1,10 +1,13 @@
-from pathlib import Path
+from .streams import Target, read_text, write_text
 
 
-def md_to_html(src: Path, dst: Path):
+def wrap_html(text: str) -> str:
+    # Wrap markdown text in a bare HTML page
+    return "<html><body>\n" + text + "\n</body></html>\n"
+
+
+def md_to_html(src: Target, dst: Target):
     # Read markdown text
-    text = src.read_text(encoding="utf-8")
-    # Wrap it in HTML
-    html = "<html><body>\n" + text + "\n</body></html>\n"
+    text = read_text(src)
     # Save result
-    dst.write_text(html, encoding="utf-8")
+    write_text(dst, wrap_html(text))
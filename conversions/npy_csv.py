@@ -1,12 +1,28 @@
-from pathlib import Path
 import numpy as np
 import csv
 
+from .npy_emit import group_rows, is_plain_numeric, iter_row_blocks, load_mmap, text_values, write_chunks
+from .streams import Target, open_text
 
-def npy_to_csv(src: Path, dst: Path):
-    arr = np.load(src)
 
-    with dst.open("w", newline="", encoding="utf-8") as f:
+def npy_to_csv(src: Target, dst: Target):
+    arr = load_mmap(src)
+
+    if is_plain_numeric(arr) and arr.ndim in (1, 2):
+        # fast path: format a block of rows at once, one value per cell
+        def chunks():
+            width = arr.shape[1] if arr.ndim == 2 else 1
+            for block in iter_row_blocks(arr):
+                if width == 0:
+                    yield "\r\n" * len(block)
+                    continue
+                rows = group_rows(text_values(block), width)
+                yield "".join([",".join(row) + "\r\n" for row in rows])
+
+        write_chunks(dst, chunks(), newline="")
+        return
+
+    with open_text(dst, "w", newline="") as f:
         writer = csv.writer(f)
         for row in arr:
             # row might be a single number or not a list (like scalar or 1D)
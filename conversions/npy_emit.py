@@ -0,0 +1,90 @@
+"""Shared helpers for writing .npy arrays out as text.
+
+The array is memory-mapped and formatted a block of rows at a time: each
+block is flattened to Python numbers in one tolist() call and run through the
+C repr with map(), then written as one chunk. Only a block of rows is in
+memory at once, however large the array is.
+"""
+from typing import Iterable, Iterator, List, Optional
+import numpy as np
+
+from .streams import Target, is_path, keep, kept, open_text
+
+BLOCK_CELLS = 1 << 16  # values formatted per block
+
+
+def load_mmap(src: Target) -> np.ndarray:
+    """Open an .npy file memory-mapped (read only); a stream is read into memory."""
+    if kept(src):
+        return src.value
+    return np.load(src, mmap_mode="r" if is_path(src) else None, allow_pickle=False)
+
+
+def save_npy(dst: Target, arr: np.ndarray, allow_pickle: bool = False) -> None:
+    """np.save, or hand arr to the next hop of a route as it is."""
+    # object arrays would not load back through load_mmap
+    if not keep(dst, arr, lambda a: not a.dtype.hasobject):
+        np.save(dst, arr, allow_pickle=allow_pickle)
+
+
+def is_plain_numeric(arr: np.ndarray) -> bool:
+    """True for bool/int/float arrays, the ones the fast emitters handle."""
+    return arr.dtype.kind in "biuf"
+
+
+def iter_row_blocks(arr: np.ndarray) -> Iterator[np.ndarray]:
+    """Slices of whole rows, sized to roughly BLOCK_CELLS values each."""
+    per_row = max(1, int(np.prod(arr.shape[1:])))
+    step = max(1, BLOCK_CELLS // per_row)
+    for start in range(0, len(arr), step):
+        yield arr[start:start + step]
+
+
+def group_rows(values: List[str], width: int) -> Iterator[tuple]:
+    """Split a flat list of formatted values back into rows of `width`."""
+    return zip(*[iter(values)] * width)
+
+
+def text_values(block: np.ndarray, as_float: bool = False) -> List[str]:
+    """Every value of block as str, like str(x.tolist()) (or repr(float(x)) with as_float)."""
+    if as_float or block.dtype.kind == "f":
+        # float16/32 go through float64, like tolist() and float() do
+        return list(map(float.__repr__, np.asarray(block, dtype=np.float64).ravel().tolist()))
+    return list(map(str, block.ravel().tolist()))
+
+
+def _yaml_float(x: float) -> str:
+    # same rules as PyYAML's SafeRepresenter.represent_float
+    if x != x:
+        return ".nan"
+    if x == float("inf"):
+        return ".inf"
+    if x == -float("inf"):
+        return "-.inf"
+    text = repr(x).lower()
+    if "." not in text and "e" in text:
+        text = text.replace("e", ".0e", 1)
+    return text
+
+
+def yaml_values(block: np.ndarray) -> List[str]:
+    """Every value of block as str, the way yaml.safe_dump writes it."""
+    if block.dtype.kind == "b":
+        return ["true" if v else "false" for v in block.ravel().tolist()]
+    if block.dtype.kind != "f":
+        return list(map(str, block.ravel().tolist()))
+    values = np.asarray(block, dtype=np.float64).ravel()
+    text = list(map(float.__repr__, values.tolist()))
+    # only nan/inf and exponent forms differ from repr; find them without a Python loop
+    magnitude = np.abs(values)
+    odd = ~np.isfinite(values) | (magnitude >= 1e16) | ((magnitude < 1e-4) & (values != 0))
+    for i in np.flatnonzero(odd).tolist():
+        text[i] = _yaml_float(float(values[i]))
+    return text
+
+
+def write_chunks(dst: Target, chunks: Iterable[str], newline: Optional[str] = None) -> None:
+    """Write text chunks to dst through one buffered handle."""
+    with open_text(dst, "w", newline=newline, buffering=1 << 20) as f:
+        for chunk in chunks:
+            f.write(chunk)
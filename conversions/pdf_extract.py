@@ -0,0 +1,146 @@
+"""Page-parallel text extraction for PDFs.
+
+Pages are split into contiguous shards; each worker process opens its own
+PdfReader and extracts one shard. Shards come back in page order, so callers
+can write every page out as soon as it (and the ones before it) are done
+instead of holding the whole document's text.
+"""
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+
+PARALLEL_MIN_PAGES = 32   # below this a pool costs more than it saves
+SHARD_PAGES = 16          # pages per worker task
+
+
+@dataclass
+class PageTiming:
+    """How long one page took to extract."""
+    page: int             # 1-based page number
+    seconds: float
+    chars: int
+
+
+def parse_pages(spec: Optional[str], count: int) -> List[int]:
+    """Page spec like "1-10,15,20-" (1-based, inclusive) → sorted 0-based indexes.
+
+    None or "" means every page. Raises ValueError for pages outside 1..count.
+    """
+    if not spec:
+        return list(range(count))
+    picked = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        start = int(first) if first else 1
+        stop = (int(last) if last else count) if dash else start
+        if not 1 <= start <= stop <= count:
+            raise ValueError(f"Page range {part!r} is outside 1-{count}")
+        picked.update(range(start - 1, stop))
+    return sorted(picked)
+
+
+def _extract(reader: PdfReader, indexes: Iterable[int]) -> List[Tuple[int, str, float]]:
+    out = []
+    for i in indexes:
+        start = time.perf_counter()
+        text = reader.pages[i].extract_text() or ""
+        out.append((i, text, time.perf_counter() - start))
+    return out
+
+
+def _extract_shard(src: str, indexes: List[int]) -> List[Tuple[int, str, float]]:
+    # runs in a worker: every worker parses the file itself instead of receiving page objects
+    return _extract(PdfReader(src), indexes)
+
+
+def _shards(indexes: List[int], size: int) -> Iterator[List[int]]:
+    for i in range(0, len(indexes), size):
+        yield indexes[i:i + size]
+
+
+def _in_worker() -> bool:
+    # already inside a pool (e.g. convert_all -j): don't start a pool per file
+    return multiprocessing.parent_process() is not None
+
+
+def iter_pages(src, pages: Optional[str] = None, jobs: int = 0, shard_pages: int = SHARD_PAGES,
+               on_page: Optional[Callable[[PageTiming], None]] = None) -> Iterator[str]:
+    """Text of each selected page, in page order.
+
+    - src: path, or a binary file object (file objects are always read serially)
+    - pages: page spec for parse_pages, e.g. "1-50"; default every page
+    - jobs: worker processes (0 = one per CPU); small documents and calls made
+      from inside a worker process run serially
+    - on_page: called with a PageTiming for every page, in page order
+    The file is opened (and the page spec checked) right away; pages are
+    extracted as the iterator is consumed.
+    """
+    is_path = not hasattr(src, "read")
+    reader = PdfReader(str(src) if is_path else src)
+    indexes = parse_pages(pages, len(reader.pages))
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, -(-len(indexes) // shard_pages))
+
+    if not is_path or jobs <= 1 or len(indexes) < PARALLEL_MIN_PAGES or _in_worker():
+        results = (r for shard in _shards(indexes, shard_pages) for r in _extract(reader, shard))
+    else:
+        results = _run_shards(str(src), indexes, jobs, shard_pages)
+    return _report(results, on_page)
+
+
+def _run_shards(src: str, indexes: List[int], jobs: int, shard_pages: int) -> Iterator[Tuple[int, str, float]]:
+    shards = _shards(indexes, shard_pages)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque(pool.submit(_extract_shard, src, s) for _, s in zip(range(jobs * 2), shards))
+        while pending:
+            done = pending.popleft().result()       # oldest first keeps page order
+            nxt = next(shards, None)
+            if nxt is not None:
+                pending.append(pool.submit(_extract_shard, src, nxt))
+            yield from done
+
+
+def _report(results: Iterable[Tuple[int, str, float]],
+            on_page: Optional[Callable[[PageTiming], None]]) -> Iterator[str]:
+    for i, text, seconds in results:
+        if on_page is not None:
+            on_page(PageTiming(i + 1, seconds, len(text)))
+        yield text
+
+
+def write_joined(pages: Iterable[str], write: Callable[[str], None]) -> None:
+    """Write the page texts, rstripped and separated by blank lines, one page at a time."""
+    started = False
+    gap = ""
+    for text in pages:
+        text = text.rstrip()
+        if not started:
+            text = text.lstrip()
+            if text:
+                write(text)
+                started = True
+            continue
+        gap += "\n\n"
+        if text:
+            write(gap + text)
+            gap = ""
+
+
+def timing_summary(timings: List[PageTiming], top: int = 10) -> str:
+    """Short report: total, mean and the slowest pages."""
+    if not timings:
+        return "no pages"
+    total = sum(t.seconds for t in timings)
+    lines = [f"{len(timings)} pages, {total:.3f}s CPU in extraction, {total / len(timings) * 1000:.1f} ms/page"]
+    for t in sorted(timings, key=lambda t: t.seconds, reverse=True)[:top]:
+        lines.append(f"  page {t.page:>5}  {t.seconds * 1000:8.1f} ms  {t.chars:>7} chars")
+    return "\n".join(lines)
@@ -0,0 +1,120 @@
+"""Plain-text page layout shared by txt_to_pdf and html_to_pdf.
+
+Lines are consumed lazily (a generator over the input file is fine) and
+wrapped by their measured width, using a per-font table of character widths
+that is filled once per character. Each page's lines go into a single
+reportlab text object, drawn with one call when the page is full, so only
+the current page is ever held as Python objects.
+"""
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Iterable, Iterator, List
+
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from .streams import Target, is_path, kept, open_text
+
+FONT = "Helvetica"
+FONT_SIZE = 12
+LEADING = 14      # points between baselines
+MARGIN = 1 * inch
+
+
+class _Widths(dict):
+    """Character → width in points, measured on first use."""
+
+    def __init__(self, font: str, size: float):
+        super().__init__()
+        self.font = font
+        self.size = size
+
+    def __missing__(self, ch: str) -> float:
+        width = self[ch] = stringWidth(ch, self.font, self.size)
+        return width
+
+
+@lru_cache(maxsize=None)
+def char_widths(font: str = FONT, size: float = FONT_SIZE) -> _Widths:
+    return _Widths(font, size)
+
+
+def wrap_line(line: str, max_width: float, widths: _Widths) -> List[str]:
+    """Split line into pieces no wider than max_width, preferring to break after a space."""
+    width = widths.__getitem__
+    if sum(map(width, line)) <= max_width:
+        return [line]
+    cum = list(accumulate(map(width, line)))
+    parts = []
+    start, base = 0, 0.0
+    while start < len(line):
+        end = bisect_right(cum, base + max_width, start)
+        if end >= len(line):
+            parts.append(line[start:])
+            break
+        space = line.rfind(" ", start, end)
+        if space >= start and space + 1 < end:
+            end = space + 1           # keep the space on this line, start the next with the word
+        end = max(end, start + 1)     # always make progress, even for a glyph wider than the line
+        parts.append(line[start:end])
+        base = cum[end - 1]
+        start = end
+    return parts
+
+
+def iter_text_lines(src: Target) -> Iterator[str]:
+    """Lines of a UTF-8 text file, read lazily (same split as str.splitlines)."""
+    if kept(src):
+        yield from src.value.splitlines()
+        return
+    with open_text(src) as f:
+        for raw in f:
+            yield from raw.splitlines()
+
+
+class _Canvas(canvas.Canvas):
+    """Canvas whose page streams are deflated without the ASCII85 layer.
+
+    reportlab picks page filters from the process-wide rl_config.useA85 when
+    the PDF is saved; giving each page its own contents stream keeps the
+    choice to this canvas, so PDFs rendered in other threads are unaffected.
+    """
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        page.Contents = pdfdoc.PDFStream(content=page.stream, filters=[pdfdoc.PDFZCompress])
+        page.Contents.__Comment__ = "page stream"
+
+
+def write_lines_to_pdf(lines: Iterable[str], dst: Target, font: str = FONT,
+                       size: float = FONT_SIZE, leading: float = LEADING) -> None:
+    """Lay lines out on LETTER pages with 1" margins."""
+    # A85 only makes deflated streams bigger and slower (see _Canvas)
+    c = _Canvas(str(dst) if is_path(dst) else dst, pagesize=LETTER, pageCompression=1)
+    width, height = LETTER
+    top = height - MARGIN
+    per_page = int((top - MARGIN) // leading) + 1
+    max_width = width - 2 * MARGIN
+    widths = char_widths(font, size)
+
+    text = None
+    on_page = 0
+    for line in lines:
+        for part in wrap_line(line or "", max_width, widths):
+            if text is None:
+                text = c.beginText(MARGIN, top)
+                text.setFont(font, size, leading)
+            text.textLine(part)
+            on_page += 1
+            if on_page == per_page:
+                c.drawText(text)
+                c.showPage()
+                text, on_page = None, 0
+    if text is not None:
+        c.drawText(text)
+    c.save()
@@ -1,15 +1,17 @@
-from pathlib import Path
-from PyPDF2 import PdfReader
+from typing import Callable, Optional
 
+from .pdf_extract import PageTiming, iter_pages, write_joined
+from .streams import Target, open_text
 
-def pdf_to_txt(src: Path, dst: Path) -> None:
+
+def pdf_to_txt(src: Target, dst: Target, pages: Optional[str] = None, jobs: int = 0,
+               on_page: Optional[Callable[[PageTiming], None]] = None) -> None:
     """Extract selectable text from a PDF into a UTF-8 .txt file.
-)
+
+    Big PDFs are extracted by several processes (jobs, 0 = one per CPU) and
+    written page by page as they finish; pages="1-10,15" limits the range and
+    on_page receives a PageTiming per page.
     """
-    reader = PdfReader(str(src))
-    chunks = []
-    for page in reader.pages:
-        text = page.extract_text() or ""
-        chunks.append(text.rstrip())
-    content = "\n\n".join(chunks).strip()
-    dst.write_text(content, encoding="utf-8")
+    texts = iter_pages(src, pages, jobs, on_page=on_page)
+    with open_text(dst, "w") as f:
+        write_joined(texts, f.write)
@@ -0,0 +1,148 @@
+"""Multi-hop conversions: route through the registry when there is no direct pair.
+
+The registry is treated as a graph (extensions are nodes, CONVERSIONS pairs are
+edges, EDGE_COSTS weights them) and the cheapest route is found with Dijkstra.
+
+Registry converters take paths or binary file objects (see streams), so the
+file API and convert_stream/convert_bytes run the same function for every
+pair. Between the hops of a route, parsed data (JSON, TOON, YAML), text
+(TXT, Markdown, HTML) and arrays (NPY) are handed over in memory as they are,
+so a route like TOON → JSON → CSV is read once and written once. Other
+intermediates (images, PDF, DOCX, CSV, XML) sit in a spooled temporary file:
+in memory up to SPOOL_SIZE bytes, on disk beyond that. Uploads are therefore
+converted without touching the disk unless they are big.
+"""
+import heapq
+import io
+import shutil
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from . import CONVERSIONS
+from .streams import Handoff, Target
+
+# Relative cost of each hop; anything not listed costs 1. Higher means slower
+# or lossier, so the planner avoids it when another route exists.
+EDGE_COSTS = {
+    (".html", ".md"): 2,      # drops all markup
+    (".txt", ".pdf"): 3,      # page layout
+    (".html", ".pdf"): 3,
+    (".pdf", ".txt"): 3,      # text extraction
+    (".pdf", ".html"): 3,
+    (".png", ".jpg"): 2,      # lossy re-encode
+    (".png", ".jpeg"): 2,
+    (".wav", ".mp3"): 5,
+    (".mp3", ".wav"): 5,
+}
+SPOOL_SIZE = 64 << 20         # bytes an intermediate result may hold in memory
+
+# formats whose converters keep their result for the next hop and take it back
+# from there (streams.keep/take); every reader of these formats has to
+HANDOFF_FORMATS = {".json", ".toon", ".yaml", ".yml", ".txt", ".md", ".html", ".npy"}
+
+
+def edge_cost(pair: Tuple[str, str]) -> float:
+    return EDGE_COSTS.get(pair, 1)
+
+
+def plan(from_ext: str, to_ext: str) -> List[str]:
+    """Cheapest chain of extensions from from_ext to to_ext (both included).
+
+    Raises KeyError when no route exists.
+    """
+    if from_ext == to_ext:
+        raise KeyError((from_ext, to_ext))
+    graph: Dict[str, List[str]] = {}
+    for a, b in CONVERSIONS:
+        graph.setdefault(a, []).append(b)
+
+    best = {from_ext: 0.0}
+    queue = [(0.0, 0, from_ext, [from_ext])]
+    while queue:
+        cost, hops, node, route = heapq.heappop(queue)
+        if node == to_ext:
+            return route
+        if cost > best.get(node, float("inf")):
+            continue
+        for nxt in graph.get(node, []):
+            new_cost = cost + edge_cost((node, nxt))
+            if new_cost < best.get(nxt, float("inf")):
+                best[nxt] = new_cost
+                heapq.heappush(queue, (new_cost, hops + 1, nxt, route + [nxt]))
+    raise KeyError((from_ext, to_ext))
+
+
+def _run(route: List[str], src: Target, dst: Target) -> None:
+    """Convert src into dst along route; each side is a path or a binary file object.
+
+    dst is only written by the last hop, so a failure on the way leaves it untouched.
+    """
+    current = src
+    with ExitStack() as stack:
+        for i, pair in enumerate(zip(route, route[1:])):
+            if i == len(route) - 2:
+                CONVERSIONS[pair](current, dst)
+                return
+            spool = Handoff if pair[1] in HANDOFF_FORMATS else tempfile.SpooledTemporaryFile
+            out = stack.enter_context(spool(SPOOL_SIZE))
+            CONVERSIONS[pair](current, out)
+            out.seek(0)
+            current = out
+
+
+def run_route(route: List[str], src: Path, dst: Path) -> None:
+    """Convert src into dst along route (a list of extensions from plan())."""
+    _run(route, Path(src), Path(dst))
+
+
+def convert_stream(src: BinaryIO, dst: BinaryIO, from_ext: str, to_ext: str,
+                   profile: Optional[str] = None) -> None:
+    """Read from_ext data from src and write to_ext data to dst (binary file objects).
+
+    Runs the registry function for a direct pair and chains formats like
+    find_converter otherwise. Raises KeyError when the formats are not
+    connected. profile selects the image encoder profile.
+    """
+    from .image_profiles import use_profile
+    route = [from_ext, to_ext] if (from_ext, to_ext) in CONVERSIONS else plan(from_ext, to_ext)
+    with use_profile(profile), ExitStack() as stack:
+        if not src.seekable():
+            # some converters read their input twice (header pass, then rows)
+            spool = stack.enter_context(tempfile.SpooledTemporaryFile(SPOOL_SIZE))
+            shutil.copyfileobj(src, spool)
+            spool.seek(0)
+            src = spool
+        _run(route, src, dst)
+
+
+def convert_bytes(data: Union[bytes, memoryview], from_ext: str, to_ext: str,
+                  profile: Optional[str] = None) -> bytes:
+    """Same as convert_stream, for a whole file already held in memory."""
+    out = io.BytesIO()
+    convert_stream(io.BytesIO(data), out, from_ext, to_ext, profile)
+    return out.getvalue()
+
+
+@dataclass(frozen=True)
+class Route:
+    """A planned multi-hop conversion, callable like any registry function."""
+    steps: Tuple[str, ...]
+
+    def __call__(self, src: Path, dst: Path) -> None:
+        run_route(list(self.steps), src, dst)
+
+    def __repr__(self) -> str:
+        return "route(" + " → ".join(self.steps) + ")"
+
+
+def find_converter(from_ext: str, to_ext: str) -> Callable[[Path, Path], None]:
+    """The registry function for a pair, or a planned Route when there is none.
+
+    Raises KeyError when the formats are not connected at all.
+    """
+    if (from_ext, to_ext) in CONVERSIONS:
+        return CONVERSIONS[(from_ext, to_ext)]
+    return Route(tuple(plan(from_ext, to_ext)))
@@ -0,0 +1,107 @@
+"""Paths or binary file objects, as taken by every registry converter.
+
+A converter's src/dst is either a path (str or Path) or a binary file object,
+so the file API (convert_all, the CLI) and the bytes API (convert_bytes,
+convert_stream) share one implementation per pair. Streams are used from
+their current position and left open.
+
+Between the hops of a route the planner passes a Handoff: a converter whose
+result is already a Python value (parsed data, text, an array) leaves it
+there with keep(), and the next converter gets it back with take() instead
+of parsing what the previous one would have written.
+"""
+import io
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, Optional, TextIO, Union
+
+Target = Union[str, Path, BinaryIO]
+
+
+def is_path(target: Target) -> bool:
+    return isinstance(target, (str, Path))
+
+
+@contextmanager
+def open_text(target: Target, mode: str = "r", *, errors: str = "strict",
+              newline=None, buffering: int = -1) -> Iterator[io.TextIOWrapper]:
+    """UTF-8 text file for target; a stream is wrapped and detached again afterwards."""
+    if is_path(target):
+        with open(target, mode, encoding="utf-8", errors=errors, newline=newline,
+                  buffering=buffering) as f:
+            yield f
+        return
+    f = io.TextIOWrapper(target, encoding="utf-8", errors=errors, newline=newline)
+    try:
+        yield f
+    finally:
+        f.flush()
+        f.detach()
+
+
+@contextmanager
+def open_binary(target: Target, mode: str = "rb") -> Iterator[BinaryIO]:
+    if is_path(target):
+        with open(target, mode) as f:
+            yield f
+    else:
+        yield target
+
+
+class Handoff(tempfile.SpooledTemporaryFile):
+    """Intermediate result between two hops of a route.
+
+    Either holds a value kept by the converter that produced it, or is the
+    spooled temporary file it wrote to.
+    """
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self.kept = False
+        self.value: Any = None
+
+
+def keep(dst: Target, value: Any, check: Optional[Callable[[Any], bool]] = None) -> bool:
+    """Hand value to the next hop instead of writing it, when dst is a Handoff.
+
+    check(value) must pass too: it tells values that would read back unchanged
+    from the written file. Returns False when the caller still has to write dst.
+    """
+    if not isinstance(dst, Handoff) or (check is not None and not check(value)):
+        return False
+    dst.kept, dst.value = True, value
+    return True
+
+
+def kept(src: Target) -> bool:
+    return isinstance(src, Handoff) and src.kept
+
+
+def take(src: Target, load: Callable[[TextIO], Any], errors: str = "strict") -> Any:
+    """The value the previous hop kept in src, or load() of src opened as text."""
+    if kept(src):
+        return src.value
+    with open_text(src, errors=errors) as f:
+        return load(f)
+
+
+def read_text(src: Target, errors: str = "strict") -> str:
+    return take(src, lambda f: f.read(), errors)
+
+
+def write_text(dst: Target, text: str) -> None:
+    if isinstance(dst, Handoff):
+        # with the newlines reading the file back would give
+        keep(dst, text.replace("\r\n", "\n").replace("\r", "\n"))
+        return
+    with open_text(dst, "w") as f:
+        f.write(text)
+
+
+def rewinder(src: Target) -> Callable[[], None]:
+    """Function that puts src back where it is now, for readers making several passes."""
+    if is_path(src):
+        return lambda: None
+    pos = src.tell()
+    return lambda: src.seek(pos)
@@ -1,20 +1,41 @@
-from pathlib import Path
 import csv
-import json
 import xmltodict
-from typing import Any
+from typing import Any, List, Optional, Sequence
 
+from . import json_codec
+from .csv_json import rows_to_records
+from .streams import Target, open_text, read_text, rewinder, write_text
+from .xml_stream import each_record
 
-def xml_to_csv(src: Path, dst: Path) -> None:
+
+def xml_to_csv(src: Target, dst: Target, record_depth: Optional[int] = None, record_tag: Optional[str] = None,
+               fieldnames: Optional[Sequence[str]] = None, sample: Optional[int] = None) -> None:
     """XML → CSV (simple).
 
     - Tries to find a list of dicts in the XML to use as rows
     - If not found, writes a single-row table from the root dict
     - Nested values (dict/list) are JSON strings
+
+    record_depth=N streams instead: every element N levels down (2 = children
+    of the root), optionally only those named record_tag, becomes a row, and
+    only one of them is in memory at a time:
+    - by default one pass collects the header (keys in first-seen order), a second writes rows
+    - fieldnames=[...] uses a given header and skips the first pass
+    - sample=N builds the header from the first N records only
     """
-    text = Path(src).read_text(encoding="utf-8", errors="ignore")
+    if record_depth is not None:
+        _stream_to_csv(src, dst, record_depth, record_tag, fieldnames, sample)
+        return
+    text = read_text(src, errors="ignore")
     data: Any = xmltodict.parse(text)
 
+    rows = xml_data_to_rows(data)
+    with open_text(dst, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def xml_data_to_rows(data: Any) -> List[List[str]]:
+    """Parsed XML → CSV rows, header first (rules in xml_to_csv)."""
     rows = []
     if isinstance(data, list) and data and isinstance(data[0], dict):
         rows = data
@@ -31,33 +52,55 @@ def xml_to_csv(src: Path, dst: Path) -> None:
     headers = []
     seen = set()
     for row in rows:
-        if isinstance(row, dict):
-            for k in row.keys():
-                if k not in seen:
-                    headers.append(k)
-                    seen.add(k)
-
-    def cell(x):
-        if isinstance(x, (dict, list)):
-            return json.dumps(x, ensure_ascii=False, separators=(",", ":"))
-        return "" if x is None else str(x)
-
-    with open(dst, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(headers)
-        for row in rows:
-            if isinstance(row, dict):
-                w.writerow([cell(row.get(h, "")) for h in headers])
-            else:
-                w.writerow([cell(row)])
-
-
-def csv_to_xml(src: Path, dst: Path) -> None:
+        _add_keys(row, headers, seen)
+    return [headers] + [_row(row, headers) for row in rows]
+
+
+def _add_keys(row: Any, headers: List[str], seen: set) -> None:
+    if isinstance(row, dict):
+        for k in row.keys():
+            if k not in seen:
+                headers.append(k)
+                seen.add(k)
+
+
+def _cell(x: Any) -> str:
+    if isinstance(x, (dict, list)):
+        return json_codec.dumps(x)
+    return "" if x is None else str(x)
+
+
+def _row(row: Any, headers: Sequence[str]) -> List[str]:
+    if isinstance(row, dict):
+        return [_cell(row.get(h, "")) for h in headers]
+    # an empty record (<row/>, None) or a bare text one: a full row of empty cells
+    return [""] * len(headers)
+
+
+def _stream_to_csv(src: Target, dst: Target, depth: int, tag: Optional[str],
+                   fieldnames: Optional[Sequence[str]], sample: Optional[int]) -> None:
+    rewind = rewinder(src)      # a stream is read once per pass
+    if fieldnames is None:
+        headers: List[str] = []
+        seen: set = set()
+        each_record(src, lambda row: _add_keys(row, headers, seen), depth, tag, limit=sample)
+        fieldnames = headers
+    with open_text(dst, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        rewind()
+        each_record(src, lambda row: writer.writerow(_row(row, fieldnames)), depth, tag)
+
+
+def rows_to_xml_tree(rows: List[List[str]]) -> dict:
+    """CSV rows (header first) → <root><row>...</row></root> tree."""
+    return {"root": {"row": rows_to_records(rows)}}
+
+
+def csv_to_xml(src: Target, dst: Target) -> None:
     """CSV → XML (rows under <root><row>...> using header names)."""
-    with open(src, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+    with open_text(src, newline="") as f:
+        rows = list(csv.reader(f))
 
-    obj = {"root": {"row": rows}}
-    xml_str = xmltodict.unparse(obj, pretty=True)
-    Path(dst).write_text(xml_str, encoding="utf-8")
+    xml_str = xmltodict.unparse(rows_to_xml_tree(rows), pretty=True)
+    write_text(dst, xml_str)
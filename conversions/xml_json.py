@@ -1,17 +1,53 @@
-from pathlib import Path
-import json
+from typing import Optional
 import xmltodict
 
+from . import json_codec
+from .streams import Target, keep, open_text, take, write_text
+from .xml_stream import each_record
 
-def xml_to_json(src: Path, dst: Path) -> None:
-    """XML → JSON (pretty)."""
-    with open(src, "r", encoding="utf-8") as f:
+
+def xml_to_json(src: Target, dst: Target, record_depth: Optional[int] = None,
+                record_tag: Optional[str] = None) -> None:
+    """XML → JSON (pretty).
+
+    record_depth=N streams instead: every element N levels down (2 = children
+    of the root), optionally only those named record_tag, is written as one
+    item of a top-level JSON array, one record in memory at a time.
+    """
+    if record_depth is not None:
+        with open_text(dst, "w") as f:
+            sep = "[\n"
+
+            def write(record) -> None:
+                nonlocal sep
+                # same layout as json_codec.dump(records, indent=2): items indented one level
+                f.write(sep + "  " + json_codec.dumps(record, indent=2).replace("\n", "\n  "))
+                sep = ",\n"
+            count = each_record(src, write, record_depth, record_tag)
+            f.write("\n]" if count else "[]")
+        return
+    with open_text(src) as f:
         data = xmltodict.parse(f.read())
-    with open(dst, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if keep(dst, data, json_codec.is_plain):
+        return
+    with open_text(dst, "w") as f:
+        json_codec.dump(data, f, indent=2)
 
 
-def json_to_xml(src: Path, dst: Path) -> None:
+def to_xml_tree(data):
+    """Give parsed data a single XML root (rules in json_to_xml)."""
+    if isinstance(data, dict) and len(data) == 1:
+        # Single key: use it as root
+        root_name, content = next(iter(data.items()))
+        return {root_name: content}
+    if isinstance(data, dict):
+        return {"root": data}
+    if isinstance(data, list):
+        return {"root": {"item": data}}
+    return {"root": {"value": data}}
+
+
+def json_to_xml(src: Target, dst: Target) -> None:
     """JSON → XML (smart root + proper XML declaration).
 
     Rules:
@@ -20,22 +56,9 @@ def json_to_xml(src: Path, dst: Path) -> None:
     - list → <root><item>...</item></root>
     - scalar → <root><value>...</value></root>
     """
-    with open(src, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    # Pick the root structure
-    if isinstance(data, dict) and len(data) == 1:
-        # Single key: use it as root
-        root_name, content = next(iter(data.items()))
-        obj = {root_name: content}
-    elif isinstance(data, dict):
-        obj = {"root": data}
-    elif isinstance(data, list):
-        obj = {"root": {"item": data}}
-    else:
-        obj = {"root": {"value": data}}
+    data = take(src, json_codec.load)
 
     # Generate XML with declaration
-    xml_body = xmltodict.unparse(obj, pretty=True, full_document=False)
+    xml_body = xmltodict.unparse(to_xml_tree(data), pretty=True, full_document=False)
     xml_str = '<?xml version="1.0" encoding="utf-8"?>\n' + xml_body
-    Path(dst).write_text(xml_str, encoding="utf-8")
+    write_text(dst, xml_str)
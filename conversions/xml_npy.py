@@ -1,66 +1,299 @@
-from pathlib import Path
-from typing import Any, Optional
+from itertools import chain
+from typing import Dict, Iterator, List, Optional
+from xml.parsers import expat
 import numpy as np
 import xmltodict
 
+from .npy_emit import group_rows, is_plain_numeric, iter_row_blocks, load_mmap, save_npy, text_values, write_chunks
+from .streams import Target, open_binary, write_text
 
-def _find_first_list(obj: Any) -> Optional[list]:
-    """Find the first Python list inside a parsed-XML structure.
-    Keeps it simple: looks through dict values and nested containers.
+_XML_HEAD = '<?xml version="1.0" encoding="utf-8"?>\n'
+_CHUNK = 1 << 20
+BLOCK_VALUES = 1 << 16  # values converted per NumPy call
+
+
+class _Found(Exception):
+    pass
+
+
+def _open_chunks(src) -> Iterator[bytes]:
+    """Binary chunks of a path or binary file object."""
+    with open_binary(src) as f:
+        yield from iter(lambda: f.read(_CHUNK), b"")
+
+
+def _default_path(chunks: Iterator[bytes], seen: List[bytes]) -> List[str]:
+    """Element path of the values when none is given (rules in read_numeric_xml); read chunks go to seen."""
+    parser = expat.ParserCreate()
+    stack: List[str] = []
+    kids: List[Dict[str, bool]] = []            # per open element: child name → first one was a leaf
+    first_leaf: List[str] = []
+    found: List[str] = []
+
+    def start(name, attrs) -> None:
+        if kids:
+            if name in kids[-1]:
+                # the first repeated element: a list in the old dict-tree terms
+                found.extend(stack + [name] if kids[-1][name] else stack + [name, "*"])
+                raise _Found
+            if len(kids) > 1:
+                kids[-2][stack[-1]] = False     # the open element has children
+            kids[-1][name] = True
+        stack.append(name)
+        kids.append({})
+
+    def end(name) -> None:
+        if not first_leaf:
+            first_leaf.extend(stack[:-1] + ["*"])
+        stack.pop()
+        kids.pop()
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    try:
+        for chunk in chunks:
+            seen.append(chunk)
+            parser.Parse(chunk, False)
+        parser.Parse(b"", True)
+    except _Found:
+        return found
+    if not first_leaf:
+        raise ValueError("Could not find any values in XML to convert to a numeric array")
+    return first_leaf
+
+
+_BOOL_WORDS = {"true": "1", "false": "0"}
+
+
+def _to_array(values: List[str], dtype: np.dtype, first: int) -> np.ndarray:
+    # NumPy parses the strings in C; empty elements are missing numbers for float dtypes
+    if dtype.kind in "fc" and "" in values:
+        values = [x or "nan" for x in values]
+    # NumPy reads any non-empty string as True, so bools are parsed as numbers (or true/false)
+    parse = np.dtype(float) if dtype.kind == "b" else dtype
+    if dtype.kind == "b":
+        values = [_BOOL_WORDS.get(x.lower(), x) for x in values]
+    try:
+        out = np.array(values, dtype=parse)
+    except ValueError:
+        # slow path only to point at the offending value
+        for i, x in enumerate(values):
+            try:
+                np.array(x, dtype=parse)
+            except ValueError:
+                raise ValueError(f"Value {first + i + 1}: {x!r} is not a valid {dtype}") from None
+        raise
+    return out != 0 if dtype.kind == "b" else out
+
+
+class _Rows:
+    """Growing 2D (or 1D) output buffer; short rows are padded with fill.
+
+    With fill=None the cells past a row's end are left unset (for "truncate",
+    which cuts them off anyway), so no fill has to fit the dtype.
     """
-    if isinstance(obj, list):
-        return obj
-    if isinstance(obj, dict):
-        for v in obj.values():
-            found = _find_first_list(v)
-            if found is not None:
-                return found
-    return None
 
+    def __init__(self, dtype: np.dtype, fill, two_d: bool):
+        self.dtype, self.fill, self.two_d = dtype, fill, two_d
+        self.out = np.empty((1024, 0) if two_d else 1024, dtype=dtype)
+        self.n = 0
 
-def xml_to_npy(src: Path, dst: Path) -> None:
-    """XML → NPY (numeric arrays only).
+    def _reserve(self, rows: int, width: int) -> None:
+        if self.n + rows <= len(self.out) and (not self.two_d or width <= self.out.shape[1]):
+            return
+        # grow by doubling so appends stay amortised O(1)
+        length = max(2 * len(self.out), self.n + rows) if self.n + rows > len(self.out) else len(self.out)
+        if not self.two_d:
+            grown = np.empty(length, dtype=self.dtype)
+            grown[:self.n] = self.out[:self.n]
+        else:
+            old = self.out.shape[1]
+            grown = np.empty((length, max(old, width)), dtype=self.dtype)
+            grown[:self.n, :old] = self.out[:self.n]
+            if self.fill is not None and self.n and width > old:
+                grown[:self.n, old:] = self.fill
+        self.out = grown
+
+    def add(self, flat: np.ndarray, lengths: Optional[np.ndarray] = None) -> None:
+        if not self.two_d:
+            self._reserve(len(flat), 0)
+            self.out[self.n:self.n + len(flat)] = flat
+            self.n += len(flat)
+            return
+        rows, width = len(lengths), max(int(lengths.max()), self.out.shape[1])
+        self._reserve(rows, width)
+        block = self.out[self.n:self.n + rows]
+        if (lengths == width).all():
+            block[:] = flat.reshape(rows, width)
+        else:
+            present = np.arange(width) < lengths[:, None]
+            block[present] = flat                                   # row-major, so values land in order
+            if self.fill is not None:
+                block[~present] = self.fill
+        self.n += rows
+
+    def result(self) -> np.ndarray:
+        return self.out[:self.n]
 
-    Heuristic:
-    - Parse XML with xmltodict
-    - Find the first list in the structure
-      • If it's a list of numbers -> 1xN array
-      • If it's a list of lists of numbers -> NxM array
-    - Otherwise, raise a clear error
+
+def read_numeric_xml(src, path: Optional[str] = None, dtype=float,
+                     ragged: str = "error", fill=np.nan) -> np.ndarray:
+    """Numeric values of src (a path or binary file object) as an array, without a dict tree.
+
+    - path: slash-separated element names from the root down to the value
+      elements, "*" matching any name ("root/row/item"). With two names the
+      result is 1D; with more, each parent of the values is one row of a 2D
+      array. By default the first element that repeats among its siblings:
+      the repeats themselves if they hold text ("data/v", skipping metadata
+      elements before them), or every leaf inside each of them ("root/row/*"),
+      so npy_to_xml output reads back as the same array. Without any repeats,
+      every leaf under the parent of the first leaf.
+    - dtype: output dtype; empty elements become NaN for float dtypes, and
+      bool reads numbers (non-zero is True) or true/false
+    - ragged: what to do with rows of different lengths: "error" (ValueError),
+      "pad" (fill short rows up to the longest with fill) or "truncate"
+      (cut every row to the shortest)
+
+    expat hands the value texts over as it parses; they are converted by
+    NumPy a block at a time into a growing buffer.
     """
-    text = Path(src).read_text(encoding="utf-8", errors="ignore")
-    data = xmltodict.parse(text)
+    dtype = np.dtype(dtype)
+    if ragged not in ("error", "pad", "truncate"):
+        raise ValueError(f"ragged must be 'error', 'pad' or 'truncate', got {ragged!r}")
+    if ragged == "pad" and dtype.kind not in "fc" and np.isnan(fill):
+        raise ValueError(f"ragged='pad' with {dtype} needs a fill value that fits it")
+
+    chunks = _open_chunks(src)
+    seen: List[bytes] = []
+    if path is None:
+        parts = _default_path(chunks, seen)
+    else:
+        parts = path.strip("/").split("/")
+    if len(parts) < 2:
+        raise ValueError(f"Element path {path!r} must name the root and the value elements")
+    depth, two_d = len(parts), len(parts) > 2
 
-    arr_like = _find_first_list(data)
-    if arr_like is None:
-        raise ValueError("Could not find a list in XML to convert to a numeric array")
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    level = 0                       # depth of the innermost open element
+    miss = 0                        # level where the open elements stopped matching parts (0: they all match)
+    text: List[str] = []
+    values: List[str] = []
+    lengths: List[int] = []
+    row_start = 0
+    done = 0                        # values already converted
+    rows = _Rows(dtype, fill if ragged == "pad" else None, two_d)
+    expected: Optional[int] = None  # length of the first row
+    shortest: Optional[int] = None
 
-    # Let NumPy coerce to float; shape nicely
-    arr = np.asarray(arr_like, dtype=float)
-    if arr.ndim == 0:  # scalar
-        arr = arr.reshape(1, 1)
-    elif arr.ndim == 1:  # 1D -> 1xN
-        arr = arr.reshape(1, -1)
+    def flush() -> None:
+        nonlocal values, lengths, row_start, done, expected, shortest
+        if not values and not lengths:
+            return
+        flat = _to_array(values, dtype, done)
+        if two_d:
+            lens = np.array(lengths)
+            if expected is None:
+                expected = lengths[0]
+            if ragged == "error" and (lens != expected).any():
+                bad = int(np.flatnonzero(lens != expected)[0])
+                raise ValueError(f"Row {rows.n + bad + 1} has {lengths[bad]} values, expected {expected} "
+                                 "(pass ragged='pad' or 'truncate')")
+            low = int(lens.min())
+            shortest = low if shortest is None else min(shortest, low)
+            rows.add(flat, lens)
+        else:
+            rows.add(flat)
+        done += len(values)
+        values, lengths, row_start = [], [], 0
 
-    np.save(dst, arr, allow_pickle=False)
+    def start(name, attrs) -> None:
+        nonlocal level, miss
+        level += 1
+        if miss:
+            return
+        if level > depth or (parts[level - 1] != name and parts[level - 1] != "*"):
+            miss = level
+        elif level == depth:
+            text.clear()
 
+    def end(name) -> None:
+        nonlocal level, miss, row_start
+        if miss:
+            if miss == level:
+                miss = 0
+        elif level == depth:
+            values.append("".join(text).strip())
+            if not two_d and len(values) >= BLOCK_VALUES:
+                flush()
+        elif two_d and level == depth - 1:
+            lengths.append(len(values) - row_start)
+            row_start = len(values)
+            if len(values) >= BLOCK_VALUES:
+                flush()
+        level -= 1
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = text.append     # cleared when a value element opens
+    for chunk in chain(seen, chunks):
+        parser.Parse(chunk, False)
+    parser.Parse(b"", True)
+    flush()
+
+    out = rows.result()
+    if two_d and ragged == "truncate" and shortest is not None:
+        out = out[:, :shortest]
+    return out
+
+
+def xml_to_npy(src: Target, dst: Target, path: Optional[str] = None, dtype=float,
+               ragged: str = "error", fill=np.nan) -> None:
+    """XML → NPY (numeric arrays only).
 
-def npy_to_xml(src: Path, dst: Path) -> None:
+    Streams the values of the elements at path into an array (options and
+    defaults in read_numeric_xml); 1D and 2D npy_to_xml output loads back as
+    the array it was written from.
+    """
+    save_npy(dst, read_numeric_xml(src, path, dtype, ragged, fill))
+
+
+def npy_to_xml(src: Target, dst: Target) -> None:
     """NPY → XML (simple <root> structure).
 
     - 1D array -> <root><item>v</item>...</root>
     - 2D array -> <root><row><item>v</item>...</row>...</root>
+
+    Numeric arrays are memory-mapped and written a block of rows at a time;
+    the text matches xmltodict.unparse(..., pretty=True).
     """
-    arr = np.load(src, allow_pickle=False)
+    arr = load_mmap(src)
+
+    if is_plain_numeric(arr) and arr.ndim in (1, 2) and arr.size:
+        write_chunks(dst, _xml_chunks(arr))
+        return
 
+    xml_str = xmltodict.unparse(array_to_xml_tree(arr), pretty=True)
+    write_text(dst, xml_str)
+
+
+def array_to_xml_tree(arr: np.ndarray) -> dict:
     if arr.ndim == 0:
-        data_obj = {"root": {"value": float(arr)}}
-    elif arr.ndim == 1:
-        items = [float(x) for x in arr.tolist()]
-        data_obj = {"root": {"item": items}}
-    else:
-        rows = [{"item": [float(x) for x in row]} for row in arr.tolist()]
-        data_obj = {"root": {"row": rows}}
+        return {"root": {"value": float(arr)}}
+    if arr.ndim == 1:
+        return {"root": {"item": [float(x) for x in arr.tolist()]}}
+    return {"root": {"row": [{"item": [float(x) for x in row]} for row in arr.tolist()]}}
+
 
-    xml_str = xmltodict.unparse(data_obj, pretty=True)
-    Path(dst).write_text(xml_str, encoding="utf-8")
+def _xml_chunks(arr: np.ndarray):
+    yield _XML_HEAD + "<root>\n"
+    for block in iter_row_blocks(arr):
+        text = text_values(block, as_float=True)
+        if arr.ndim == 1:
+            yield "".join([f"\t<item>{v}</item>\n" for v in text])
+        else:
+            yield "".join([
+                "\t<row>\n\t\t<item>" + "</item>\n\t\t<item>".join(row) + "</item>\n\t</row>\n"
+                for row in group_rows(text, arr.shape[1])
+            ])
+    yield "</root>"
@@ -0,0 +1,45 @@
+"""Stream the repeated record elements of an XML file one at a time.
+
+xmltodict.parse() normally builds the whole document as nested dicts. With
+item_depth it instead hands over each element at that depth as soon as the
+element closes and then drops it, so memory stays at about one record however
+big the file is. Records look exactly like the same elements in a full
+xmltodict.parse() (attributes as "@name", text as "#text", repeated children
+as lists).
+
+Depth counts from the root element: 1 is the root itself, 2 its children (the
+usual <root><row>...</row>...</root> layout), and so on.
+"""
+from typing import Any, Callable, Optional
+
+import xmltodict
+
+from .streams import Target, open_binary
+
+DEFAULT_RECORD_DEPTH = 2
+
+
+def each_record(src: Target, callback: Callable[[Any], None], depth: int = DEFAULT_RECORD_DEPTH,
+                tag: Optional[str] = None, limit: Optional[int] = None) -> int:
+    """Call callback(record) for every element at depth (named tag, if given); returns the count.
+
+    limit stops parsing after that many records.
+    """
+    if depth < 1:
+        raise ValueError(f"record depth must be at least 1, got {depth}")
+    count = 0
+
+    def on_item(path, item) -> bool:
+        nonlocal count
+        if tag is not None and path[-1][0] != tag:
+            return True
+        callback(item)
+        count += 1
+        return limit is None or count < limit      # False stops the parser
+
+    with open_binary(src) as f:
+        try:
+            xmltodict.parse(f, item_depth=depth, item_callback=on_item)
+        except xmltodict.ParsingInterrupted:
+            pass
+    return count
@@ -1,18 +1,36 @@
-from pathlib import Path
+from typing import Optional
 import xmltodict
-import yaml
-import json
 
+from . import json_codec, yaml_codec
+from .xml_json import to_xml_tree
+from .streams import Target, keep, open_text, read_text, take, write_text
+from .xml_stream import each_record
 
-def xml_to_yaml(src: Path, dst: Path) -> None:
-    """XML → YAML (pretty, readable)."""
-    text = Path(src).read_text(encoding="utf-8", errors="ignore")
+
+def xml_to_yaml(src: Target, dst: Target, record_depth: Optional[int] = None,
+                record_tag: Optional[str] = None) -> None:
+    """XML → YAML (pretty, readable).
+
+    record_depth=N streams instead: every element N levels down (2 = children
+    of the root), optionally only those named record_tag, is written as one
+    item of a top-level YAML sequence, one record in memory at a time.
+    """
+    if record_depth is not None:
+        with open_text(dst, "w") as f:
+            # a one-item sequence per record; concatenated they are the whole sequence
+            count = each_record(src, lambda record: yaml_codec.dump([record], f), record_depth, record_tag)
+            if not count:
+                f.write("[]\n")
+        return
+    text = read_text(src, errors="ignore")
     data = xmltodict.parse(text)
-    with open(dst, "w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
+    if keep(dst, data, json_codec.is_plain):
+        return
+    with open_text(dst, "w") as f:
+        yaml_codec.dump(data, f)
 
 
-def yaml_to_xml(src: Path, dst: Path) -> None:
+def yaml_to_xml(src: Target, dst: Target) -> None:
     """YAML → XML.
 
     Wraps under <root> when needed:
@@ -20,20 +38,7 @@ def yaml_to_xml(src: Path, dst: Path) -> None:
     - list -> <root><item>...each...</item></root>
     - scalar -> <root><value>...</value></root>
     """
-    with open(src, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
-
-    if isinstance(data, dict):
-        # If there's exactly one top-level key, use it as the root tag
-        if len(data) == 1:
-            root_name, content = next(iter(data.items()))
-            obj = {root_name: content}
-        else:
-            obj = {"root": data}
-    elif isinstance(data, list):
-        obj = {"root": {"item": data}}
-    else:
-        obj = {"root": {"value": data}}
-
-    xml_str = xmltodict.unparse(obj, pretty=True)
-    Path(dst).write_text(xml_str, encoding="utf-8")
+    data = take(src, yaml_codec.load)
+
+    xml_str = xmltodict.unparse(to_xml_tree(data), pretty=True)
+    write_text(dst, xml_str)
@@ -0,0 +1,64 @@
+"""YAML reading and writing shared by every YAML converter.
+
+PyYAML's safe_load/safe_dump run its pure-Python scanner and emitter. When
+PyYAML is built against libyaml, CSafeLoader parses the same documents into
+the same Python objects many times faster, so load() uses it by default and
+falls back to the pure-Python classes otherwise.
+
+The C emitter is just as fast but does not write quite the same text: it
+escapes characters outside the BMP (emoji) even with allow_unicode, folds
+long double-quoted strings at other places and drops the "..." after a
+top-level scalar. dump() therefore keeps the pure-Python emitter unless
+backend="libyaml" is asked for. Output keeps the converters' settings: keys
+in their original order, non-ASCII text as is.
+
+    data = load(f)        # one document; load_all(f) for a multi-document stream
+    dump(data, f)
+
+Compare the backends with benchmarks/yaml_codec.py.
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+import yaml
+
+BACKENDS: Dict[str, Tuple[type, type]] = {"python": (yaml.SafeLoader, yaml.SafeDumper)}
+try:  # only there when PyYAML was built with libyaml
+    BACKENDS["libyaml"] = (yaml.CSafeLoader, yaml.CSafeDumper)
+    LOAD_BACKEND = "libyaml"
+except AttributeError:
+    LOAD_BACKEND = "python"
+DUMP_BACKEND = "python"  # same text as before; see above
+
+DUMP_OPTIONS = {"sort_keys": False, "allow_unicode": True}
+
+
+def _classes(backend: str) -> Tuple[type, type]:
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown YAML backend {backend!r} (available: {', '.join(BACKENDS)})") from None
+
+
+def load_all(stream, backend: Optional[str] = None) -> Iterator[Any]:
+    """Every document of a YAML stream (str or file), one at a time, like yaml.safe_load_all."""
+    return yaml.load_all(stream, Loader=_classes(backend or LOAD_BACKEND)[0])
+
+
+def load(stream, backend: Optional[str] = None) -> Any:
+    """The single document of a YAML stream, like yaml.safe_load.
+
+    An empty stream gives None; several documents raise yaml.YAMLError (use
+    load_all for those).
+    """
+    return yaml.load(stream, Loader=_classes(backend or LOAD_BACKEND)[0])
+
+
+def dump(data: Any, stream: Optional[TextIO] = None, backend: Optional[str] = None, **options) -> Optional[str]:
+    """yaml.safe_dump with the converters' defaults (options override them)."""
+    return yaml.dump(data, stream, Dumper=_classes(backend or DUMP_BACKEND)[1], **{**DUMP_OPTIONS, **options})
+
+
+def dump_all(docs: Iterable[Any], stream: Optional[TextIO] = None, backend: Optional[str] = None,
+             **options) -> Optional[str]:
+    """Several documents as one ----separated stream, like yaml.safe_dump_all."""
+    return yaml.dump_all(docs, stream, Dumper=_classes(backend or DUMP_BACKEND)[1], **{**DUMP_OPTIONS, **options})
@@ -1,52 +1,49 @@
-from pathlib import Path
+from typing import List
 import csv
-import yaml
 
+from . import yaml_codec
+from .streams import Target, keep, open_text, take
 
-def yaml_to_csv(src: Path, dst: Path) -> None:
+
+def yaml_to_csv(src: Target, dst: Target) -> None:
     """YAML → CSV (simple rules).
 
     - list of dicts  -> header from first dict's keys
     - list of scalars -> one column named "value"
     - list of lists  -> rows as-is
     """
-    with open(src, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    data = take(src, yaml_codec.load)
+
+    rows = yaml_data_to_rows(data)
+    with open_text(dst, "w", newline="") as out:
+        csv.writer(out).writerows(rows)
+
 
+def yaml_data_to_rows(data) -> List[list]:
+    """Parsed YAML → CSV rows (rules in yaml_to_csv)."""
     if not isinstance(data, list):
         raise ValueError("YAML must be a list to convert to CSV")
 
     # list of dicts
     if data and isinstance(data[0], dict):
         headers = list(data[0].keys())
-        with open(dst, "w", newline="", encoding="utf-8") as out:
-            w = csv.DictWriter(out, fieldnames=headers)
-            w.writeheader()
-            for row in data:
-                w.writerow({k: row.get(k, "") for k in headers})
-        return
+        return [headers] + [[row.get(k, "") for k in headers] for row in data]
 
     # list of scalars
     if data and not isinstance(data[0], (list, dict)):
-        with open(dst, "w", newline="", encoding="utf-8") as out:
-            w = csv.writer(out)
-            w.writerow(["value"])  # header
-            for item in data:
-                w.writerow([item])
-        return
+        return [["value"]] + [[item] for item in data]
 
     # list of lists (or empty)
-    with open(dst, "w", newline="", encoding="utf-8") as out:
-        w = csv.writer(out)
-        for row in data:
-            w.writerow(row if isinstance(row, list) else [row])
+    return [row if isinstance(row, list) else [row] for row in data]
 
 
-def csv_to_yaml(src: Path, dst: Path) -> None:
+def csv_to_yaml(src: Target, dst: Target) -> None:
     """CSV → YAML (list of lists, keep strings)."""
     rows = []
-    with open(src, newline="", encoding="utf-8") as f:
+    with open_text(src, newline="") as f:
         for row in csv.reader(f):
             rows.append(list(row))
-    with open(dst, "w", encoding="utf-8") as f:
-        yaml.safe_dump(rows, f, sort_keys=False, allow_unicode=True)
+    if keep(dst, rows):
+        return
+    with open_text(dst, "w") as f:
+        yaml_codec.dump(rows, f)
@@ -1,9 +1,11 @@
-from pathlib import Path
 import numpy as np
-import yaml
 
+from . import json_codec, yaml_codec
+from .npy_emit import group_rows, is_plain_numeric, iter_row_blocks, load_mmap, save_npy, write_chunks, yaml_values
+from .streams import Handoff, Target, keep, open_text, take
 
-def yaml_to_npy(src: Path, dst: Path) -> None:
+
+def yaml_to_npy(src: Target, dst: Target) -> None:
     """YAML (list or list-of-lists of numbers) → .npy.
 
     Simple rules:
@@ -11,20 +13,50 @@ def yaml_to_npy(src: Path, dst: Path) -> None:
     - 2D list stays 2D
     - Values must be numeric (coerced to float)
     """
-    with open(src, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    data = take(src, yaml_codec.load)
+
+    save_npy(dst, data_to_array(data))
+
 
+def data_to_array(data) -> np.ndarray:
+    """Nested lists of numbers → float array, at least 2D."""
     arr = np.asarray(data, dtype=float)
     if arr.ndim == 0:  # scalar → 1x1
         arr = arr.reshape(1, 1)
     elif arr.ndim == 1:  # 1D → 1xN
         arr = arr.reshape(1, -1)
+    return arr
+
+
+def npy_to_yaml(src: Target, dst: Target) -> None:
+    """.npy → YAML (list or list-of-lists).
+
+    Numeric 1D/2D arrays are memory-mapped and written a block of rows at a
+    time; the text matches yaml.safe_dump(arr.tolist()).
+    """
+    arr = load_mmap(src)
+
+    if isinstance(dst, Handoff) and keep(dst, array_to_data(arr), json_codec.is_plain):
+        return
+    if is_plain_numeric(arr) and arr.ndim in (1, 2) and len(arr):
+        write_chunks(dst, _yaml_chunks(arr))
+        return
+    with open_text(dst, "w") as f:
+        yaml_codec.dump(array_to_data(arr), f)
+
 
-    np.save(dst, arr, allow_pickle=False)
+def array_to_data(arr: np.ndarray):
+    """Array → nested Python lists (what gets written as YAML)."""
+    return arr.tolist()
 
 
-def npy_to_yaml(src: Path, dst: Path) -> None:
-    """.npy → YAML (list or list-of-lists)."""
-    arr = np.load(src, allow_pickle=False)
-    with open(dst, "w", encoding="utf-8") as f:
-        yaml.safe_dump(arr.tolist(), f, sort_keys=False, allow_unicode=True)
+def _yaml_chunks(arr: np.ndarray):
+    for block in iter_row_blocks(arr):
+        if arr.ndim == 2 and arr.shape[1] == 0:
+            yield "- []\n" * len(block)
+            continue
+        text = yaml_values(block)
+        if arr.ndim == 1:
+            yield "".join([f"- {v}\n" for v in text])
+        else:
+            yield "".join(["- - " + "\n  - ".join(row) + "\n" for row in group_rows(text, arr.shape[1])])
@@ -1,23 +1,355 @@
-from pathlib import Path
-from conversions import CONVERSIONS
+import argparse
+import os
+import shutil
+import signal
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+import metrics
+from conversions.image_profiles import PROFILES, check_profile, profile_tag, use_profile
+from conversions.planner import convert_bytes, find_converter
+from manifest import Manifest, converter_id
+from metrics import ConversionRecord
 
 
 def normalize_ext(ext: str) -> str:
     ext = ext.strip().lower()                                   # checks for .ext format, if wrong, fixes it (lowercase and adds dot)
-    return "." + ext if not ext.startswith(".") else ext 
+    return "." + ext if not ext.startswith(".") else ext
 
 
-def convert_all(root: str, from_ext: str, to_ext: str):
-    from_ext = normalize_ext(from_ext)
-    to_ext = normalize_ext(to_ext)
+@dataclass
+class FileResult:
+    """Outcome of converting a single file."""
+    src: Path
+    dst: Path
+    seconds: float
+    error: Optional[str] = None
+    metrics: Optional[ConversionRecord] = None                  # sizes, CPU time and peak memory
 
-    func = CONVERSIONS[(from_ext, to_ext)]                      # get the conversion function
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
-    root_path = Path(root)
 
+@dataclass
+class BatchSummary:
+    """Everything convert_all did: one FileResult per file plus total wall time."""
+    results: List[FileResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    skipped: int = 0                                            # up-to-date files left alone in incremental mode
+
+    @property
+    def converted(self) -> List[FileResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[FileResult]:
+        return [r for r in self.results if not r.ok]
+
+
+def print_progress(result: FileResult) -> None:
+    """Default progress callback: one line per file, failures on stderr."""
+    if result.ok:
+        print(f"{result.src} → {result.dst}")                   # displays conversion result
+    else:
+        print(f"{result.src} ✗ {result.error}", file=sys.stderr)
+
+
+def _convert_one(func, from_ext: str, to_ext: str, src: Path, dst: Path) -> FileResult:
+    # measured here (maybe in a worker), emitted by the caller
+    try:
+        with metrics.measure(from_ext, to_ext, str(src), report=False) as record:
+            record.input_bytes = src.stat().st_size
+            func(src, dst)
+            record.output_bytes = dst.stat().st_size
+    except Exception:                                           # keep going, the error is reported per file
+        return FileResult(src, dst, record.wall_seconds, record.error, record)
+    return FileResult(src, dst, record.wall_seconds, metrics=record)
+
+
+def convert_chunk(from_ext: str, to_ext: str, profile: Optional[str],
+                  pairs: List[Tuple[Path, Path]]) -> List[FileResult]:
+    """Convert (src, dst) pairs with one converter, a FileResult each (errors included).
+
+    Meant to run in a worker process: the function is looked up there instead
+    of being pickled.
+    """
+    func = find_converter(from_ext, to_ext)
+    with use_profile(profile):
+        return [_convert_one(func, from_ext, to_ext, src, dst) for src, dst in pairs]
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _run_pool(chunks: Iterator[list], work: Callable[[list], list], jobs: int, ordered: bool,
+              pool: Optional[Executor] = None) -> Iterator:
+    """Feed chunks to a process pool, keeping only a few chunks in flight.
+
+    Chunks are pulled lazily, so a huge tree (or archive) never sits in memory as futures.
+    `work` runs in a worker and returns a list of results per chunk; with ordered=True
+    they come back in input order, otherwise as soon as a chunk is done. A given
+    pool is used as-is and left running.
+    """
+    max_in_flight = jobs * 2
+
+    with ExitStack() as stack:
+        if pool is None:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+        pending = deque()
+        for chunk in islice(chunks, max_in_flight):
+            pending.append(pool.submit(work, chunk))
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [f for f in pending if f in finished]
+                for f in done:
+                    pending.remove(f)
+
+            for future in done:
+                yield from future.result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(pool.submit(work, chunk))
+
+
+def iter_sources(root: str, from_ext: str, to_ext: str) -> Iterator[Tuple[Path, Path]]:
+    """Yield (src, dst) pairs for every file under root with the input extension."""
+    root_path = Path(root)
                                                                 # loops through all files in the folder (and subfolders) that match the input extension
     for path in root_path.rglob(f"*{from_ext}"):
         if path.is_file() and path.name != "README.md":         # ensures we don't convert README.md files
-            dst = path.with_suffix(to_ext)                      # creates new path with the target extension
-            func(path, dst)                                     # calls the conversion function
-            print(f"{path} → {dst}")                            # displays conversion result
+            yield path, path.with_suffix(to_ext)                # creates new path with the target extension
+
+
+def _skip_current(pairs: Iterable[Tuple[Path, Path]], manifest: Manifest, ident: str,
+                  summary: BatchSummary) -> Iterator[Tuple[Path, Path]]:
+    for src, dst in pairs:
+        if manifest.is_current(src, dst, ident):
+            summary.skipped += 1
+        else:
+            yield src, dst
+
+
+def convert_all(root: str, from_ext: str, to_ext: str, jobs: int = 1,
+                chunksize: int = 16, ordered: bool = True,
+                progress: Optional[Callable[[FileResult], None]] = print_progress,
+                incremental: bool = False, profile: Optional[str] = None) -> BatchSummary:
+    """Convert every matching file under root.
+
+    - jobs=1 converts in this process; jobs>1 (or 0 for one per CPU) uses a process pool
+    - chunksize is how many files each pool task handles
+    - ordered controls whether progress is reported in walk order or as files finish
+    - a failing file is recorded in the summary instead of stopping the batch
+    - incremental=True skips files whose output is up to date according to the
+      manifest journal in root, and journals each file as it finishes
+    - profile picks the image encoder settings (fast, balanced, smallest, ...;
+      see conversions.image_profiles)
+    - every file's metrics record goes to the registered sinks (see metrics.py)
+    """
+    from_ext = normalize_ext(from_ext)
+    to_ext = normalize_ext(to_ext)
+
+    func = find_converter(from_ext, to_ext)                     # direct function or multi-hop route (KeyError if unreachable)
+    check_profile(profile)                                      # ValueError before any work
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    summary = BatchSummary()
+    manifest = Manifest(root) if incremental else None
+    ident = converter_id(func) + profile_tag(to_ext, profile)   # other image settings, other output
+
+    pairs = iter_sources(root, from_ext, to_ext)
+    if manifest is not None:
+        pairs = _skip_current(pairs, manifest, ident, summary)
+
+    if jobs == 1:
+        results = (r for chunk in _chunks(pairs, chunksize) for r in convert_chunk(from_ext, to_ext, profile, chunk))
+    else:
+        results = _run_pool(_chunks(pairs, chunksize), partial(convert_chunk, from_ext, to_ext, profile), jobs, ordered)
+
+    try:
+        for result in results:
+            summary.results.append(result)
+            metrics.emit(result.metrics)
+            if manifest is not None and result.ok:
+                manifest.record(result.src, result.dst, ident)
+            if progress is not None:
+                progress(result)
+    finally:
+        if manifest is not None:
+            manifest.compact()
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def _convert_members(from_ext: str, to_ext: str, profile: Optional[str],
+                     members: List[Tuple[str, bytes]]) -> List[Tuple[FileResult, Optional[bytes]]]:
+    # runs inside a worker process: archive members arrive and leave as bytes
+    out = []
+    for name, data in members:
+        src = PurePosixPath(name)
+        dst = src.with_suffix(to_ext)
+        try:
+            with metrics.measure(from_ext, to_ext, name, len(data), report=False) as record:
+                converted = convert_bytes(data, from_ext, to_ext, profile)
+                record.output_bytes = len(converted)
+        except Exception:                                       # reported per member, like files
+            out.append((FileResult(src, dst, record.wall_seconds, record.error, record), None))
+            continue
+        out.append((FileResult(src, dst, record.wall_seconds, metrics=record), converted))
+    return out
+
+
+def convert_archive(src: Union[str, Path, BinaryIO], dst, from_ext: str, to_ext: str,
+                    jobs: int = 1, chunksize: int = 16, keep_other: bool = False,
+                    progress: Optional[Callable[[FileResult], None]] = print_progress,
+                    pool: Optional[Executor] = None, profile: Optional[str] = None) -> BatchSummary:
+    """Convert every matching member of a ZIP into another ZIP, nothing extracted to disk.
+
+    - src is a ZIP path or binary file object; dst is a zip_package.ZipPackage
+    - members keep their folders, only the extension changes (data/a.csv → data/a.json)
+    - jobs/chunksize/pool work like convert_all; members are read lazily, so only
+      a few chunks are in memory at once
+    - keep_other=True copies non-matching members across unchanged; otherwise
+      they are counted in summary.skipped
+    - profile picks the image encoder settings, as in convert_all
+    - metrics are emitted per member, as in convert_all
+    """
+    from_ext = normalize_ext(from_ext)
+    to_ext = normalize_ext(to_ext)
+    find_converter(from_ext, to_ext)                            # KeyError before any work if unreachable
+    check_profile(profile)
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    summary = BatchSummary()
+
+    with zipfile.ZipFile(src) as archive:
+        def members() -> Iterator[Tuple[str, bytes]]:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if PurePosixPath(info.filename).suffix.lower() == from_ext:
+                    yield info.filename, archive.read(info)
+                    continue
+                summary.skipped += 1
+                if keep_other:
+                    with archive.open(info) as r, dst.open(info.filename) as w:
+                        shutil.copyfileobj(r, w)
+
+        work = partial(_convert_members, from_ext, to_ext, profile)
+        if jobs == 1 and pool is None:
+            results = (r for chunk in _chunks(members(), chunksize) for r in work(chunk))
+        else:
+            results = _run_pool(_chunks(members(), chunksize), work, jobs, ordered=False, pool=pool)
+
+        for result, data in results:
+            if data is not None:
+                dst.add(result.dst.as_posix(), data)
+            summary.results.append(result)
+            metrics.emit(result.metrics)
+            if progress is not None:
+                progress(result)
+
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert every matching file under a folder (or inside a ZIP).")
+    parser.add_argument("root", help="folder to scan (recursively), or a .zip archive")
+    parser.add_argument("from_ext", help="input extension, e.g. csv")
+    parser.add_argument("to_ext", help="output extension, e.g. json")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes (0 = one per CPU, default 1)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="files per worker task (default 16)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="report files as they finish instead of in walk order")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip files already converted (tracked in a manifest in root)")
+    parser.add_argument("-o", "--output",
+                        help="output archive when root is a .zip (default: <name>_<to_ext>.zip next to it)")
+    parser.add_argument("--keep-other", action="store_true",
+                        help="with a .zip root, copy members that are not converted into the output too")
+    parser.add_argument("--profile", choices=list(PROFILES),
+                        help="image encoder settings for JPEG/WebP/PNG output (default: Pillow defaults)")
+    parser.add_argument("--timings", action="store_true",
+                        help="print the slowest files at the end")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and convert new or changed files as they appear (implies --incremental)")
+    parser.add_argument("--settle", type=float, default=0.25, metavar="SECONDS",
+                        help="with --watch, how long a file must stay unchanged before it is converted (default 0.25)")
+    parser.add_argument("--poll", type=float, metavar="SECONDS",
+                        help="with --watch, scan every SECONDS instead of using inotify")
+    parser.add_argument("--metrics-jsonl", metavar="PATH",
+                        help=f"append one JSON line of metrics per file (default: ${metrics.JSONL_ENV})")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help=f"write Prometheus text-format metrics to PATH (default: ${metrics.PROMETHEUS_ENV})")
+    args = parser.parse_args(argv)
+    metrics.configure(args.metrics_jsonl, args.metrics_prom)
+
+    in_zip = Path(args.root).is_file() and zipfile.is_zipfile(args.root)
+    if args.watch and in_zip:
+        parser.error("--watch needs a folder, not a .zip")
+    try:
+        if args.watch:
+            from watch import FolderWatcher
+            watcher = FolderWatcher(args.root, args.from_ext, args.to_ext, jobs=args.jobs, profile=args.profile,
+                                    settle=args.settle, backend="poll" if args.poll else "auto",
+                                    poll_interval=args.poll or 1.0)
+            signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+            print(f"Watching {args.root} for {watcher.from_ext} files (Ctrl+C to stop)", file=sys.stderr)
+            summary = watcher.run()
+        elif in_zip:
+            from zip_package import ZipPackage
+            root = Path(args.root)
+            output = Path(args.output or root.with_name(f"{root.stem}_{normalize_ext(args.to_ext)[1:]}.zip"))
+            # build next to the output, then move into place so a failed run leaves nothing half-written
+            with ZipPackage(directory=output.parent) as package:
+                summary = convert_archive(root, package, args.from_ext, args.to_ext, jobs=args.jobs,
+                                          chunksize=args.chunksize, keep_other=args.keep_other,
+                                          profile=args.profile)
+                package.save(output)
+        else:
+            summary = convert_all(args.root, args.from_ext, args.to_ext, jobs=args.jobs,
+                                  chunksize=args.chunksize, ordered=not args.unordered,
+                                  incremental=args.incremental, profile=args.profile)
+    except KeyError:
+        parser.error(f"no conversion from {args.from_ext} to {args.to_ext}")
+    finally:
+        metrics.flush()
+
+    print(f"{len(summary.converted)} converted, {len(summary.failed)} failed, "
+          f"{summary.skipped} {'skipped' if in_zip else 'up to date'} in {summary.elapsed:.2f}s")
+    if args.timings:
+        for r in sorted(summary.results, key=lambda r: r.seconds, reverse=True)[:10]:
+            print(f"  {r.seconds:8.3f}s  {r.src}")
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import metrics
+from conversions.planner import convert_stream, find_converter
+from metrics import ConversionRecord
+
+
+def _convert(data: bytes, dst: str, from_ext: str, to_ext: str, profile: Optional[str],
+             name: Optional[str] = None) -> Tuple[ConversionRecord, Optional[Exception]]:
+    # runs in a worker; top level so it pickles for process pools. The result is
+    # written to dst, not sent back. A failure is returned rather than raised so
+    # its metrics record comes back too.
+    try:
+        with metrics.measure(from_ext, to_ext, name, len(data), report=False) as record:
+            with open(dst, "wb") as out:
+                convert_stream(io.BytesIO(data), out, from_ext, to_ext, profile)
+            record.output_bytes = os.path.getsize(dst)
+    except Exception as e:
+        Path(dst).unlink(missing_ok=True)
+        return record, e
+    return record, None
+
+
+@dataclass
+class FileTask:
+    """One uploaded file inside a job; a converted file is at `path`."""
+    name: str
+    dst_name: str
+    path: Path
+    status: str = "queued"          # queued → done | failed | cancelled
+    error: Optional[str] = None
+    seconds: float = 0.0
+    cached: bool = False
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "queued"
+
+
+@dataclass
+class ConversionJob:
+    """A batch of files converted in the background.
+
+    The pool's callbacks fill in each FileTask as it finishes, so the job
+    can be polled from any thread (e.g. on every Streamlit rerun). Outputs
+    are written to files in `directory` rather than kept in memory; discard()
+    deletes them.
+    """
+    from_ext: str
+    to_ext: str
+    directory: Path
+    tasks: List[FileTask]
+    started: float = field(default_factory=time.time)
+    ended: Optional[float] = None
+
+    @property
+    def finished(self) -> List[FileTask]:
+        return [t for t in self.tasks if t.finished]
+
+    @property
+    def done(self) -> bool:
+        return all(t.finished for t in self.tasks)
+
+    @property
+    def progress(self) -> float:
+        return len(self.finished) / len(self.tasks) if self.tasks else 1.0
+
+    @property
+    def elapsed(self) -> float:
+        return (self.ended or time.time()) - self.started
+
+    def cancel(self) -> None:
+        """Drop files that have not started yet; running ones still finish."""
+        for task in self.tasks:
+            if task.future is not None and task.future.cancel():
+                task.status = "cancelled"
+        self._check_done()
+
+    def discard(self) -> None:
+        """Cancel what has not started and delete the job's output files."""
+        self.cancel()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _check_done(self) -> None:
+        if self.ended is None and self.done:
+            self.ended = time.time()
+
+
+class JobQueue:
+    """Worker pool that runs ConversionJobs off the caller's thread.
+
+    - workers: pool size (<= 0 means one per CPU)
+    - processes: worker processes (CPU-bound converters run in parallel);
+      False uses threads
+    - cache: optional result_cache.ResultCache; hits finish immediately and
+      fresh results are stored in it
+    - directory: where each job gets a folder for its outputs (default: the
+      system temp folder)
+    Every conversion that runs (not cache hits) is emitted to the metrics sinks.
+    """
+
+    def __init__(self, workers: int = 0, processes: bool = True, cache=None,
+                 directory: Union[str, Path, None] = None):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.processes = processes
+        self.cache = cache
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pool: Optional[Executor] = None
+
+    def executor(self) -> Executor:
+        """The shared pool (started on first use)."""
+        with self._lock:
+            if self._pool is None:
+                if self.processes:
+                    # spawn: forking a threaded web server is not safe
+                    ctx = multiprocessing.get_context("spawn")
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx)
+                else:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="convert")
+            return self._pool
+
+    def submit(self, files: Sequence[Tuple[str, bytes]], from_ext: str, to_ext: str,
+               profile: Optional[str] = None) -> ConversionJob:
+        """Queue (name, bytes) files for from_ext → to_ext and return the job at once.
+
+        profile is the image encoder profile. Raises KeyError up front when
+        the formats are not connected.
+        """
+        find_converter(from_ext, to_ext)                # KeyError before anything is created
+        directory = Path(tempfile.mkdtemp(prefix="convert-job-", dir=self.directory))
+        job = ConversionJob(from_ext, to_ext, directory, [
+            # numbered so uploads with the same name don't overwrite each other's output
+            FileTask(name, Path(name).with_suffix(to_ext).name, directory / f"{i}{to_ext}")
+            for i, (name, _) in enumerate(files)
+        ])
+        for task, (_, data) in zip(job.tasks, files):
+            key = None
+            if self.cache is not None:
+                key = self.cache.key(data, from_ext, to_ext, profile)
+                hit = self.cache.lookup(key)
+                if hit is not None:
+                    task.path.write_bytes(hit)
+                    task.cached, task.status = True, "done"
+                    continue
+            task.future = self._submit(data, task.path, from_ext, to_ext, profile, task.name)
+            task.future.add_done_callback(lambda f, t=task, k=key: self._finish(job, t, k, f))
+        job._check_done()
+        return job
+
+    def _submit(self, data: bytes, dst: Path, from_ext: str, to_ext: str, profile: Optional[str],
+                name: str) -> Future:
+        args = (_convert, data, str(dst), from_ext, to_ext, profile, name)
+        try:
+            return self.executor().submit(*args)
+        except BrokenProcessPool:
+            # a worker died (e.g. out of memory); start a fresh pool once
+            with self._lock:
+                self._pool = None
+            return self.executor().submit(*args)
+
+    def _finish(self, job: ConversionJob, task: FileTask, key: Optional[str], future: Future) -> None:
+        exc = None
+        if not future.cancelled():
+            exc = future.exception()            # the pool itself failed (e.g. a worker died)
+            if exc is None:
+                record, exc = future.result()
+                task.seconds = record.wall_seconds
+                metrics.emit(record)
+        if future.cancelled():
+            task.status = "cancelled"
+        elif exc is not None:
+            task.error = "Conversion not available" if isinstance(exc, KeyError) else str(exc)
+            task.status = "failed"
+        else:
+            if key is not None:
+                try:
+                    self.cache.put_file(key, task.path)
+                except OSError:
+                    pass                    # a full cache disk must not fail the conversion
+            task.status = "done"
+        task.future = None
+        job._check_done()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict
+
+MANIFEST_NAME = ".convert-manifest.jsonl"
+
+
+def file_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks so big files don't sit in memory."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def converter_id(func: Callable) -> str:
+    """Name that changes when a different function handles a pair."""
+    # planned routes are instances, not functions; their repr names the hops
+    return f"{func.__module__}.{getattr(func, '__qualname__', repr(func))}"
+
+
+class Manifest:
+    """Journal of finished conversions under a root folder (JSON-lines).
+
+    One line is appended (and flushed) per converted file, so an interrupted
+    batch keeps everything it finished. On load, later lines win over earlier
+    ones for the same (src, dst); compact() rewrites the file without the
+    superseded lines.
+    """
+
+    def __init__(self, root: Path, name: str = MANIFEST_NAME):
+        self.root = Path(root)
+        self.path = self.root / name
+        self.entries: Dict[str, dict] = {}
+        self._lines = 0
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue                                # torn last line from an interrupted run
+                    self.entries[self._key(entry["src"], entry["dst"])] = entry
+                    self._lines += 1
+        self._fh = None
+
+    @staticmethod
+    def _key(src: str, dst: str) -> str:
+        return f"{src}\0{dst}"
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return Path(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def is_current(self, src: Path, dst: Path, converter: str) -> bool:
+        """True if dst was produced from this exact src by this converter.
+
+        Fast path: same size and mtime as recorded. Otherwise the source is
+        hashed, and a matching hash counts as unchanged (e.g. after a touch or
+        a fresh checkout), refreshing the recorded mtime.
+        """
+        entry = self.entries.get(self._key(self._rel(src), self._rel(dst)))
+        if entry is None or entry.get("converter") != converter:
+            return False
+
+        try:
+            out = os.stat(dst)
+            st = os.stat(src)
+        except FileNotFoundError:
+            return False
+        if out.st_size != entry["out_size"]:
+            return False
+
+        if st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if st.st_size != entry["size"] or file_hash(src) != entry["sha256"]:
+            return False
+
+        self._append(dict(entry, mtime_ns=st.st_mtime_ns))
+        return True
+
+    def record(self, src: Path, dst: Path, converter: str) -> None:
+        """Journal a successful conversion of src into dst."""
+        st = os.stat(src)
+        self._append({
+            "src": self._rel(src),
+            "dst": self._rel(dst),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": file_hash(src),
+            "converter": converter,
+            "out_size": os.path.getsize(dst),
+            "out_sha256": file_hash(dst),
+        })
+
+    def _append(self, entry: dict) -> None:
+        self.entries[self._key(entry["src"], entry["dst"])] = entry
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8")
+            if self._fh.tell() and not self._ends_with_newline():
+                self._fh.write("\n")                            # don't glue onto a torn line
+        self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        self._lines += 1
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def compact(self) -> None:
+        """Rewrite the journal keeping only the latest line per file."""
+        self.close()
+        if self._lines <= len(self.entries):
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+        self._lines = len(self.entries)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.compact()
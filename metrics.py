@@ -0,0 +1,334 @@
+"""Per-conversion metrics: what ran, how big, how long, how much memory.
+
+measure() wraps one converter call and fills in a ConversionRecord; emit()
+hands finished records to every registered sink:
+
+    with metrics.measure(".csv", ".json", name="a.csv") as record:
+        record.input_bytes = src.stat().st_size
+        csv_to_json(src, dst)
+        record.output_bytes = dst.stat().st_size
+
+Converters that run in worker processes measure there with report=False and
+send the record back with their result; the parent emits it, so file sinks
+have a single writer and the Aggregator sees every conversion.
+
+Sinks:
+- JsonLinesSink: one JSON object per conversion, appended and flushed
+- PrometheusSink: counters and a latency histogram per pair, rewritten as a
+  text-format file (for node_exporter's textfile collector) at most every
+  `interval` seconds and on flush()
+- Aggregator: in-process p50/p95 latency and throughput per pair (the app's
+  Metrics tab)
+
+configure() registers the file sinks from paths or from the
+CONVERTER_METRICS_JSONL / CONVERTER_METRICS_PROM environment variables.
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:  # not on Windows
+    import resource
+except ImportError:
+    resource = None
+
+JSONL_ENV = "CONVERTER_METRICS_JSONL"
+PROMETHEUS_ENV = "CONVERTER_METRICS_PROM"
+
+
+@dataclass
+class ConversionRecord:
+    """One converter call."""
+    from_ext: str
+    to_ext: str
+    name: Optional[str] = None          # file or member name, if any
+    input_bytes: int = 0
+    output_bytes: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0            # this thread only (an ffmpeg child is not counted)
+    peak_rss: int = 0                   # bytes, see _peak_rss()
+    outcome: str = "ok"                 # ok | error
+    error: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def pair(self) -> Tuple[str, str]:
+        return self.from_ext, self.to_ext
+
+
+def _reset_peak() -> None:
+    # Linux: "5" resets VmHWM to the current RSS, so the next read is the peak of this call
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss() -> int:
+    """Peak resident memory of the process since _reset_peak() (Linux) or since it started."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # bytes on macOS, KiB elsewhere
+
+
+_sinks: List = []
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink) -> None:
+    """Send every emitted record to sink.emit(record) from now on."""
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + [sink]
+
+
+def remove_sink(sink) -> None:
+    global _sinks
+    with _sinks_lock:
+        _sinks = [s for s in _sinks if s is not sink]
+
+
+def emit(record: Optional[ConversionRecord]) -> None:
+    """Pass a finished record to every sink (None is ignored). Safe from any thread."""
+    if record is None:
+        return
+    for sink in _sinks:
+        sink.emit(record)
+
+
+def flush() -> None:
+    """Write out anything the sinks are holding back (PrometheusSink between intervals)."""
+    for sink in _sinks:
+        getattr(sink, "flush", lambda: None)()
+
+
+@contextmanager
+def measure(from_ext: str, to_ext: str, name: Optional[str] = None, input_bytes: int = 0,
+            report: bool = True) -> Iterator[ConversionRecord]:
+    """Time the block as one from_ext → to_ext conversion.
+
+    The block may set input_bytes/output_bytes on the yielded record. An
+    exception marks the record as an error and propagates. report=False
+    skips emit(), for records sent back from a worker process.
+    """
+    record = ConversionRecord(from_ext, to_ext, name, input_bytes)
+    _reset_peak()
+    start, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield record
+    except Exception as e:
+        record.outcome, record.error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record.wall_seconds = time.perf_counter() - start
+        record.cpu_seconds = time.thread_time() - cpu
+        record.peak_rss = _peak_rss()
+        if report:
+            emit(record)
+
+
+class JsonLinesSink:
+    """Appends each record to a JSON-lines file, flushed per line."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def emit(self, record: ConversionRecord) -> None:
+        line = json.dumps(asdict(record), ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def read_jsonl(path: Union[str, Path]) -> Iterator[ConversionRecord]:
+    """Records written by a JsonLinesSink (a torn last line is skipped)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield ConversionRecord(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class _PairCounters:
+    def __init__(self):
+        self.outcomes: Dict[str, int] = defaultdict(int)
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.peak_rss = 0
+
+
+class PrometheusSink:
+    """Keeps per-pair totals and writes them as a Prometheus text-format file.
+
+    The file is replaced atomically (temp file + rename), at most once every
+    `interval` seconds and on flush(). Counters start at zero with the process.
+    """
+
+    def __init__(self, path: Union[str, Path], interval: float = 5.0, prefix: str = "file_converter"):
+        self.path = Path(path)
+        self.interval = interval
+        self.prefix = prefix
+        self._pairs: Dict[Tuple[str, str], _PairCounters] = defaultdict(_PairCounters)
+        self._lock = threading.Lock()
+        self._written = 0.0
+
+    def emit(self, record: ConversionRecord) -> None:
+        with self._lock:
+            c = self._pairs[record.pair]
+            c.outcomes[record.outcome] += 1
+            c.count += 1
+            c.seconds += record.wall_seconds
+            c.cpu_seconds += record.cpu_seconds
+            c.input_bytes += record.input_bytes
+            c.output_bytes += record.output_bytes
+            c.peak_rss = max(c.peak_rss, record.peak_rss)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if record.wall_seconds <= bound:
+                    c.buckets[i] += 1
+            due = time.monotonic() - self._written >= self.interval
+        if due:
+            self.flush()
+
+    def render(self) -> str:
+        p = self.prefix
+        lines = {
+            "conversions": [f"# HELP {p}_conversions_total Conversions by pair and outcome.",
+                            f"# TYPE {p}_conversions_total counter"],
+            "seconds": [f"# HELP {p}_conversion_seconds Wall time of one conversion.",
+                        f"# TYPE {p}_conversion_seconds histogram"],
+            "cpu": [f"# HELP {p}_cpu_seconds_total CPU time spent converting.",
+                    f"# TYPE {p}_cpu_seconds_total counter"],
+            "input": [f"# HELP {p}_input_bytes_total Bytes read by conversions.",
+                      f"# TYPE {p}_input_bytes_total counter"],
+            "output": [f"# HELP {p}_output_bytes_total Bytes written by conversions.",
+                       f"# TYPE {p}_output_bytes_total counter"],
+            "rss": [f"# HELP {p}_peak_rss_bytes Highest peak RSS seen during a conversion.",
+                    f"# TYPE {p}_peak_rss_bytes gauge"],
+        }
+        with self._lock:
+            for (src, dst), c in sorted(self._pairs.items()):
+                labels = f'from="{src.lstrip(".")}",to="{dst.lstrip(".")}"'
+                for outcome, n in sorted(c.outcomes.items()):
+                    lines["conversions"].append(f'{p}_conversions_total{{{labels},outcome="{outcome}"}} {n}')
+                for bound, n in zip(LATENCY_BUCKETS, c.buckets):
+                    lines["seconds"].append(f'{p}_conversion_seconds_bucket{{{labels},le="{bound}"}} {n}')
+                lines["seconds"] += [f'{p}_conversion_seconds_bucket{{{labels},le="+Inf"}} {c.count}',
+                                     f"{p}_conversion_seconds_sum{{{labels}}} {c.seconds:.6f}",
+                                     f"{p}_conversion_seconds_count{{{labels}}} {c.count}"]
+                lines["cpu"].append(f"{p}_cpu_seconds_total{{{labels}}} {c.cpu_seconds:.6f}")
+                lines["input"].append(f"{p}_input_bytes_total{{{labels}}} {c.input_bytes}")
+                lines["output"].append(f"{p}_output_bytes_total{{{labels}}} {c.output_bytes}")
+                lines["rss"].append(f"{p}_peak_rss_bytes{{{labels}}} {c.peak_rss}")
+        return "\n".join(line for group in lines.values() for line in group) + "\n"
+
+    def flush(self) -> None:
+        text = self.render()
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._written = time.monotonic()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..1) of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+@dataclass
+class PairStats:
+    """Aggregated numbers for one conversion pair."""
+    from_ext: str
+    to_ext: str
+    count: int
+    failed: int
+    p50_seconds: float
+    p95_seconds: float
+    mb_per_second: float                # input MB over wall time of successful conversions
+    cpu_seconds: float                  # mean per conversion
+    peak_rss: int                       # highest seen
+
+
+class Aggregator:
+    """In-process totals per pair, with latency percentiles over the last `window` conversions."""
+
+    def __init__(self, window: int = 10000):
+        self.window = window
+        self._pairs: Dict[Tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    def emit(self, record: ConversionRecord) -> None:
+        with self._lock:
+            p = self._pairs.get(record.pair)
+            if p is None:
+                p = self._pairs[record.pair] = {"latency": deque(maxlen=self.window), "count": 0, "failed": 0,
+                                                "ok_seconds": 0.0, "ok_bytes": 0, "cpu": 0.0, "rss": 0}
+            p["count"] += 1
+            p["cpu"] += record.cpu_seconds
+            p["rss"] = max(p["rss"], record.peak_rss)
+            if record.outcome != "ok":
+                p["failed"] += 1
+                return
+            p["latency"].append(record.wall_seconds)
+            p["ok_seconds"] += record.wall_seconds
+            p["ok_bytes"] += record.input_bytes
+
+    def load(self, records) -> None:
+        """Feed earlier records in, e.g. read_jsonl() of a JsonLinesSink file."""
+        for record in records:
+            self.emit(record)
+
+    def summary(self) -> List[PairStats]:
+        """One PairStats per pair seen, slowest p95 first."""
+        out = []
+        with self._lock:
+            for (src, dst), p in self._pairs.items():
+                latency = list(p["latency"])
+                out.append(PairStats(
+                    src, dst, p["count"], p["failed"],
+                    percentile(latency, 0.5) if latency else 0.0,
+                    percentile(latency, 0.95) if latency else 0.0,
+                    p["ok_bytes"] / 1e6 / p["ok_seconds"] if p["ok_seconds"] else 0.0,
+                    p["cpu"] / p["count"],
+                    p["rss"],
+                ))
+        return sorted(out, key=lambda s: s.p95_seconds, reverse=True)
+
+
+def configure(jsonl: Union[str, Path, None] = None, prometheus: Union[str, Path, None] = None) -> list:
+    """Register file sinks for the given paths (default: the environment variables); returns them."""
+    jsonl = jsonl or os.environ.get(JSONL_ENV)
+    prometheus = prometheus or os.environ.get(PROMETHEUS_ENV)
+    sinks = []
+    if jsonl:
+        sinks.append(JsonLinesSink(jsonl))
+    if prometheus:
+        sinks.append(PrometheusSink(prometheus))
+    for sink in sinks:
+        add_sink(sink)
+    return sinks
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Tuple, Union
+
+import conversions
+from conversions.planner import convert_bytes, find_converter
+from manifest import converter_id
+
+DEFAULT_MEMORY_LIMIT = 256 << 20   # 256 MiB
+DEFAULT_DISK_LIMIT = 2 << 30       # 2 GiB
+
+
+@lru_cache(maxsize=None)
+def _package_digest() -> bytes:
+    # every module in conversions/, since converters share helpers (codecs, layout, ffmpeg pipe, ...)
+    h = hashlib.sha256()
+    root = Path(conversions.__file__).parent
+    for path in sorted(root.rglob("*.py")):
+        h.update(path.relative_to(root).as_posix().encode("utf-8") + b"\0")
+        h.update(path.read_bytes())
+    return h.digest()
+
+
+@lru_cache(maxsize=None)
+def converter_version(from_ext: str, to_ext: str) -> str:
+    """Fingerprint of the code that converts from_ext → to_ext.
+
+    Covers which function (or planned route) handles the pair and the source
+    of the whole conversions package, so editing a converter or any helper it
+    uses invalidates its results.
+    """
+    func = find_converter(from_ext, to_ext)
+    h = hashlib.sha256(converter_id(func).encode("utf-8"))
+    h.update(_package_digest())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Content-addressed cache of converted bytes, in memory and on disk.
+
+    Keys are (sha256 of the input, from_ext, to_ext, converter_version,
+    image encoder profile).
+    Both tiers are LRU and bounded in bytes:
+    - memory: an OrderedDict, least recently used first
+    - disk: one file per key under `directory`, last use kept as the mtime
+    A disk hit is promoted back into memory. Results bigger than a tier's
+    limit are simply not kept in that tier. Safe to share between threads.
+    """
+
+    def __init__(self, directory: Union[str, Path, None] = None,
+                 memory_limit: int = DEFAULT_MEMORY_LIMIT, disk_limit: int = DEFAULT_DISK_LIMIT):
+        self.directory = Path(directory or Path(tempfile.gettempdir()) / "file-convertor-cache")
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        if disk_limit > 0:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    @staticmethod
+    def key(data: Union[bytes, memoryview], from_ext: str, to_ext: str,
+            profile: Optional[str] = None) -> str:
+        h = hashlib.sha256(data)
+        version = converter_version(from_ext, to_ext)
+        h.update(f"\0{from_ext}\0{to_ext}\0{version}\0{profile or ''}".encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached result for key, or None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        data = self._disk_get(key)
+        if data is not None:
+            with self._lock:
+                self._memory_put(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._memory_put(key, data)
+        self._disk_put(key, len(data), lambda f: f.write(data))
+
+    def put_file(self, key: str, path: Union[str, Path]) -> None:
+        """put() for a result already in a file; it is only read into memory if that tier can keep it."""
+        size = os.path.getsize(path)
+        if size <= self.memory_limit:
+            self.put(key, Path(path).read_bytes())
+            return
+
+        def copy(f: BinaryIO) -> None:
+            with open(path, "rb") as src:
+                shutil.copyfileobj(src, f)
+        self._disk_put(key, size, copy)
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        """get() that also counts the hit or miss."""
+        result = self.get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def convert(self, data: Union[bytes, memoryview], from_ext: str, to_ext: str,
+                profile: Optional[str] = None) -> Tuple[bytes, bool]:
+        """convert_bytes() through the cache; returns (result, was_a_hit)."""
+        key = self.key(data, from_ext, to_ext, profile)
+        result = self.lookup(key)
+        if result is not None:
+            return result, True
+        result = convert_bytes(data, from_ext, to_ext, profile)
+        self.put(key, result)
+        return result, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for path, _, _ in self._disk_entries():
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    # memory tier (callers hold the lock)
+
+    def _memory_put(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_limit:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_limit:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # disk tier
+
+    def _disk_entries(self):
+        """(path, size, last use) of every cached file."""
+        if not self.directory.is_dir():
+            return []
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix == ".tmp":
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue                                    # evicted by another process
+            entries.append((path, st.st_size, st.st_mtime_ns))
+        return entries
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if self.disk_limit <= 0:
+            return None
+        path = self.directory / key
+        try:
+            data = path.read_bytes()
+            os.utime(path)                                  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return data
+
+    def _disk_put(self, key: str, size: int, write: Callable[[BinaryIO], None]) -> None:
+        if size > self.disk_limit:
+            return
+        path = self.directory / key
+        if path.exists():
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)                               # readers never see a partial file
+        with self._lock:
+            self._disk_bytes += size
+            if self._disk_bytes > self.disk_limit:
+                self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.disk_limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._disk_bytes = total
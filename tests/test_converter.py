@@ -0,0 +1,15 @@
+from PIL import Image
+
+from converter import convert_all
+
+
+def test_profile_only_changes_image_outputs(tmp_path):
+    (tmp_path / "a.csv").write_text("x,y\n1,2\n", encoding="utf-8")
+    Image.new("RGB", (4, 4)).save(tmp_path / "a.png")
+    assert len(convert_all(str(tmp_path), "csv", "json", incremental=True).converted) == 1
+    assert len(convert_all(str(tmp_path), "png", "jpg", incremental=True).converted) == 1
+
+    again = convert_all(str(tmp_path), "csv", "json", incremental=True, profile="fast")
+    assert (len(again.converted), again.skipped) == (0, 1)
+    again = convert_all(str(tmp_path), "png", "jpg", incremental=True, profile="fast")
+    assert (len(again.converted), again.skipped) == (1, 0)
@@ -0,0 +1,50 @@
+import io
+
+import numpy as np
+import pytest
+
+from conversions.csv_npy import csv_to_npy
+
+CASES = [
+    ("1,x,2\n3,y,4\n", [[1, 2], [3, 4]]),               # text column dropped, no row lost
+    ("1,x,2\n", [[1, 2]]),
+    ("x,1\ny,2\n", [[1], [2]]),
+    ("id,name,value\n1,x,2.5\n3,y,4\n", [[1, 2.5], [3, 4]]),
+    ("a,b\n1,2\n\n3,\n", [[1, 2], [3, np.nan]]),
+]
+
+
+def _convert(tmp_path, text, **kwargs):
+    src, dst = tmp_path / "a.csv", tmp_path / "a.npy"
+    src.write_text(text, encoding="utf-8")
+    csv_to_npy(src, dst, **kwargs)
+    return np.load(dst)
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+@pytest.mark.parametrize("kwargs", [{}, {"chunk_rows": 1}, {"memmap": True}])
+def test_mixed_text_and_numbers(tmp_path, text, expected, kwargs):
+    np.testing.assert_array_equal(_convert(tmp_path, text, **kwargs), expected)
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_streams_match(text, expected):
+    out = io.BytesIO()
+    csv_to_npy(io.BytesIO(text.encode("utf-8")), out)
+    out.seek(0)
+    np.testing.assert_array_equal(np.load(out), expected)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 65536])
+def test_errors_name_the_file_line(tmp_path, chunk_rows):
+    with pytest.raises(ValueError, match="Line 6, column 1"):
+        _convert(tmp_path, 'a,b\n1,2\n\n"3\n",4\n5,zz\n', chunk_rows=chunk_rows)
+    with pytest.raises(ValueError, match="Line 4 has 1 fields"):
+        _convert(tmp_path, "a,b\n1,2\n\n3\n", chunk_rows=chunk_rows)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 65536])
+@pytest.mark.parametrize("last", ["5,z,6,7", "5,z"])
+def test_ragged_rows_with_text_columns(tmp_path, chunk_rows, last):
+    with pytest.raises(ValueError, match="Line 4 has"):
+        _convert(tmp_path, f"a,name,b\n1,x,2\n3,y,4\n{last}\n", chunk_rows=chunk_rows)
@@ -0,0 +1,11 @@
+import pytest
+
+from jobs import JobQueue
+
+
+def test_unreachable_pair_fails_before_creating_a_job_folder(tmp_path):
+    queue = JobQueue(workers=1, processes=False, directory=tmp_path)
+    with pytest.raises(KeyError):
+        queue.submit([("a.wav", b"RIFF")], ".wav", ".json")
+    assert list(tmp_path.iterdir()) == []
+
@@ -0,0 +1,19 @@
+import pytest
+
+from conversions import json_codec
+
+BIG = [123456789012345678901234, 18446744073709551616, -9223372036854775809, -9999999999999999999]
+
+
+@pytest.mark.parametrize("encode", [str, str.encode], ids=["str", "bytes"])
+def test_integers_beyond_64_bits_round_trip(encode):
+    text = json_codec.dumps({"big": BIG, "small": [1, 2.5]})
+    data = json_codec.loads(encode(text))
+    assert data == {"big": BIG, "small": [1, 2.5]}
+    assert all(type(n) is int for n in data["big"])
+    assert json_codec.dumps(data) == text
+
+
+def test_long_digit_runs_in_strings_still_parse():
+    assert json_codec.loads('["1234567890123456789012", 0.12345678901234567890]') == \
+        ["1234567890123456789012", 0.12345678901234567890]
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from conversions import json_stream
+
+ARRAYS = [
+    [1.5, 2.25],
+    [1, -22, 333, 4e10, 5.5e-3, 0],
+    [True, False, None, 12345678901234567890, -0.125],
+    ["a", 1.25, {"x": 1.5}, [2.75, 3], 10],
+]
+
+
+@pytest.fixture(autouse=True)
+def stdlib_reader(monkeypatch):
+    monkeypatch.setattr(json_stream, "ijson", None)
+
+
+@pytest.mark.parametrize("items", ARRAYS)
+@pytest.mark.parametrize("chunk_size", range(1, 17))
+@pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")])
+def test_scalars_cut_at_any_chunk_boundary(tmp_path, items, chunk_size, separators):
+    src = tmp_path / "a.json"
+    src.write_text(json.dumps(items, separators=separators), encoding="utf-8")
+    assert list(json_stream.iter_json_array(src, chunk_size)) == items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 4096])
+def test_garbage_after_number_is_an_error(tmp_path, chunk_size):
+    src = tmp_path / "a.json"
+    src.write_text("[1.5x, 2]", encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(json_stream.iter_json_array(src, chunk_size))
@@ -0,0 +1,109 @@
+import io
+import json
+
+import numpy as np
+import pytest
+import yaml
+from docx import Document
+from PIL import Image
+from PyPDF2 import PdfReader
+
+from conversions import CONVERSIONS
+from conversions.audio_pipe import ffmpeg_path
+from conversions.planner import convert_bytes, plan, run_route
+
+RECORDS = [{"id": i, "name": f"n{i}", "val": i * 1.5, "note": None if i % 3 else "x,y"} for i in range(5)]
+
+
+def _fixtures(d):
+    (d / "a.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+    (d / "a.toon").write_text(json.dumps(RECORDS), encoding="utf-8")
+    (d / "a.yaml").write_text(yaml.safe_dump(RECORDS), encoding="utf-8")
+    (d / "a.yml").write_text(yaml.safe_dump([[1, 2.5], [3, 4]]), encoding="utf-8")
+    (d / "a.csv").write_text("x,y,z\n1,0.5,2\n2,1.0,4\n", encoding="utf-8")
+    (d / "a.xml").write_text("<root><row><a>1</a><b>2</b></row><row><a>3</a><b>4</b></row></root>",
+                             encoding="utf-8")
+    np.save(d / "a.npy", np.arange(12, dtype=float).reshape(3, 4) / 7)
+    (d / "a.txt").write_text("hello world\n" + "long line " * 30 + "\n\nlast\n", encoding="utf-8")
+    (d / "a.md").write_text("# Title\n\nSome *text* & <b>bold</b>\n", encoding="utf-8")
+    (d / "a.html").write_text("<html><body><h1>Hi</h1><p>One &amp; two</p></body></html>", encoding="utf-8")
+    im = Image.new("RGBA", (8, 6), (10, 200, 30, 128))
+    for ext in ("png", "webp"):
+        im.save(d / f"a.{ext}")
+    for ext in ("jpg", "jpeg"):
+        im.convert("RGB").save(d / f"a.{ext}")
+    CONVERSIONS[(".txt", ".pdf")](d / "a.txt", d / "a.pdf")
+    CONVERSIONS[(".txt", ".docx")](d / "a.txt", d / "a.docx")
+    if ffmpeg_path():
+        import wave
+        with wave.open(str(d / "a.wav"), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(bytes(1600))
+        CONVERSIONS[(".wav", ".mp3")](d / "a.wav", d / "a.mp3")
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory):
+    d = tmp_path_factory.mktemp("in")
+    _fixtures(d)
+    return d
+
+
+def _content(ext, data: bytes):
+    # PDF and DOCX embed timestamps/ids; compare what they contain
+    if ext == ".pdf":
+        return [page.extract_text() for page in PdfReader(io.BytesIO(data)).pages]
+    if ext == ".docx":
+        return [p.text for p in Document(io.BytesIO(data)).paragraphs]
+    return data
+
+
+@pytest.mark.parametrize("pair", sorted(CONVERSIONS), ids=lambda p: p[0] + p[1])
+def test_path_and_bytes_api_agree(inputs, tmp_path, pair):
+    src = inputs / ("a" + pair[0])
+    if not src.exists():
+        pytest.skip("needs ffmpeg")
+    dst = tmp_path / ("out" + pair[1])
+    try:
+        CONVERSIONS[pair](src, dst)
+    except Exception as e:
+        # e.g. YAML records → NPY: both APIs must reject the input the same way
+        with pytest.raises(type(e)):
+            convert_bytes(src.read_bytes(), *pair)
+        return
+    got = convert_bytes(src.read_bytes(), *pair)
+    assert _content(pair[1], got) == _content(pair[1], dst.read_bytes())
+
+
+def _routes():
+    exts = sorted({ext for pair in CONVERSIONS for ext in pair})
+    for a in exts:
+        for b in exts:
+            if a != b and (a, b) not in CONVERSIONS:
+                try:
+                    yield plan(a, b)
+                except KeyError:
+                    pass
+
+
+@pytest.mark.parametrize("route", list(_routes()), ids=lambda r: "".join(r))
+def test_routes_match_hop_by_hop_files(inputs, tmp_path, route):
+    # values handed over in memory must give what writing and re-reading each hop gives
+    src = inputs / ("a" + route[0])
+    if not src.exists():
+        pytest.skip("needs ffmpeg")
+    current = src
+    try:
+        for i, pair in enumerate(zip(route, route[1:])):
+            out = tmp_path / f"step{i}{pair[1]}"
+            CONVERSIONS[pair](current, out)
+            current = out
+    except Exception as e:
+        with pytest.raises(type(e)):
+            run_route(route, src, tmp_path / ("out" + route[-1]))
+        return
+    dst = tmp_path / ("out" + route[-1])
+    run_route(route, src, dst)
+    assert _content(route[-1], dst.read_bytes()) == _content(route[-1], current.read_bytes())
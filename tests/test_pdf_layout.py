@@ -0,0 +1,14 @@
+import io
+
+from reportlab import rl_config
+
+from conversions.pdf_layout import write_lines_to_pdf
+
+
+def test_pages_are_deflated_without_touching_global_config(monkeypatch):
+    monkeypatch.setattr(rl_config, "useA85", 1)
+    out = io.BytesIO()
+    write_lines_to_pdf(["line"] * 100, out)
+    assert b"/FlateDecode" in out.getvalue()
+    assert b"ASCII85Decode" not in out.getvalue()
+    assert rl_config.useA85 == 1
@@ -0,0 +1,14 @@
+import io
+
+import pytest
+
+from conversions.xml_csv import xml_to_csv
+
+XML = b"<root><row><a>1</a><b>2</b></row><row/><row><a>3</a></row></root>"
+
+
+@pytest.mark.parametrize("kwargs", [{"record_depth": 2}, {"record_depth": 2, "fieldnames": ["a", "b"]}])
+def test_empty_record_is_a_full_width_row(kwargs):
+    out = io.BytesIO()
+    xml_to_csv(io.BytesIO(XML), out, **kwargs)
+    assert out.getvalue() == b"a,b\r\n1,2\r\n,\r\n3,\r\n"
@@ -0,0 +1,54 @@
+import io
+
+import numpy as np
+import pytest
+
+from conversions.xml_npy import npy_to_xml, read_numeric_xml
+
+SQUARE = b"<root><row><i>1</i><i>0</i></row><row><i>3</i><i>4</i></row></root>"
+RAGGED = b"<root><row><i>1</i></row><row><i>3</i><i>4</i><i>5</i></row><row><i>6</i><i>7</i></row></root>"
+
+
+def _read(xml: bytes, **kwargs) -> np.ndarray:
+    return read_numeric_xml(io.BytesIO(xml), **kwargs)
+
+
+@pytest.mark.parametrize("ragged", ["error", "pad", "truncate"])
+def test_int_and_bool_rectangular(ragged):
+    fill = {"fill": 0} if ragged == "pad" else {}
+    got = _read(SQUARE, dtype=int, ragged=ragged, **fill)
+    assert got.dtype == np.dtype(int) and got.tolist() == [[1, 0], [3, 4]]
+    got = _read(SQUARE, dtype=bool, ragged=ragged, **fill)
+    assert got.dtype == np.dtype(bool) and got.tolist() == [[True, False], [True, True]]
+
+
+def test_int_ragged():
+    assert _read(RAGGED, dtype=int, ragged="pad", fill=-1).tolist() == [[1, -1, -1], [3, 4, 5], [6, 7, -1]]
+    assert _read(RAGGED, dtype=int, ragged="truncate").tolist() == [[1], [3], [6]]
+    with pytest.raises(ValueError, match="needs a fill value"):
+        _read(RAGGED, dtype=int, ragged="pad")
+
+
+def test_float_pad_defaults_to_nan():
+    np.testing.assert_array_equal(_read(RAGGED, ragged="pad"),
+                                  [[1, np.nan, np.nan], [3, 4, 5], [6, 7, np.nan]])
+
+
+def test_bool_round_trip():
+    arr = np.array([[True, False], [False, True]])
+    src, out = io.BytesIO(), io.BytesIO()
+    np.save(src, arr)
+    src.seek(0)
+    npy_to_xml(src, out)
+    np.testing.assert_array_equal(_read(out.getvalue(), dtype=bool), arr)
+    assert _read(b"<root><v>true</v><v>False</v></root>", dtype=bool).tolist() == [True, False]
+
+
+@pytest.mark.parametrize("xml, expected", [
+    (b"<data><meta>sensor</meta><v>1</v><v>2</v></data>", [1, 2]),
+    (b"<data><header><name>s</name></header>"
+     b"<rows><row><v>1</v><v>2</v></row><row><v>3</v><v>4</v></row></rows></data>", [[1, 2], [3, 4]]),
+    (b"<root><row><v>1</v></row><row><v>2</v></row></root>", [[1], [2]]),
+])
+def test_default_path_skips_metadata(xml, expected):
+    assert _read(xml).tolist() == expected
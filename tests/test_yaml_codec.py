@@ -0,0 +1,13 @@
+import pytest
+import yaml
+
+from conversions import yaml_codec
+
+
+@pytest.mark.parametrize("backend", list(yaml_codec.BACKENDS))
+def test_load_is_single_document(backend):
+    assert yaml_codec.load("", backend=backend) is None
+    assert yaml_codec.load("a: 1\n", backend=backend) == {"a": 1}
+    with pytest.raises(yaml.YAMLError):
+        yaml_codec.load("a: 1\n---\nb: 2\n", backend=backend)
+    assert list(yaml_codec.load_all("a: 1\n---\nb: 2\n", backend=backend)) == [{"a": 1}, {"b": 2}]
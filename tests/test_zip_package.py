@@ -0,0 +1,42 @@
+import zipfile
+
+import pytest
+
+from zip_package import ZipPackage
+
+
+def _spilled(tmp_path):
+    return sorted(p.name for p in tmp_path.glob("*.zip"))
+
+
+def test_untaken_archive_leaves_no_temp_file(tmp_path):
+    with ZipPackage(spill_threshold=10, directory=tmp_path) as package:
+        package.add("a.txt", b"hello world" * 10)
+    assert _spilled(tmp_path) == []
+    with pytest.raises(ValueError, match="discarded"):
+        package.finish()
+
+
+def test_failed_build_leaves_no_temp_file(tmp_path):
+    with pytest.raises(RuntimeError):
+        with ZipPackage(spill_threshold=10, directory=tmp_path) as package:
+            package.add("a.txt", b"hello world" * 10)
+            raise RuntimeError
+    assert _spilled(tmp_path) == []
+
+
+def test_finish_inside_the_block(tmp_path):
+    with ZipPackage(spill_threshold=10, directory=tmp_path) as package:
+        package.add("a.txt", b"hello world" * 10)
+        archive = package.finish()
+    assert zipfile.ZipFile(archive).read("a.txt") == b"hello world" * 10
+
+
+def test_save_moves_the_spilled_file(tmp_path):
+    out = tmp_path / "out" / "a.zip"
+    out.parent.mkdir()
+    with ZipPackage(spill_threshold=10, directory=tmp_path) as package:
+        package.add("a.txt", b"hello world" * 10)
+        package.save(out)
+    assert _spilled(tmp_path) == []
+    assert zipfile.ZipFile(out).read("a.txt") == b"hello world" * 10
@@ -0,0 +1,355 @@
+"""Keep a folder converted: convert matching files as they arrive or change.
+
+FolderWatcher first runs convert_all(..., incremental=True) to catch up on
+whatever changed while it was not running, then waits for file events
+instead of rescanning the tree:
+- inotify (Linux) watches every folder under root, new folders included
+- elsewhere, or with backend="poll", matching files are stat'ed every
+  poll_interval seconds
+
+A file is converted once it has settled: no event for `settle` seconds and
+the same size and mtime as at its last event, so a file that is still being
+copied in is not picked up half-written. Files whose output is current in
+the manifest (see manifest.py) are skipped. Conversions run on a process pool
+with at most 2 × jobs files in flight; the rest wait in a queue. backlog is
+settling + queued + converting files, reported every report_every seconds
+while there is any.
+
+stop() (or Ctrl+C) stops taking new files and lets running conversions
+finish; a second stop() (or Ctrl+C) terminates the worker processes. Files
+they were converting are not recorded in the manifest, so they are converted
+again, like queued files, by the catch-up of the next start. Ctrl+C during the catch-up itself interrupts it
+like any convert_all run (finished files are already journaled).
+"""
+import ctypes
+import ctypes.util
+import errno
+import multiprocessing
+import os
+import select
+import signal
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import metrics
+from converter import BatchSummary, FileResult, convert_all, convert_chunk, normalize_ext, print_progress
+from conversions.image_profiles import check_profile, profile_tag
+from conversions.planner import find_converter
+from manifest import Manifest, converter_id
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT = struct.Struct("iIII")      # wd, mask, cookie, name length
+
+Signature = Tuple[int, int]         # size, mtime_ns
+
+
+def _signature(path: Path) -> Optional[Signature]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _walk_files(top: Path, match: Callable[[Path], bool]) -> Iterator[Path]:
+    for dirpath, _, names in os.walk(top):
+        for name in names:
+            path = Path(dirpath, name)
+            if match(path):
+                yield path
+
+
+class InotifyEvents:
+    """Files created, written or moved in anywhere under root, from inotify (Linux only)."""
+
+    def __init__(self, root: Path, match: Callable[[Path], bool]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.root = root
+        self.match = match
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        try:
+            self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top: Path) -> None:
+        for dirpath, _, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOENT:
+                    continue                            # removed again before we got to it
+                raise OSError(err, f"cannot watch {dirpath}: {os.strerror(err)}")
+            self._dirs[wd] = Path(dirpath)
+
+    def read(self, timeout: float) -> List[Path]:
+        """Matching paths with events in the next timeout seconds (empty if none)."""
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+        out = []
+        while True:
+            try:
+                buf = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                return out
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, size = _EVENT.unpack_from(buf, offset)
+                name = buf[offset + _EVENT.size:offset + _EVENT.size + size].rstrip(b"\0")
+                offset += _EVENT.size + size
+                if mask & _IN_Q_OVERFLOW:               # the kernel dropped events: look at everything once
+                    out.extend(_walk_files(self.root, self.match))
+                    continue
+                if mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                parent = self._dirs.get(wd)
+                if parent is None or not name:
+                    continue
+                path = parent / os.fsdecode(name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        self._watch_tree(path)          # files may already be inside
+                        out.extend(_walk_files(path, self.match))
+                elif self.match(path):
+                    out.append(path)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingEvents:
+    """Same interface as InotifyEvents, by comparing size and mtime of matching files every interval."""
+
+    def __init__(self, root: Path, match: Callable[[Path], bool], interval: float = 1.0):
+        self.root = root
+        self.match = match
+        self.interval = interval
+        self._seen = self._scan()
+        self._next = time.monotonic() + interval
+
+    def _scan(self) -> Dict[Path, Signature]:
+        seen = {}
+        for path in _walk_files(self.root, self.match):
+            sig = _signature(path)
+            if sig is not None:
+                seen[path] = sig
+        return seen
+
+    def read(self, timeout: float) -> List[Path]:
+        due = self._next - time.monotonic()
+        if due > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(due, 0.0))
+        seen = self._scan()
+        self._next = time.monotonic() + self.interval
+        changed = [path for path, sig in seen.items() if self._seen.get(path) != sig]
+        self._seen = seen
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def _init_worker(pids) -> None:
+    # pool workers: Ctrl+C is for the watcher, which lets running files finish;
+    # the pid lets a second stop() terminate the worker (with SIGTERM's default
+    # action, not a stop() handler inherited from the CLI)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    pids.put(os.getpid())
+
+
+def _print_backlog(settling: int, queued: int, converting: int) -> None:
+    print(f"backlog: {settling} settling, {queued} queued, {converting} converting", file=sys.stderr)
+
+
+class FolderWatcher:
+    """Converts from_ext files under root to to_ext as they appear, until stop().
+
+    - jobs: worker processes (0 = one per CPU)
+    - settle: seconds a file must stay unchanged before it is converted
+    - backend: "auto" (inotify where available, else polling), "inotify" or "poll"
+    - poll_interval: seconds between scans when polling
+    - progress / report: called per finished file / with the backlog counts
+    """
+
+    def __init__(self, root: str, from_ext: str, to_ext: str, jobs: int = 1, profile: Optional[str] = None,
+                 settle: float = 0.25, backend: str = "auto", poll_interval: float = 1.0,
+                 progress: Optional[Callable[[FileResult], None]] = print_progress,
+                 report: Optional[Callable[[int, int, int], None]] = _print_backlog,
+                 report_every: float = 10.0):
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError(f"Unknown watch backend {backend!r}")
+        self.root = Path(root)
+        self.from_ext = normalize_ext(from_ext)
+        self.to_ext = normalize_ext(to_ext)
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.profile = profile
+        self.settle = settle
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.progress = progress
+        self.report = report
+        self.report_every = report_every
+
+        func = find_converter(self.from_ext, self.to_ext)      # KeyError before any work if unreachable
+        check_profile(profile)
+        self._ident = converter_id(func) + profile_tag(self.to_ext, profile)  # same as convert_all
+        self._settling: Dict[Path, Tuple[float, Optional[Signature]]] = {}
+        self._queued: "OrderedDict[Path, None]" = OrderedDict()
+        self._running: Dict[Future, Tuple[Path, Path, Optional[Signature]]] = {}
+        self._stopping = threading.Event()
+        self._abort = threading.Event()
+        self.backend_used: Optional[str] = None
+
+    def _match(self, path: Path) -> bool:
+        # same files as convert_all's walk
+        return path.name.endswith(self.from_ext) and path.name != "README.md"
+
+    @property
+    def backlog(self) -> int:
+        """Files seen but not converted yet: settling + queued + converting."""
+        return len(self._settling) + len(self._queued) + len(self._running)
+
+    def stop(self) -> None:
+        """Finish the running conversions and return from run(); a second call terminates them."""
+        if self._stopping.is_set():
+            self._abort.set()
+        self._stopping.set()
+
+    def _events(self):
+        if self.backend != "poll":
+            try:
+                events = InotifyEvents(self.root, self._match)
+                self.backend_used = "inotify"
+                return events
+            except (OSError, AttributeError) as e:
+                if self.backend == "inotify":
+                    raise
+                print(f"inotify unavailable ({e}), polling every {self.poll_interval}s", file=sys.stderr)
+        self.backend_used = "poll"
+        return PollingEvents(self.root, self._match, self.poll_interval)
+
+    def _touched(self, path: Path, now: float) -> None:
+        self._settling[path] = (now + self.settle, _signature(path))
+
+    def _take_settled(self, now: float, manifest: Manifest) -> None:
+        busy = {src for src, _, _ in self._running.values()}
+        for path, (deadline, sig) in list(self._settling.items()):
+            if now < deadline:
+                continue
+            current = _signature(path)
+            if current is None:
+                del self._settling[path]                # gone again (e.g. a temp file renamed away)
+            elif current != sig or path in busy:
+                self._settling[path] = (now + self.settle, current)
+            else:
+                del self._settling[path]
+                if not manifest.is_current(path, path.with_suffix(self.to_ext), self._ident):
+                    self._queued[path] = None
+
+    def _finish(self, future: Future, manifest: Manifest, summary: BatchSummary, now: float) -> None:
+        src, dst, sig = self._running.pop(future)
+        if future.cancelled():
+            return
+        try:
+            result = future.result()[0]
+        except Exception as e:                          # the pool itself failed (e.g. a worker died)
+            result = FileResult(src, dst, 0.0, f"{type(e).__name__}: {e}")
+        summary.results.append(result)
+        metrics.emit(result.metrics)
+        if result.ok:
+            if _signature(src) == sig:
+                manifest.record(src, dst, self._ident)
+            else:
+                self._touched(src, now)                 # changed while converting: do it again
+        if self.progress is not None:
+            self.progress(result)
+
+    def run(self) -> BatchSummary:
+        """Catch up, then convert files as they settle until stop(); returns everything converted."""
+        start = time.perf_counter()
+        events = self._events()                         # before the catch-up, so nothing written meanwhile is missed
+        try:
+            summary = convert_all(str(self.root), self.from_ext, self.to_ext, jobs=self.jobs,
+                                  progress=self.progress, incremental=True, profile=self.profile)
+            manifest = Manifest(self.root)
+            context = multiprocessing.get_context()
+            pids = context.SimpleQueue()
+            pool = ProcessPoolExecutor(self.jobs, mp_context=context, initializer=_init_worker, initargs=(pids,))
+            try:
+                self._loop(events, pool, manifest, summary)
+            finally:
+                if self._abort.is_set():
+                    # Future.cancel() cannot stop a file that is converting: end the workers
+                    while not pids.empty():
+                        try:
+                            os.kill(pids.get(), signal.SIGTERM)
+                        except ProcessLookupError:
+                            pass
+                pool.shutdown(wait=True, cancel_futures=True)
+                manifest.compact()
+        finally:
+            events.close()
+            metrics.flush()
+        summary.elapsed = time.perf_counter() - start
+        return summary
+
+    def _loop(self, events, pool: ProcessPoolExecutor, manifest: Manifest, summary: BatchSummary) -> None:
+        max_in_flight = self.jobs * 2
+        last_report, last_backlog = time.monotonic(), 0
+        try:
+            while not self._stopping.is_set():
+                busy = self._settling or self._queued or self._running
+                paths = events.read(0.05 if busy else 0.5)
+                now = time.monotonic()
+                for path in paths:
+                    self._touched(path, now)
+                self._take_settled(now, manifest)
+
+                for future in [f for f in self._running if f.done()]:
+                    self._finish(future, manifest, summary, now)
+                while self._queued and len(self._running) < max_in_flight:
+                    src, _ = self._queued.popitem(last=False)
+                    dst = src.with_suffix(self.to_ext)
+                    future = pool.submit(convert_chunk, self.from_ext, self.to_ext, self.profile, [(src, dst)])
+                    self._running[future] = (src, dst, _signature(src))
+
+                backlog = self.backlog
+                if self.report is not None and now - last_report >= self.report_every and (backlog or last_backlog):
+                    self.report(len(self._settling), len(self._queued), len(self._running))
+                    last_report, last_backlog = now, backlog
+        except KeyboardInterrupt:
+            self.stop()                                 # Ctrl+C: finish what is running
+
+        while self._running and not self._abort.is_set():
+            try:
+                done, _ = wait(list(self._running), timeout=0.2)
+                for future in done:
+                    self._finish(future, manifest, summary, time.monotonic())
+            except KeyboardInterrupt:
+                self.stop()                             # second Ctrl+C: terminate the workers
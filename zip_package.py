@@ -0,0 +1,157 @@
+import io
+import os
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+SPILL_THRESHOLD = 64 << 20  # archives bigger than this are built in a temp file
+
+# Already-compressed formats: deflating them again costs CPU and saves ~nothing
+STORED_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".mp3", ".pdf", ".docx", ".zip"}
+
+
+def compression_for(name: str) -> int:
+    """ZIP_STORED for already-compressed formats, ZIP_DEFLATED for the rest."""
+    return zipfile.ZIP_STORED if Path(name).suffix.lower() in STORED_EXTS else zipfile.ZIP_DEFLATED
+
+
+class _SpillWriter(io.RawIOBase):
+    """Write-only sink: a BytesIO that moves to a temp file past `threshold` bytes.
+
+    Not seekable on purpose, so ZipFile streams members with data descriptors
+    and never needs to go back into data that may already be on disk.
+    """
+
+    def __init__(self, threshold: int, directory: Optional[str] = None):
+        self.threshold = threshold
+        self.directory = directory
+        self._buf: Optional[io.BytesIO] = io.BytesIO()
+        self._file = None
+        self._path: Optional[str] = None
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self._buf is None and self._file is None:
+            return len(b)           # discarded
+        if self._file is None and self._size + len(b) > self.threshold:
+            fd, self._path = tempfile.mkstemp(suffix=".zip", dir=self.directory)
+            self._file = os.fdopen(fd, "wb")
+            self._file.write(self._buf.getbuffer())
+            self._buf = None
+        (self._file or self._buf).write(b)
+        self._size += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._size
+
+    def result(self) -> BinaryIO:
+        """The written bytes, rewound: a BytesIO, or the temp file opened for reading."""
+        if self._file is None:
+            self._buf.seek(0)
+            return self._buf
+        self._file.close()
+        reader = open(self._path, "rb")
+        try:
+            os.unlink(self._path)   # POSIX: the open handle keeps the data alive
+        except OSError:
+            pass                    # Windows: left in the temp folder
+        return reader
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Move the written bytes to path (a rename when they are already on disk)."""
+        if self._file is None:
+            Path(path).write_bytes(self._buf.getbuffer())
+            return
+        self._file.close()
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(self._path, 0o666 & ~umask)   # mkstemp files are private; give it normal permissions
+        os.replace(self._path, path)
+
+    def discard(self) -> None:
+        """Drop what was written; later writes are ignored."""
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+        self._buf = self._file = None
+
+
+class ZipPackage:
+    """Builds a ZIP of converted outputs without holding extra copies in memory.
+
+    Members are written into the archive as they are added (bytes, a file on
+    disk, or a writable member stream for converters to write into directly).
+    The archive lives in memory until it passes spill_threshold, then in a
+    temp file. JPEG/WebP/MP3/PDF/... are stored as-is; text is deflated.
+
+        with ZipPackage() as package:
+            package.add("a.json", data)
+            with package.open("dir/b.csv") as member:
+                convert_stream(src, member, ".json", ".csv")
+            archive = package.finish()   # readable binary file object (or package.save(path))
+
+    Take the archive inside the with block: leaving it without finish() or
+    save() discards the archive, along with its temp file.
+    """
+
+    def __init__(self, spill_threshold: int = SPILL_THRESHOLD, directory: Union[str, Path, None] = None):
+        self._sink = _SpillWriter(spill_threshold, directory)
+        self._zip = zipfile.ZipFile(self._sink, "w", zipfile.ZIP_DEFLATED)
+        self._result: Optional[BinaryIO] = None
+        self._saved = False
+        self._discarded = False
+
+    def add(self, name: str, data: Union[bytes, memoryview]) -> None:
+        self._zip.writestr(name, data, compress_type=compression_for(name))
+
+    def add_file(self, name: str, path: Union[str, Path]) -> None:
+        self._zip.write(path, name, compress_type=compression_for(name))
+
+    def open(self, name: str) -> BinaryIO:
+        """Writable stream for one member; close it before adding the next."""
+        info = zipfile.ZipInfo(name, time.localtime(time.time())[:6])
+        info.compress_type = compression_for(name)
+        info.external_attr = 0o600 << 16     # same as writestr gives
+        return self._zip.open(info, "w", force_zip64=True)
+
+    def finish(self) -> BinaryIO:
+        """Close the archive and return it as a readable binary file object."""
+        self._check_kept()
+        if self._result is None:
+            self._zip.close()
+            self._result = self._sink.result()
+        return self._result
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Close the archive and write it to path (moved into place if it spilled)."""
+        self._check_kept()
+        self._zip.close()
+        self._sink.save(path)
+        self._saved = True
+
+    def __enter__(self):
+        return self
+
+    def _check_kept(self) -> None:
+        if self._discarded:
+            raise ValueError("archive was discarded: call finish() or save() inside the with block")
+
+    def __exit__(self, exc_type, *exc):
+        if self._result is not None or self._saved:
+            return
+        # failed build, or the archive was never taken: don't leave a temp file behind
+        self._sink.discard()
+        self._discarded = True
+        try:
+            self._zip.close()
+        except ValueError:
+            pass                    # a member stream is still open